@@ -0,0 +1,62 @@
+# benchmarks/bench_parser.py
+"""
+Micro-benchmark del parseo: cuántas expresiones por segundo procesa InputParser.
+
+Uso:
+    python -m benchmarks.bench_parser [--seconds 1.0]
+"""
+import argparse
+import time
+
+from core.calculator import CalculatorEngine
+from core.parser import InputParser
+
+CASES = {
+    "límite numérico ('2.5')": "2.5",
+    "límite constante ('oo')": "oo",
+    "polinomio ('3x^2 + 2x + 1')": "3x^2 + 2x + 1",
+    "trigonométrica ('2sin(x)cos(x)')": "2sin(x)cos(x)",
+    "larga (20 términos)": " + ".join(f"{i}x^{i}" for i in range(1, 21)),
+}
+
+
+def measure(fn, seconds: float) -> float:
+    """Ejecuta fn repetidamente durante 'seconds' y devuelve llamadas por segundo."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(10):
+            fn()
+        calls += 10
+    return calls / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rendimiento del parseo de expresiones")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Duración de cada medición")
+    args = parser.parse_args(argv)
+
+    engine = CalculatorEngine()
+    print(f"{'Caso':40} {'parseos/s':>12}")
+    for label, text in CASES.items():
+        local_symbols = engine._prepare_local_symbols("k, m")
+        rate = measure(lambda: InputParser.parse(text, local_symbols), args.seconds)
+        print(f"{label:40} {rate:12,.0f}")
+
+    rate = measure(lambda: engine._prepare_local_symbols("k, m"), args.seconds)
+    print(f"{'tabla de símbolos (caché)':40} {rate:12,.0f}")
+
+    # Función y ambos límites, como en calculate_integral (sin la caché de expresiones)
+    def full_request():
+        local_symbols = engine._prepare_local_symbols("k")
+        InputParser.parse("k*x^2 + 1", local_symbols)
+        InputParser.parse("0", local_symbols)
+        InputParser.parse("pi", local_symbols)
+
+    rate = measure(full_request, args.seconds)
+    print(f"{'petición completa (f, a, b)':40} {rate:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmark del pipeline de integración: mide por separado cada etapa de calculate_integral
+(preprocesado, parseo, compilación del kernel numérico, integral indefinida, definida, evalf y LaTeX), el cálculo
+completo y el muestreo de la gráfica, sobre un corpus de casos representativos.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--repeat 3] [--timeout 10] [--filter trig]
+                                        [--output resultados.json] [--baseline base.json]
+
+Con --baseline se comparan las medianas con un resultado guardado y el proceso termina
+con código 1 si alguna etapa es más lenta que el umbral (--threshold, --min-delta).
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+import sympy
+from sympy import integrate, latex
+from sympy.core.cache import clear_cache
+from sympy.parsing.sympy_parser import parse_expr
+
+from core.background import interrupt
+from core.calculator import CalculatorEngine
+from core.compiler import KernelCompiler
+from core.expression_preprocessor import ExpressionPreprocessor
+from core.parser import InputParser, _TRANSFORMATIONS
+from utils.sampling import FunctionSampler
+from utils.tile_cache import TileCache
+
+# (nombre, categoría, función, límite inferior, límite superior, constantes)
+CORPUS = [
+    ("polinomio grado 2", "polinomio", "3x^2 + 2x + 1", "0", "1", ""),
+    ("polinomio grado 10", "polinomio", "x^10 - 4x^5 + x", "-1", "2", ""),
+    ("seno al cuadrado", "trigonometrica", "sin(x)^2", "0", "pi", ""),
+    ("x cos(x)", "trigonometrica", "x cos(x)", "0", "pi/2", ""),
+    ("tangente", "trigonometrica", "tan(x)", "0", "1", ""),
+    ("exponencial por polinomio", "exponencial", "x^3 exp(-x)", "0", "5", ""),
+    ("exponencial por seno", "exponencial", "e^(2x) sin(x)", "0", "1", ""),
+    ("racional arctan", "racional", "1/(x^2 + 1)", "-1", "1", ""),
+    ("racional impropia", "racional", "(x^3 + 1)/(x^2 - 4)", "3", "5", ""),
+    ("logaritmo", "racional", "1/x", "1", "e", ""),
+    ("gaussiana en R", "impropia", "exp(-x^2)", "-oo", "oo", ""),
+    ("cola 1/x^2", "impropia", "1/x^2", "1", "oo", ""),
+    ("singularidad integrable", "impropia", "1/sqrt(x)", "0", "1", ""),
+    ("cola divergente", "impropia", "1/x", "1", "oo", ""),
+    ("constante multiplicativa", "constantes", "k x^2", "0", "1", "k"),
+    ("dos constantes", "constantes", "a sin(b x)", "0", "pi", "a, b"),
+    ("límite simbólico", "constantes", "x exp(-k x)", "0", "m", "k, m"),
+    ("oscilante sin forma cerrada", "patologica", "exp(-x^2) sin(x^3)", "0", "2", ""),
+    ("integral elíptica", "patologica", "sqrt(1 + x^4)", "0", "1", ""),
+    ("valor absoluto", "patologica", "abs(sin(x))", "0", "10", ""),
+    ("polo en el intervalo", "patologica", "1/x", "-1", "1", ""),
+    ("tangente con polo", "patologica", "tan(x)", "0", "2", ""),
+]
+
+STAGES = ("preprocess", "parse", "lambdify", "indefinite", "definite", "evalf", "latex",
+          "calculate_integral", "plot_sample", "plot_pan")
+
+
+class StageTimeout(Exception):
+    pass
+
+
+def run_with_limit(fn, *args, limit: float):
+    """
+    Ejecuta 'fn' en un hilo propio, ajeno a los huecos simbólicos del motor. Si no termina
+    en 'limit' segundos se interrumpe (para que no consuma CPU en los casos siguientes) y
+    se lanza StageTimeout.
+    """
+    outcome = {}
+
+    def runner():
+        try:
+            outcome["value"] = fn(*args)
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=runner, name="etapa-benchmark", daemon=True)
+    thread.start()
+    thread.join(limit)
+    if thread.is_alive():
+        interrupt(thread)
+        raise StageTimeout()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def run_case(engine, case, timeout: float) -> dict:
+    """Una medición de todas las etapas de un caso. Devuelve {etapa: segundos | None}."""
+    _, _, func_str, lower_str, upper_str, constants_str = case
+    # Sin cachés: SymPy memoriza resultados y el motor también
+    clear_cache()
+    engine.invalidate_cache()
+    timings = dict.fromkeys(STAGES)
+    x = engine.variable
+
+    def timed(stage, fn, *args, limit=None):
+        start = time.perf_counter()
+        if limit is None:
+            value = fn(*args)
+        else:
+            try:
+                value = run_with_limit(fn, *args, limit=limit)
+            except StageTimeout:
+                raise StageTimeout(stage) from None
+        timings[stage] = time.perf_counter() - start
+        return value
+
+    local_symbols = engine._prepare_local_symbols(constants_str)
+    text = timed("preprocess", ExpressionPreprocessor.preprocess, func_str, local_symbols)
+    func_expr = timed("parse", lambda: parse_expr(text, local_dict=local_symbols, transformations=_TRANSFORMATIONS))
+    a_expr = InputParser.parse(lower_str, local_symbols)
+    b_expr = InputParser.parse(upper_str, local_symbols)
+
+    plottable = not func_expr.free_symbols - {x}
+    numeric_func = None
+    if plottable:
+        # La etapa conserva el nombre 'lambdify' para poder comparar con referencias anteriores
+        numeric_func = timed("lambdify", KernelCompiler.build, func_expr, (x,))
+
+    try:
+        indefinite = timed("indefinite", integrate, func_expr, x, limit=timeout)
+        def definite_integral():
+            # Comparar con None: un resultado nulo (S.Zero) es válido y no debe repetir integrate
+            value = engine._definite_from_antiderivative(indefinite, a_expr, b_expr)
+            return integrate(func_expr, (x, a_expr, b_expr)) if value is None else value
+
+        definite = timed("definite", definite_integral, limit=timeout)
+        value = timed("evalf", definite.evalf, 10) if definite.is_number else definite
+        timed("latex", lambda: (latex(value), latex(indefinite)))
+    except StageTimeout:
+        pass
+
+    clear_cache()
+    engine.invalidate_cache()
+    start = time.perf_counter()
+    result = engine.calculate_integral(func_str, lower_str, upper_str, constants_str)
+    if result["success"]:
+        timings["calculate_integral"] = time.perf_counter() - start
+
+    if numeric_func is not None:
+        # Misma ventana inicial que PlotPanel._draw_initial_view
+        window = result.get("plot_window") if result["success"] else None
+        if window is not None:
+            x_min, x_max = window
+        else:
+            a = float(a_expr) if a_expr.is_finite else -10.0
+            b = float(b_expr) if b_expr.is_finite else 10.0
+            span = max(b - a, 4)
+            x_min, x_max = a - span / 2, b + span / 2
+        sampler = FunctionSampler()
+        tiles = TileCache(sampler)
+        timed("plot_sample", tiles.sample, numeric_func, x_min, x_max, 600)
+        shift = (x_max - x_min) * 0.1
+        timed("plot_pan", tiles.sample, numeric_func, x_min + shift, x_max + shift, 600)
+    return timings
+
+
+def run(cases, repeat: int, timeout: float) -> dict:
+    engine = CalculatorEngine(time_budget=timeout)
+    # Los hilos simbólicos de un caso patológico se abandonan al vencer el plazo, sin
+    # dejar ocupados los huecos del motor para los casos siguientes
+    engine.BACKGROUND_HARD_LIMIT = timeout
+    engine.warm_up()
+    results = {}
+    for case in cases:
+        samples = [run_case(engine, case, timeout) for _ in range(repeat)]
+        stages = {}
+        for stage in STAGES:
+            values = [sample[stage] for sample in samples]
+            # Si alguna repetición no terminó, la etapa se marca como no disponible
+            stages[stage] = None if None in values else statistics.median(values)
+        results[case[0]] = {"category": case[1], "function": case[2], "limits": [case[3], case[4]],
+                            "constants": case[5], "stages": stages}
+        print(format_row(case[0], stages), flush=True)
+    return results
+
+
+def format_row(name, stages) -> str:
+    cells = "".join(f"{'—' if stages[s] is None else f'{stages[s] * 1000:.2f}':>12}" for s in STAGES)
+    return f"{name[:30]:30}{cells}"
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list:
+    """Etapas más lentas que la referencia en más de 'threshold' (relativo) y 'min_delta' (segundos)."""
+    regressions = []
+    for name, case in results.items():
+        base_case = baseline.get("cases", {}).get(name)
+        if base_case is None:
+            continue
+        for stage, value in case["stages"].items():
+            base = base_case["stages"].get(stage)
+            if base is None:
+                continue
+            if value is None:
+                regressions.append((name, stage, base, value))
+            elif value - base > min_delta and value > base * (1 + threshold):
+                regressions.append((name, stage, base, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempos por etapa del pipeline de integración")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se usa la mediana)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Límite en segundos de cada integración")
+    parser.add_argument("--filter", default="", help="Sólo casos cuyo nombre o categoría contenga el texto")
+    parser.add_argument("--output", help="Guarda los resultados en este archivo JSON")
+    parser.add_argument("--baseline", help="Compara con un JSON guardado antes con --output")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regresión relativa tolerada (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Regresión absoluta mínima en segundos")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CORPUS if args.filter.lower() in (case[0] + " " + case[1]).lower()]
+    print(f"{len(cases)} de {len(CORPUS)} casos, {args.repeat} repeticiones")
+    print(f"{'Caso (ms)':30}" + "".join(f"{stage[:11]:>12}" for stage in STAGES))
+    results = run(cases, args.repeat, args.timeout)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "sympy": sympy.__version__, "numpy": np.__version__, "platform": platform.platform(),
+            "repeat": args.repeat, "timeout": args.timeout, "cases": len(cases),
+        },
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if not regressions:
+            print("Sin regresiones respecto a la referencia.")
+            return 0
+        print("Regresiones:")
+        for name, stage, base, value in regressions:
+            now = "sin terminar" if value is None else f"{value * 1000:.2f} ms"
+            print(f"  {name}: {stage} {base * 1000:.2f} ms -> {now}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
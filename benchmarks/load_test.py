@@ -0,0 +1,167 @@
+# benchmarks/load_test.py
+"""
+Prueba de carga del servicio HTTP (core.server): lanza peticiones concurrentes durante un
+tiempo fijo y mide peticiones por segundo, latencias (p50, p95, p99) y respuestas por código.
+
+Uso:
+    python -m benchmarks.load_test [--url http://127.0.0.1:8765] [--concurrency 16] [--seconds 10]
+                                   [--endpoint integral|batch|sweep] [--unique] [--timeout 10]
+    python -m benchmarks.load_test --spawn [--workers 4] [--queue 8]
+
+Con --spawn se arranca un servidor propio en un puerto libre de localhost. Con --unique cada
+petición usa una integral distinta, de modo que la caché de resultados no las responde.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+from core.server import IntegrationServer, IntegrationService
+
+# (función, límite inferior, límite superior, constantes)
+CASES = [
+    ("3x^2 + 2x + 1", "0", "1", ""),
+    ("sin(x)^2", "0", "pi", ""),
+    ("x^3 exp(-x)", "0", "5", ""),
+    ("1/(x^2 + 1)", "-1", "1", ""),
+    ("exp(-x^2)", "-oo", "oo", ""),
+    ("exp(-x^2) sin(x^3)", "0", "2", ""),
+]
+
+
+def build_payload(endpoint: str, number: int, unique: bool, timeout: float) -> dict:
+    """Cuerpo de la petición número 'number'; con unique, el integrando se escala por un factor distinto."""
+    func, lower, upper, constants = CASES[number % len(CASES)]
+    if unique:
+        func = f"(1 + {number}/1000)*({func})"
+    job = {"function": func, "lower_limit": lower, "upper_limit": upper, "constants": constants}
+    if endpoint == "batch":
+        return {"jobs": [dict(job, function=f"{i + 1}*({func})") for i in range(8)], "timeout": timeout}
+    if endpoint == "sweep":
+        return {"function": f"k*({func})", "lower_limit": lower, "upper_limit": upper, "constants": "k",
+                "values": {"k": [1, 2, 3, 4]}, "timeout": timeout}
+    return {**job, "timeout": timeout}
+
+
+def post(url: str, payload: dict, timeout: float) -> int:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return 0  # conexión rechazada o sin respuesta
+
+
+def run(url: str, endpoint: str, concurrency: int, seconds: float, unique: bool, timeout: float,
+        backoff: float = 0.05) -> dict:
+    """
+    Cada hilo repite peticiones hasta agotar el tiempo; devuelve latencias y códigos.
+    Tras un 429 el cliente espera 'backoff' segundos antes de reintentar.
+    """
+    counter = itertools.count()
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            payload = build_payload(endpoint, next(counter), unique, timeout)
+            started = time.perf_counter()
+            status = post(f"{url}/{endpoint}", payload, timeout + 5)
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[status] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+            if status == 429:
+                time.sleep(backoff)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"elapsed": time.perf_counter() - started, "latencies": latencies, "statuses": statuses}
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(result: dict) -> dict:
+    latencies, elapsed = result["latencies"], result["elapsed"]
+    total = sum(result["statuses"].values())
+    summary = {
+        "requests": total, "ok": len(latencies), "rps": total / elapsed, "ok_rps": len(latencies) / elapsed,
+        "p50_ms": 1000 * percentile(latencies, 0.50), "p95_ms": 1000 * percentile(latencies, 0.95),
+        "p99_ms": 1000 * percentile(latencies, 0.99), "max_ms": 1000 * max(latencies, default=float("nan")),
+        "mean_ms": 1000 * statistics.fmean(latencies) if latencies else float("nan"),
+        "statuses": {str(code): count for code, count in sorted(result["statuses"].items())},
+    }
+    print(f"Peticiones: {total} en {elapsed:.1f} s ({summary['rps']:.1f} pet/s, "
+          f"{summary['ok_rps']:.1f} pet/s con éxito)")
+    print(f"Latencia (ms): p50 {summary['p50_ms']:.1f}  p95 {summary['p95_ms']:.1f}  "
+          f"p99 {summary['p99_ms']:.1f}  máx {summary['max_ms']:.1f}")
+    print("Códigos: " + ", ".join(f"{code} x{count}" for code, count in summary["statuses"].items())
+          + "  (0 = sin conexión)")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP de integrales")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="URL base del servidor")
+    parser.add_argument("--endpoint", choices=("integral", "batch", "sweep"), default="integral")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Clientes simultáneos")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duración de la prueba")
+    parser.add_argument("--unique", action="store_true", help="Una integral distinta por petición (sin caché)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Plazo enviado en cada petición (s)")
+    parser.add_argument("--backoff", type=float, default=0.05, help="Espera tras un 429 (s)")
+    parser.add_argument("--spawn", action="store_true", help="Arrancar un servidor propio en localhost")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Procesos del servidor propio")
+    parser.add_argument("-q", "--queue", type=int, default=None, help="Cola del servidor propio")
+    parser.add_argument("--output", help="Guardar el resumen en JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url.rstrip("/")
+    if args.spawn:
+        service = IntegrationService(workers=args.workers, queue_size=args.queue)
+        server = IntegrationServer(("127.0.0.1", 0), service)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+        print(f"Servidor en {url} ({service.workers} procesos, {service.capacity} tareas como máximo)")
+        # Primera petición fuera de la medición: arranca los procesos del pool
+        post(f"{url}/integral", build_payload("integral", 0, False, args.timeout), args.timeout + 30)
+
+    try:
+        print(f"/{args.endpoint}: {args.concurrency} clientes durante {args.seconds:g} s"
+              + (" (integrales distintas)" if args.unique else ""), flush=True)
+        summary = report(run(url, args.endpoint, args.concurrency, args.seconds, args.unique, args.timeout,
+                             args.backoff))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# core/background.py
+
+import ctypes
+import threading
+
+
+class SymbolicSaturated(Exception):
+    """Todos los hilos simbólicos del motor están ocupados: la vía simbólica ni siquiera empezó."""
+
+
+class SymbolicAbandoned(BaseException):
+    """
+    Se lanza de forma asíncrona en un hilo simbólico que superó su plazo máximo. Deriva de
+    BaseException para que los 'except Exception' de SymPy no lo absorban.
+    """
+
+
+def interrupt(thread: threading.Thread) -> bool:
+    """Pide a CPython que lance SymbolicAbandoned en 'thread'; False si el intérprete no lo permite."""
+    try:
+        set_async_exc = ctypes.pythonapi.PyThreadState_SetAsyncExc
+    except AttributeError:
+        return False
+    return set_async_exc(ctypes.c_ulong(thread.ident), ctypes.py_object(SymbolicAbandoned)) == 1
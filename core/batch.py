@@ -0,0 +1,125 @@
+# core/batch.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .calculator import CalculatorEngine
+
+# Motor propio de cada proceso del pool (se crea una vez por proceso)
+_worker_engine = None
+
+
+def _init_worker(time_budget: float):
+    global _worker_engine
+    _worker_engine = CalculatorEngine(time_budget=time_budget)
+
+
+def _run_chunk(chunk: list) -> list:
+    """Calcula un bloque de trabajos en un proceso del pool."""
+    results = []
+    for job in chunk:
+        result = _worker_engine.calculate_integral(*job)
+        # Las funciones de lambdify no se pueden enviar entre procesos
+        result.pop("numeric_func", None)
+        results.append(result)
+    return results
+
+
+class BatchIntegrator:
+    """
+    Reparte muchas integrales entre varios procesos.
+    Cada trabajo es una tupla (función, a, b[, constantes]) o un dict con las claves
+    'function', 'lower_limit', 'upper_limit' y 'constants'.
+    """
+
+    def __init__(self, max_workers: int = None, chunksize: int = 16, time_budget: float = 5.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self.time_budget = time_budget
+
+    @staticmethod
+    def normalize_job(job) -> tuple:
+        """
+        Convierte un trabajo a la tupla (función, a, b, constantes) sin espacios sobrantes.
+        Un quinto campo (o la clave 'digits') con la precisión se añade como entero.
+        """
+        if isinstance(job, dict):
+            job = (job["function"], job["lower_limit"], job["upper_limit"], job.get("constants", ""),
+                   job.get("digits"))
+        if isinstance(job, (str, bytes)) or not hasattr(job, "__iter__"):
+            raise ValueError("Trabajo inválido: se esperaba un objeto o una lista de campos")
+        job = tuple(job)
+        if len(job) == 3:
+            job = job + ("",)
+        if not 4 <= len(job) <= 5:
+            raise ValueError(f"Trabajo inválido: se esperaban de 3 a 5 campos y se recibieron {len(job)}")
+        fields = tuple(str(field).strip() for field in job[:4])
+        digits = job[4] if len(job) == 5 else None
+        if digits is None or str(digits).strip() == "":
+            return fields
+        try:
+            return fields + (int(str(digits).strip()),)
+        except ValueError:
+            raise ValueError(f"Trabajo inválido: la precisión debe ser un entero, no {digits!r}") from None
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Pool de procesos con un motor por proceso, reutilizable entre varias llamadas a run()."""
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                   initargs=(self.time_budget,))
+
+    def run(self, jobs, ordered: bool = True, executor: ProcessPoolExecutor = None):
+        """
+        Genera pares (índice, resultado). Con ordered=True se respeta el orden de entrada;
+        si no, cada resultado se entrega en cuanto termina su bloque.
+        Los trabajos idénticos se calculan una sola vez. Con 'executor' (ver executor())
+        se usa ese pool en lugar de crear uno para esta llamada.
+        """
+        unique_jobs = {}  # trabajo normalizado -> índices que lo solicitaron
+        invalid = {}
+        total = 0
+        for index, job in enumerate(jobs):
+            total += 1
+            try:
+                unique_jobs.setdefault(self.normalize_job(job), []).append(index)
+            except Exception as e:
+                invalid[index] = {"success": False, "error_message": str(e)}
+
+        pending = list(unique_jobs)
+        chunks = [pending[i:i + self.chunksize] for i in range(0, len(pending), self.chunksize)]
+        ready = dict(invalid)
+        next_index = 0
+
+        if not ordered:
+            yield from invalid.items()
+
+        if chunks:
+            owned = executor is None
+            if owned:
+                executor = self.executor()
+            try:
+                futures = {executor.submit(_run_chunk, chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        # Un fallo del proceso sólo afecta a los trabajos de su bloque
+                        results = [{"success": False, "error_message": str(e)}] * len(chunk)
+
+                    for job, result in zip(chunk, results):
+                        for index in unique_jobs[job]:
+                            if ordered:
+                                ready[index] = dict(result)
+                            else:
+                                yield index, dict(result)
+
+                    while ordered and next_index in ready:
+                        yield next_index, ready.pop(next_index)
+                        next_index += 1
+            finally:
+                if owned:
+                    executor.shutdown(cancel_futures=True)
+
+        while ordered and next_index < total:
+            yield next_index, ready.pop(next_index)
+            next_index += 1
@@ -0,0 +1,140 @@
+# core/cache.py
+
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+import sympy
+
+
+class ResultCache:
+    """
+    Caché LRU en memoria con límite de entradas y de bytes, y un segundo nivel
+    opcional en disco (SQLite) que sobrevive entre ejecuciones.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024, disk_path: str = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clave -> (valor, tamaño estimado)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+        self._disk = None
+        if disk_path:
+            directory = os.path.dirname(os.path.abspath(disk_path))
+            os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB)")
+            self._disk.commit()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Construye una clave canónica. Las expresiones SymPy se representan con 'srepr',
+        de modo que '2x', '2*x' y 'x*2' producen la misma clave.
+        """
+        normalized = []
+        for part in parts:
+            if isinstance(part, sympy.Basic):
+                normalized.append(sympy.srepr(part))
+            elif isinstance(part, (set, frozenset)):
+                normalized.append(repr(sorted(part)))
+            else:
+                normalized.append(repr(part))
+        return "|".join(normalized)
+
+    @staticmethod
+    def _estimate_size(value) -> int:
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Objetos no serializables (p. ej. funciones de lambdify)
+            return sys.getsizeof(value)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+            if self._disk is not None:
+                row = self._disk.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    try:
+                        value = pickle.loads(row[0])
+                    except Exception:
+                        value = None
+                    if value is not None:
+                        self.hits += 1
+                        self.disk_hits += 1
+                        self._store(key, value, len(row[0]))
+                        return value
+
+            self.misses += 1
+            return default
+
+    def put(self, key: str, value, persist: bool = True):
+        """Guarda un valor. Con persist=True también se escribe en disco si hay nivel persistente."""
+        with self._lock:
+            blob = None
+            if persist and self._disk is not None:
+                try:
+                    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    blob = None
+            size = len(blob) if blob is not None else self._estimate_size(value)
+            self._store(key, value, size)
+
+            if blob is not None:
+                self._disk.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, blob))
+                self._disk.commit()
+
+    def _store(self, key, value, size):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        # Expulsar las entradas menos usadas hasta respetar ambos límites
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, key: str = None):
+        """Elimina una clave concreta, o todo el contenido (memoria y disco) si key es None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+                if self._disk is not None:
+                    self._disk.execute("DELETE FROM cache")
+                    self._disk.commit()
+                return
+
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._disk.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "disk_hits": self.disk_hits, "entries": len(self._entries), "bytes": self._bytes}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
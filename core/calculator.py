@@ -1,13 +1,59 @@
-# core/calculator.py
+import functools
+import math
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
 import sympy
 from sympy import symbols, lambdify, integrate, latex, Symbol
 
+from .background import SymbolicAbandoned, SymbolicSaturated, interrupt
+from .cache import ResultCache
+from .compiler import KernelCompiler
+from .history_store import HistoryStore
+from .improper import ImproperIntegrator
+from .instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from .multiple import MultipleIntegral
 from .parser import InputParser
+from .preview import LivePreview, PreviewCancelled
+from .quadrature import NumericIntegrator
+from .sweep import ParameterSweep
 
 
 class CalculatorEngine:
-    def __init__(self):
-        self.history = []
+    # Máximo de dígitos que se pueden pedir en el modo de precisión arbitraria
+    MAX_DIGITS = 1000
+    # Integraciones simbólicas a la vez por motor (incluidas las que siguen tras vencer su plazo)
+    MAX_BACKGROUND_THREADS = 4
+    # Segundos que puede seguir un hilo simbólico (como mínimo, time_budget) antes de abandonarlo
+    BACKGROUND_HARD_LIMIT = 60.0
+
+    def __init__(self, time_budget: float = 5.0, prefer_exact: bool = False, cache_path: str = None,
+                 history_path: str = None, instrument: bool = False, sinks=None):
+        # Historial en SQLite (en memoria si no se indica un archivo)
+        self.history = HistoryStore(history_path or ":memory:")
+        # Cachés: expresiones parseadas, funciones numéricas y resultados (opcionalmente en disco)
+        self.parse_cache = ResultCache(max_entries=1024, max_bytes=4 * 1024 * 1024)
+        self.numeric_cache = ResultCache(max_entries=256, max_bytes=8 * 1024 * 1024)
+        self.result_cache = ResultCache(max_entries=512, max_bytes=32 * 1024 * 1024, disk_path=cache_path)
+        # Formas simbólicas (definida e indefinida), compartidas por todos los niveles de precisión
+        self.symbolic_cache = ResultCache(max_entries=256, max_bytes=16 * 1024 * 1024)
+        # Niveles de precisión ya calculados para cada integral
+        self._precision_levels = {}
+        # Tiempo máximo (segundos) que se espera a la integración simbólica
+        self.time_budget = time_budget
+        # Huecos para hilos simbólicos: propios de cada motor y recuperados al abandonar un hilo
+        self._background_slots = threading.BoundedSemaphore(self.MAX_BACKGROUND_THREADS)
+        # Si es False, se devuelve la primera respuesta disponible aunque sea numérica;
+        # la forma cerrada que llegue después queda en symbolic_cache (ver wait_for_symbolic)
+        self.prefer_exact = prefer_exact
+        # Integraciones simbólicas en curso por clave: una petición repetida espera a la misma
+        self._symbolic_pending = {}
+        self._symbolic_pending_lock = threading.Lock()
+        self.numeric_integrator = NumericIntegrator()
+        # Kernels de NumPy compilados (con CSE), compartidos por la gráfica, la cuadratura y los barridos
+        self.compiler = KernelCompiler()
+        self.improper_integrator = ImproperIntegrator(self.numeric_integrator)
         # Definimos el único símbolo 'variable' que la calculadora usa. Todo lo demás es una constante.
         self.variable = symbols('x')
         # Símbolos matemáticos fijos
@@ -21,30 +67,527 @@ class CalculatorEngine:
             'asin': sympy.asin, 'acos': sympy.acos, 'atan': sympy.atan,
             'acsc': sympy.acsc, 'asec': sympy.asec, 'acot': sympy.acot, 'x': self.variable
         }
+        # Tablas de símbolos ya construidas, por firma de constantes (LRU: las constantes las elige el usuario)
+        self._symbol_tables = ResultCache(max_entries=256, max_bytes=8 * 1024 * 1024)
+        # Instrumentación opcional: tiempos por etapa y tamaños en el resultado, y destinos (log, memoria, cProfile)
+        self.instrument = instrument or bool(sinks)
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink):
+        """Añade un destino de instrumentación (LogSink, RingBufferSink, ProfileSink...) y la activa."""
+        self.sinks.append(sink)
+        self.instrument = True
 
     def _prepare_local_symbols(self, constants_str: str) -> dict:
-        user_symbols = {}
-        if constants_str:
-            constant_names = [s.strip() for s in constants_str.split(',') if s.strip()]
-            for name in constant_names:
-                # Evitar que el usuario redefina símbolos base
-                if name and name not in self.known_symbols and name != str(self.variable):
-                    user_symbols[name] = Symbol(name)
-
-        # Combinar todos los símbolos y AÑADIR LA VARIABLE DE INTEGRACIÓN 'x'
-        local_symbols = {**self.known_symbols, **user_symbols}
-        local_symbols[str(self.variable)] = self.variable
+        """
+        Tabla de símbolos para unas constantes dadas. Se construye una sola vez por
+        combinación de constantes y se reutiliza (no debe modificarse).
+        """
+        # _constants_signature ya descarta los nombres que redefinirían símbolos base
+        signature = self._constants_signature(constants_str)
+        key = ResultCache.make_key(signature)
+        local_symbols = self._symbol_tables.get(key)
+        if local_symbols is None:
+            user_symbols = {name: Symbol(name) for name in signature}
+
+            # Combinar todos los símbolos y AÑADIR LA VARIABLE DE INTEGRACIÓN 'x'
+            local_symbols = {**self.known_symbols, **user_symbols}
+            local_symbols[str(self.variable)] = self.variable
+            self._symbol_tables.put(key, local_symbols, persist=False)
         return local_symbols
 
-    def calculate_integral(self, func_str: str, lower_limit_str: str, upper_limit_str: str, constants_str: str = ""):
+    def _run_in_background(self, fn, *args) -> Future:
+        """
+        Ejecuta 'fn' en un hilo daemon y devuelve un Future con su resultado.
+        Se usa un hilo por petición para que una integral que nunca termina
+        no bloquee a las siguientes ni impida cerrar el intérprete.
+        Como mucho hay MAX_BACKGROUND_THREADS en curso por motor; sin hueco libre, el
+        Future falla al momento con SymbolicSaturated y se usa la vía numérica. Un hilo que
+        pasa de BACKGROUND_HARD_LIMIT se abandona: su Future falla con TimeoutError, el hueco
+        se libera y se le interrumpe con una excepción asíncrona (SymPy es Python puro).
+        """
+        future = Future()
+        slots = self._background_slots
+        if not slots.acquire(blocking=False):
+            future.set_exception(SymbolicSaturated(
+                f"Hay {self.MAX_BACKGROUND_THREADS} integraciones simbólicas en curso; no se inició otra."))
+            return future
+
+        limit = max(self.BACKGROUND_HARD_LIMIT, self.time_budget)
+        lock = threading.Lock()
+        state = {"finished": False}
+
+        def finish(value=None, exc=None) -> bool:
+            # Termina la tarea quien llegue primero: el propio hilo o el temporizador
+            with lock:
+                if state["finished"]:
+                    return False
+                state["finished"] = True
+            timer.cancel()
+            slots.release()
+            if exc is None:
+                future.set_result(value)
+            else:
+                future.set_exception(exc)
+            return True
+
+        def runner():
+            try:
+                if not future.set_running_or_notify_cancel():
+                    finish()
+                    return
+                try:
+                    value = fn(*args)
+                except BaseException as exc:
+                    finish(exc=exc)
+                else:
+                    finish(value)
+            except SymbolicAbandoned:
+                pass  # el temporizador ya liberó el hueco y falló el Future
+
+        def abandon():
+            if finish(exc=FutureTimeoutError(f"La integración simbólica se abandonó tras {limit:g} s.")):
+                interrupt(thread)
+
+        thread = threading.Thread(target=runner, name="integracion-simbolica", daemon=True)
+        timer = threading.Timer(limit, abandon)
+        timer.daemon = True
+        thread.start()
+        timer.start()
+        return future
+
+    def _symbolic_done(self, symbolic_key: str, future: Future):
+        """Guarda en symbolic_cache la forma simbólica terminada y la retira de las pendientes."""
+        with self._symbolic_pending_lock:
+            if self._symbolic_pending.get(symbolic_key) is future:
+                del self._symbolic_pending[symbolic_key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.symbolic_cache.put(symbolic_key, future.result(), persist=False)
+
+    def wait_for_symbolic(self, symbolic_key: str, timeout: float = None) -> bool:
+        """
+        Espera a la integración simbólica pendiente de 'symbolic_key' (la de un resultado
+        provisional). Devuelve True si hay forma cerrada en symbolic_cache: calcular de nuevo
+        la misma integral la dará sin volver a integrar.
+        """
+        with self._symbolic_pending_lock:
+            future = self._symbolic_pending.get(symbolic_key)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                return False
+            # Los callbacks del Future corren tras despertar a quien espera: se guarda aquí también
+            self._symbolic_done(symbolic_key, future)
+        cached = self.symbolic_cache.get(symbolic_key)
+        return cached is not None and cached[0] is not None and not cached[0].has(sympy.Integral)
+
+    def _symbolic_integrals(self, func_expr, a_expr, b_expr, instrumentation=NULL_INSTRUMENTATION):
+        # La antiderivada se calcula una sola vez y la integral definida se obtiene de ella.
+        with instrumentation.stage("indefinite"):
+            integral_indef = integrate(func_expr, self.variable)
+        with instrumentation.stage("definite"):
+            integral_def = self._definite_from_antiderivative(integral_indef, a_expr, b_expr)
+            if integral_def is None:
+                # Sólo cuando la antiderivada no sirve se recurre a la vía definida directa
+                integral_def = integrate(func_expr, (self.variable, a_expr, b_expr))
+        return integral_def, integral_indef
+
+    # Funciones continuas en toda la recta real: no aportan puntos críticos
+    _CONTINUOUS_FUNCTIONS = (
+        sympy.exp, sympy.sin, sympy.cos, sympy.sinh, sympy.cosh, sympy.tanh, sympy.atan,
+        sympy.asinh, sympy.erf, sympy.erfc, sympy.erfi, sympy.fresnels, sympy.fresnelc,
+        sympy.Si, sympy.Shi, sympy.Abs,
+    )
+    # Funciones cuya singularidad, salto o punto de rama está en los ceros de su argumento
+    _ZERO_SINGULAR_FUNCTIONS = (sympy.log, sympy.Ci, sympy.Chi, sympy.Ei, sympy.sign, sympy.Heaviside)
+
+    def _definite_from_antiderivative(self, antiderivative, a_expr, b_expr):
+        """
+        Evalúa F(b) - F(a) partiendo el intervalo en las discontinuidades y puntos de rama de F.
+        Devuelve None si no se puede garantizar que el resultado sea correcto
+        (antiderivada no elemental, saltos infinitos, límites simbólicos con singularidades...).
+        """
+        x = self.variable
+        if antiderivative.has(sympy.Integral, sympy.Piecewise):
+            return None
+
+        try:
+            if a_expr == b_expr:
+                return sympy.S.Zero
+
+            if not (a_expr.is_number and b_expr.is_number):
+                # Con límites simbólicos sólo es seguro si F no tiene ningún punto crítico
+                if self._critical_points(antiderivative, -sympy.oo, sympy.oo) != []:
+                    return None
+                return antiderivative.subs(x, b_expr) - antiderivative.subs(x, a_expr)
+
+            if not (a_expr.is_extended_real and b_expr.is_extended_real):
+                return None
+            sign = 1
+            lower, upper = a_expr, b_expr
+            if lower > upper:
+                lower, upper, sign = upper, lower, -1
+
+            critical = self._critical_points(antiderivative, lower, upper)
+            if critical is None:
+                return None
+
+            # Los extremos que son puntos críticos se evalúan con límites laterales
+            inner = [p for p in critical if lower < p < upper]
+            nodes = [lower, *inner, upper]
+            total = sympy.S.Zero
+            for left, right in zip(nodes[:-1], nodes[1:]):
+                right_value = self._one_sided_value(antiderivative, right, right in critical, '-')
+                left_value = self._one_sided_value(antiderivative, left, left in critical, '+')
+                if right_value is None or left_value is None:
+                    return None
+                total += right_value - left_value
+            return sign * total
+        except Exception:
+            return None
+
+    def _critical_points(self, expr, lower, upper):
+        """
+        Devuelve los puntos de [lower, upper] donde la expresión puede ser discontinua
+        (polos, saltos o puntos de rama), o None si no se pueden determinar.
+        """
+        x = self.variable
+        points = set()
+        for node in sympy.preorder_traversal(expr):
+            if not node.has(x) or node.is_Symbol or node.is_Add or node.is_Mul:
+                continue
+            if node.is_Pow:
+                base, exponent = node.args
+                if exponent.has(x):
+                    if not (base.is_number and base.is_positive):
+                        return None
+                    continue
+                if exponent.is_Integer and exponent >= 0:
+                    continue
+                # Polo (exponente negativo) o punto de rama (exponente fraccionario)
+                roots = self._real_roots(base, lower, upper)
+            elif isinstance(node, self._CONTINUOUS_FUNCTIONS):
+                continue
+            elif isinstance(node, self._ZERO_SINGULAR_FUNCTIONS):
+                roots = self._real_roots(node.args[0], lower, upper)
+            elif isinstance(node, (sympy.asin, sympy.acos)):
+                arg = node.args[0]
+                plus, minus = self._real_roots(arg - 1, lower, upper), self._real_roots(arg + 1, lower, upper)
+                roots = None if plus is None or minus is None else plus + minus
+            elif isinstance(node, (sympy.tan, sympy.sec)):
+                roots = self._periodic_zeros(node.args[0], sympy.pi / 2, lower, upper)
+            elif isinstance(node, (sympy.cot, sympy.csc)):
+                roots = self._periodic_zeros(node.args[0], sympy.S.Zero, lower, upper)
+            else:
+                return None
+            if roots is None:
+                return None
+            points.update(roots)
+        return sorted(points, key=lambda p: float(p))
+
+    def _real_roots(self, expr, lower, upper):
+        """Raíces reales de una expresión racional en x dentro de [lower, upper]."""
+        x = self.variable
+        roots = []
+        for part in sympy.fraction(sympy.together(expr)):
+            if not part.has(x):
+                continue
+            if not part.is_polynomial(x):
+                return None  # p. ej. log(x)^2: las raíces no se pueden aislar
+            poly = sympy.Poly(part, x)
+            if poly.free_symbols - {x}:
+                return None
+            roots.extend(r for r in poly.real_roots() if lower <= r <= upper)
+        return roots
+
+    def _periodic_zeros(self, arg, offset, lower, upper):
+        """Puntos de [lower, upper] donde arg = offset + n*pi, sólo para argumentos lineales en x."""
+        x = self.variable
+        if not arg.is_polynomial(x) or sympy.degree(arg, x) != 1:
+            return None
+        slope, intercept = sympy.Poly(arg, x).all_coeffs()
+        if slope.free_symbols or intercept.free_symbols or not (lower.is_finite and upper.is_finite):
+            return None
+        ends = sorted([float((slope * lower + intercept - offset) / sympy.pi),
+                       float((slope * upper + intercept - offset) / sympy.pi)])
+        return [(offset + n * sympy.pi - intercept) / slope
+                for n in range(math.ceil(ends[0]), math.floor(ends[1]) + 1)]
+
+    def _one_sided_value(self, antiderivative, point, is_critical, direction):
+        """Valor de F en un extremo; usa un límite lateral si el punto es infinito o crítico."""
+        if point.is_finite and not is_critical:
+            value = antiderivative.subs(self.variable, point)
+        else:
+            value = sympy.limit(antiderivative, self.variable, point, direction)
+        if not value.is_finite or value.has(sympy.nan, sympy.AccumBounds, sympy.zoo):
+            return None
+        return value
+
+    def warm_up(self):
+        """
+        Ejecuta una integración trivial para cargar los módulos perezosos de SymPy
+        (integración, lambdify, LaTeX) sin tocar el historial ni las cachés.
+        """
+        expr = InputParser.parse("x^2 + sin(x)", self._prepare_local_symbols(""))
+        antiderivative = integrate(expr, self.variable)
+        self._definite_from_antiderivative(antiderivative, sympy.S.Zero, sympy.S.One)
+        KernelCompiler.build(expr, (self.variable,))
+        latex(antiderivative)
+
+    def _constants_signature(self, constants_str: str) -> tuple:
+        """Nombres de constantes declaradas, normalizados para usarlos como clave de caché."""
+        if not constants_str:
+            return ()
+        names = {s.strip() for s in constants_str.split(',') if s.strip()}
+        return tuple(sorted(n for n in names if n not in self.known_symbols and n != str(self.variable)))
+
+    def _parse_cached(self, expression_str: str, constants_key: tuple, local_symbols: dict,
+                      instrumentation=NULL_INSTRUMENTATION):
+        # La misma cadena con las mismas constantes siempre produce la misma expresión
+        key = ResultCache.make_key(expression_str.replace(" ", ""), constants_key)
+        expr = self.parse_cache.get(key)
+        if expr is None:
+            expr = InputParser.parse(expression_str, local_symbols, instrumentation)
+            self.parse_cache.put(key, expr, persist=False)
+        return expr
+
+    def _numeric_function(self, func_expr):
+        return self.compiler.compile(func_expr, (self.variable,))
+
+    def _integrate(self, func_expr, a_expr, b_expr, numeric_func, can_fill_area, started,
+                   instrumentation=NULL_INSTRUMENTATION, digits: int = None, symbolic_key: str = None,
+                   time_budget: float = None) -> dict:
+        """
+        Resuelve la integral (simbólica y numérica en paralelo) y prepara su representación LaTeX.
+        Con 'digits' el resultado se da con esa precisión: evalf para las formas cerradas y,
+        si no la hay, cuadratura de NumPy hasta 15 dígitos o mpmath por encima.
+        'time_budget' sustituye a self.time_budget sólo en esta llamada.
+        Con límites infinitos la cola se clasifica y se suma por tramos; que diverge sólo se
+        informa si SymPy no da forma cerrada dentro del plazo.
+        """
+        # La forma simbólica no depende de la precisión: se reutiliza entre niveles
+        cached_symbolic = self.symbolic_cache.get(symbolic_key) if symbolic_key is not None else None
+        use_double = digits is None or digits <= NumericIntegrator.DOUBLE_DIGITS
+        budget = self.time_budget if time_budget is None else time_budget
+
+        symbolic_future = None
+        if cached_symbolic is None and symbolic_key is not None:
+            with self._symbolic_pending_lock:
+                symbolic_future = self._symbolic_pending.get(symbolic_key)
+        if cached_symbolic is None and symbolic_future is None:
+            if instrumentation.profiling:
+                # cProfile sólo ve el hilo actual: al perfilar, la vía simbólica corre aquí mismo
+                symbolic_future = Future()
+                try:
+                    symbolic_future.set_result(self._symbolic_integrals(func_expr, a_expr, b_expr, instrumentation))
+                except Exception as exc:
+                    symbolic_future.set_exception(exc)
+            else:
+                # La vía simbólica corre en segundo plano mientras se calcula la cuadratura numérica.
+                symbolic_future = self._run_in_background(self._symbolic_integrals, func_expr, a_expr, b_expr,
+                                                          instrumentation)
+            if symbolic_key is not None:
+                # La forma simbólica se guarda al terminar, aunque esta llamada ya haya respondido
+                with self._symbolic_pending_lock:
+                    self._symbolic_pending[symbolic_key] = symbolic_future
+                symbolic_future.add_done_callback(functools.partial(self._symbolic_done, symbolic_key))
+
+        cached_closed_form = cached_symbolic is not None and cached_symbolic[0] is not None \
+            and not cached_symbolic[0].has(sympy.Integral)
+        numeric = None
+        improper = None
+        if can_fill_area and not (a_expr.is_finite and b_expr.is_finite):
+            # La clasificación también da la ventana finita en la que se grafica la integral
+            try:
+                with instrumentation.stage("improper"):
+                    improper = self.improper_integrator.integrate(numeric_func, float(a_expr), float(b_expr))
+            except Exception:
+                improper = None
+            if improper is not None and not cached_closed_form and use_double \
+                    and improper["behaviour"] == "converge" and math.isfinite(improper["value"]):
+                numeric = improper
+        elif not cached_closed_form and use_double and can_fill_area:
+            try:
+                with instrumentation.stage("quadrature"):
+                    numeric = self.numeric_integrator.integrate(numeric_func, float(a_expr), float(b_expr))
+            except Exception:
+                numeric = None
+            if numeric is not None and not math.isfinite(numeric["value"]):
+                numeric = None
+
+        integral_def, integral_indef = cached_symbolic or (None, None)
+        symbolic_error = None
+        # Sin la respuesta de SymPy (plazo vencido o no esperada) el resultado es provisional:
+        # con más tiempo podría llegar la forma cerrada, así que no se guarda en caché
+        provisional = False
+        if symbolic_future is not None and numeric and numeric["converged"] and not self.prefer_exact \
+                and not symbolic_future.done():
+            provisional = True
+        elif symbolic_future is not None:
+            remaining = max(0.0, budget - (time.monotonic() - started))
+            try:
+                with instrumentation.stage("symbolic_wait"):
+                    integral_def, integral_indef = symbolic_future.result(timeout=remaining)
+            except SymbolicSaturated as exc:
+                provisional = True
+                symbolic_error = exc
+            except FutureTimeoutError:
+                provisional = True
+                symbolic_error = TimeoutError(
+                    f"La integración simbólica superó el límite de {budget:g} s "
+                    "y no hay resultado numérico disponible.")
+            except Exception as exc:
+                symbolic_error = exc
+
+        closed_form = integral_def is not None and not integral_def.has(sympy.Integral)
+        behaviour = improper["behaviour"] if improper is not None else None
+        if not closed_form and behaviour == "diverge":
+            # Sin forma cerrada a tiempo, se da el veredicto de los tramos de la cola
+            return self._divergent_result(func_expr, improper, digits, provisional)
+        if not closed_form and numeric is None and behaviour == "oscila":
+            # mpmath daría un valor sin sentido para una cola que no se amortigua
+            raise ValueError("La integral no parece converger: el integrando oscila sin amortiguarse en el infinito.")
+        if not closed_form and numeric is None:
+            # Sin forma cerrada ni cuadratura de doble precisión: mpmath, si la integral es numérica
+            with instrumentation.stage("mpmath"):
+                numeric = self._arbitrary_precision(func_expr, a_expr, b_expr, digits or 10)
+        elif not closed_form and numeric["method"] == "improper" and not numeric["converged"]:
+            # Cola lenta: el resto extrapolado no da una cota fiable, se prueba mpmath
+            # y, si tampoco converge, se mantiene la suma por tramos con su error
+            try:
+                with instrumentation.stage("mpmath"):
+                    numeric = self._arbitrary_precision(func_expr, a_expr, b_expr, digits or 10) or numeric
+            except ValueError:
+                pass
+
+        if integral_def is not None and (numeric is None or closed_form):
+            with instrumentation.stage("evalf"):
+                if digits is None:
+                    defined_result_eval = integral_def.evalf(n=10) if integral_def.is_Number else integral_def
+                    error_estimate = 0.0
+                elif closed_form and integral_def.is_number:
+                    defined_result_eval = integral_def.evalf(n=digits)
+                    # evalf garantiza los dígitos pedidos: el error es el de redondeo
+                    error_estimate = float(abs(defined_result_eval)) * 10.0 ** (1 - digits)
+                else:
+                    defined_result_eval, error_estimate = integral_def, 0.0
+            method = "symbolic"
+            instrumentation.size("antiderivative", integral_indef)
+        elif numeric is not None:
+            # Sin forma cerrada a tiempo: se usa el valor de la cuadratura
+            defined_result_eval = sympy.Float(numeric["value"], digits or 10)
+            method, error_estimate = numeric["method"], numeric["error"]
+        else:
+            raise symbolic_error
+
+        instrumentation.size("result", defined_result_eval)
+        with instrumentation.stage("latex"):
+            return {
+                "defined_integral": defined_result_eval,
+                "indefinite_integral": integral_indef,
+                "method": method,
+                "error_estimate": error_estimate,
+                "digits": digits,
+                "divergent": bool(closed_form and integral_def.is_infinite),
+                "provisional": provisional and method != "symbolic",
+                "plot_window": improper["window"] if improper is not None else None,
+                "func_latex": latex(func_expr),
+                "defined_latex": latex(defined_result_eval),
+                "indefinite_latex": latex(integral_indef) if integral_indef is not None else None,
+            }
+
+    @staticmethod
+    def _divergent_result(func_expr, improper: dict, digits: int = None, provisional: bool = False) -> dict:
+        """Resultado de una integral impropia que, según sus tramos, diverge hacia +∞ o -∞."""
+        value = sympy.oo if improper["value"] > 0 else -sympy.oo
+        return {
+            "defined_integral": value,
+            "indefinite_integral": None,
+            "method": improper["method"],
+            "error_estimate": improper["error"],
+            "digits": digits,
+            "divergent": True,
+            "provisional": provisional,
+            "plot_window": improper["window"],
+            "func_latex": latex(func_expr),
+            "defined_latex": latex(value),
+            "indefinite_latex": None,
+        }
+
+    def _arbitrary_precision(self, func_expr, a_expr, b_expr, digits: int):
+        """
+        Cuadratura de mpmath a 'digits' dígitos, partiendo el intervalo en los puntos críticos.
+        Devuelve None si la integral no es numérica (constantes libres) o mpmath falla.
+        """
+        x = self.variable
+        if func_expr.free_symbols - {x} or not (a_expr.is_number or a_expr.is_infinite) \
+                or not (b_expr.is_number or b_expr.is_infinite):
+            return None
+        key = ResultCache.make_key(func_expr, "mpmath")
+        mp_func = self.numeric_cache.get(key)
+        if mp_func is None:
+            mp_func = lambdify(x, func_expr, modules=['mpmath'])
+            self.numeric_cache.put(key, mp_func, persist=False)
+
+        import mpmath
+
+        def to_mpmath(value):
+            if value is sympy.oo:
+                return mpmath.inf
+            if value is -sympy.oo:
+                return -mpmath.inf
+            return sympy.Float(value.evalf(digits + 10), digits + 10)
+
+        lower, upper = a_expr, b_expr
+        sign = 1
+        if (lower.is_infinite and lower.is_extended_positive) or (upper.is_infinite and upper.is_extended_negative) \
+                or (lower.is_finite and upper.is_finite and lower > upper):
+            lower, upper, sign = upper, lower, -1
+        interior = self._critical_points(func_expr, lower, upper) or []
+        points = [to_mpmath(lower)] + [to_mpmath(p) for p in sorted(interior, key=float)] + [to_mpmath(upper)]
+        try:
+            result = NumericIntegrator.arbitrary_precision(mp_func, points, digits)
+        except Exception:
+            return None
+        if not mpmath.isfinite(result["value"]):
+            return None
+        if not result["converged"]:
+            # Un valor sin los dígitos pedidos no se da por bueno (p. ej. colas oscilantes lentas)
+            raise ValueError(f"La cuadratura de mpmath no alcanzó {digits} dígitos: "
+                             f"error estimado {result['error']:.1e}.")
+        # Convertir a un Float de SymPy con la precisión pedida
+        result["value"] = sign * sympy.Float(mpmath.nstr(result["value"], digits + 5), digits)
+        return result
+
+    def calculate_integral(self, func_str: str, lower_limit_str: str, upper_limit_str: str, constants_str: str = "",
+                           digits: int = None, time_budget: float = None, record_history: bool = True):
+        """
+        Calcula la integral definida. 'digits' pide el resultado con esa cantidad de dígitos
+        significativos (p. ej. 15, 50 o 200); None conserva el formato estándar de 10 dígitos.
+        'time_budget' limita la espera simbólica de esta llamada (por defecto, self.time_budget).
+        Un resultado provisional lleva 'symbolic_key', con la que wait_for_symbolic espera a la
+        forma cerrada; con record_history=False no se anota en el historial (al mejorarlo, p. ej.).
+        """
+        if digits is not None and not 1 <= digits <= self.MAX_DIGITS:
+            return {"success": False, "error_message": f"La precisión debe estar entre 1 y {self.MAX_DIGITS} dígitos."}
+        instrumentation = Instrumentation(f"∫ {func_str} dx en [{lower_limit_str}, {upper_limit_str}]",
+                                          self.sinks) if self.instrument else NULL_INSTRUMENTATION
         try:
+            started = time.monotonic()
+
             # 1. Crear el entorno de símbolos completo
-            local_symbols = self._prepare_local_symbols(constants_str)
+            with instrumentation.stage("symbols"):
+                local_symbols = self._prepare_local_symbols(constants_str)
+                constants_key = self._constants_signature(constants_str)
 
             # 2. Parsear las expresiones
-            func_expr = InputParser.parse(func_str, local_symbols)
-            a_expr = InputParser.parse(lower_limit_str, local_symbols)
-            b_expr = InputParser.parse(upper_limit_str, local_symbols)
+            with instrumentation.stage("parse"):
+                func_expr = self._parse_cached(func_str, constants_key, local_symbols, instrumentation)
+                a_expr = self._parse_cached(lower_limit_str, constants_key, local_symbols, instrumentation)
+                b_expr = self._parse_cached(upper_limit_str, constants_key, local_symbols, instrumentation)
+            instrumentation.size("function", func_expr)
 
             # --- 3. Lógica de Graficación ---
             can_plot_function = not func_expr.free_symbols - {self.variable}
@@ -53,34 +596,156 @@ class CalculatorEngine:
 
             numeric_func = None
             if can_plot_function:
-                numeric_func = lambdify(self.variable, func_expr, modules=['numpy', {'ln': sympy.log}])
+                with instrumentation.stage("lambdify"):
+                    numeric_func = self._numeric_function(func_expr)
 
-            # --- 4. Integración ---
-            integral_def = integrate(func_expr, (self.variable, a_expr, b_expr))
-            integral_indef = integrate(func_expr, self.variable)
+            # --- 4. Integración (reutilizando resultados de expresiones equivalentes) ---
+            # Cada nivel de precisión tiene su entrada; la forma simbólica se comparte entre niveles
+            with instrumentation.stage("cache_lookup"):
+                symbolic_key = ResultCache.make_key(func_expr, a_expr, b_expr, constants_key)
+                key = symbolic_key if digits is None else ResultCache.make_key(symbolic_key, digits)
+                integral = self.result_cache.get(key)
+                if integral is None and digits is not None:
+                    integral = self._from_higher_precision(symbolic_key, digits)
+            if integral is None:
+                integral = self._integrate(func_expr, a_expr, b_expr, numeric_func, can_fill_area, started,
+                                           instrumentation, digits=digits, symbolic_key=symbolic_key,
+                                           time_budget=time_budget)
+                if not integral.get("provisional"):
+                    self.result_cache.put(key, integral)
+                    if digits is not None:
+                        self._precision_levels.setdefault(symbolic_key, set()).add(digits)
 
-            defined_result_eval = integral_def.evalf(n=10) if integral_def.is_Number else integral_def
+            if record_history:
+                with instrumentation.stage("history"):
+                    self.add_to_history(func_str, str(a_expr), str(b_expr), integral["defined_latex"],
+                                        constants_str, self._numeric_value(integral["defined_integral"]))
 
-            self.add_to_history(func_str, str(a_expr), str(b_expr), defined_result_eval, constants_str)
-
-            return {
+            result = {
                 "success": True, "func_expr": func_expr, "numeric_func": numeric_func,
                 "a": float(a_expr) if a_expr.is_number else 0,
                 "b": float(b_expr) if b_expr.is_number else 0,
                 "can_fill_area": can_fill_area,
-                "defined_integral": defined_result_eval,
-                "indefinite_integral": integral_indef
+                **integral
             }
+            if integral.get("provisional"):
+                result["symbolic_key"] = symbolic_key
+            record = instrumentation.finish()
+            if record is not None:
+                result["instrumentation"] = record
+            return result
 
+        except Exception as e:
+            result = {"success": False, "error_message": str(e)}
+            record = instrumentation.finish(status="error")
+            if record is not None:
+                result["instrumentation"] = record
+            return result
+
+    def _from_higher_precision(self, symbolic_key: str, digits: int):
+        """Reutiliza un resultado numérico ya calculado con más dígitos, redondeándolo."""
+        for level in sorted(self._precision_levels.get(symbolic_key, ())):
+            if level < digits:
+                continue
+            cached = self.result_cache.get(ResultCache.make_key(symbolic_key, level))
+            if cached is None or not cached["defined_integral"].is_Number:
+                continue
+            if cached.get("divergent"):
+                return {**cached, "digits": digits}
+            value = sympy.Float(cached["defined_integral"], digits)
+            return {**cached, "defined_integral": value, "defined_latex": latex(value), "digits": digits,
+                    "error_estimate": max(cached["error_estimate"], float(abs(value)) * 10.0 ** (1 - digits))}
+        return None
+
+    def calculate_batch(self, jobs, max_workers: int = None, chunksize: int = 16, ordered: bool = True):
+        """
+        Calcula muchas integrales en paralelo con un pool de procesos.
+        Genera pares (índice, resultado) con el mismo formato que calculate_integral,
+        salvo 'numeric_func', que no se puede transferir entre procesos.
+        """
+        from .batch import BatchIntegrator
+
+        runner = BatchIntegrator(max_workers=max_workers, chunksize=chunksize, time_budget=self.time_budget)
+        yield from runner.run(jobs, ordered=ordered)
+
+    def calculate_sweep(self, func_str: str, lower_limit_str: str, upper_limit_str: str, constants_str: str,
+                        values: dict, grid: bool = False, time_budget: float = None) -> dict:
+        """
+        Evalúa la integral para arrays de valores de las constantes.
+        'values' asocia cada nombre de constante con un array; con grid=True se
+        evalúa el producto cartesiano de todos ellos. Los resultados son arrays de NumPy;
+        'singular' marca los puntos con un polo en el intervalo, cuyo valor es NaN.
+        'time_budget' limita la espera simbólica como en calculate_integral.
+        """
+        try:
+            return ParameterSweep(self).run(func_str, lower_limit_str, upper_limit_str, constants_str,
+                                            values, grid=grid, time_budget=time_budget)
+        except Exception as e:
+            return {"success": False, "error_message": str(e)}
+
+    def calculate_multiple_integral(self, func_str: str, limits, constants_str: str = "") -> dict:
+        """
+        Integral doble o triple de f(x, y[, z]). 'limits' da los pares (inferior, superior) de la
+        variable exterior a la interior: [(a, b), (c(x), d(x))] o con un tercer par (e(x, y), f(x, y)).
+        El resultado incluye 'evaluations', el número de evaluaciones del integrando de la cubatura.
+        """
+        try:
+            return MultipleIntegral(self).run(func_str, limits, constants_str)
         except Exception as e:
             return {"success": False, "error_message": str(e)}
 
-    def add_to_history(self, func_str, a, b, result, constants):
-        # Usar LaTeX para un formato más bonito
-        result_str = str(latex(result))
-        self.history.append({
-            "function": func_str, "lower_limit": a, "upper_limit": b,
-            "constants": constants, "result": result_str})
+    def preview_integral(self, func_str: str, lower_limit_str: str = "", upper_limit_str: str = "",
+                         constants_str: str = "", cancelled=None):
+        """
+        Vista previa barata para mientras se escribe: LaTeX de f(x), kernel numérico y una
+        estimación de la integral sin vía simbólica. Devuelve None si 'cancelled()' la descarta.
+        """
+        try:
+            return LivePreview(self).run(func_str, lower_limit_str, upper_limit_str, constants_str, cancelled)
+        except PreviewCancelled:
+            return None
+        except Exception as e:
+            return {"success": False, "error_message": str(e)}
+
+    def cache_stats(self) -> dict:
+        """Contadores de aciertos, fallos y expulsiones de cada nivel de caché."""
+        return {"parse": self.parse_cache.stats(), "numeric": self.numeric_cache.stats(),
+                "results": self.result_cache.stats(), "symbolic": self.symbolic_cache.stats(),
+                "kernels": self.compiler.cache.stats()}
+
+    def invalidate_cache(self):
+        """Vacía todas las cachés, incluida la persistente en disco."""
+        self.parse_cache.invalidate()
+        self.numeric_cache.invalidate()
+        self.compiler.cache.invalidate()
+        self.result_cache.invalidate()
+        self.symbolic_cache.invalidate()
+        self._precision_levels.clear()
+
+    @staticmethod
+    def _numeric_value(expr):
+        """Valor real de un resultado numérico, o None (se guarda para ordenar el historial)."""
+        if isinstance(expr, sympy.Basic) and expr.is_number:
+            try:
+                value = float(expr)
+            except TypeError:
+                return None
+            return value if math.isfinite(value) else None
+        return None
+
+    def add_to_history(self, func_str, a, b, result_str, constants, numeric_value=None):
+        # El resultado llega ya en LaTeX para un formato más bonito; se escribe en segundo plano
+        self.history.add(func_str, a, b, str(result_str), constants, numeric_value)
+
+    def get_history(self, search: str = None, order_by: str = "created_at", descending: bool = True,
+                    limit: int = 100, offset: int = 0, wait: bool = True, **filters) -> list:
+        """
+        Consulta paginada del historial (por defecto, los 100 cálculos más recientes).
+        Acepta los filtros de HistoryStore.query: function, since y until. Con wait=False
+        sólo se leen las entradas ya escritas, sin esperar al hilo que las guarda.
+        """
+        return self.history.query(search=search, order_by=order_by, descending=descending,
+                                  limit=limit, offset=offset, wait=wait, **filters)
 
-    def get_history(self):
-        return self.history
\ No newline at end of file
+    def history_count(self, search: str = None, wait: bool = True, **filters) -> int:
+        return self.history.count(search=search, wait=wait, **filters)
@@ -0,0 +1,158 @@
+# core/cli.py
+
+import argparse
+import itertools
+import json
+import sys
+
+from .batch import BatchIntegrator
+from .calculator import CalculatorEngine
+from .serialization import result_to_dict
+
+# Número de trabajos que se leen por bloque al usar varios procesos
+STREAM_WINDOW = 1000
+
+
+def _parse_job(line: str):
+    """Convierte una línea JSON (objeto o lista) en un trabajo validado para el motor."""
+    return BatchIntegrator.normalize_job(json.loads(line))
+
+
+def _read_jobs(stream):
+    """Genera (trabajo, error) por cada línea no vacía; las líneas inválidas no detienen la lectura."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield _parse_job(line), None
+        except json.JSONDecodeError as e:
+            yield None, {"success": False, "error_message": f"Línea JSON inválida: {e}"}
+        except KeyError as e:
+            yield None, {"success": False, "error_message": f"Trabajo inválido: falta el campo {e}"}
+        except ValueError as e:
+            yield None, {"success": False, "error_message": str(e)}
+
+
+def _run_sequential(engine, jobs):
+    for index, (job, error) in enumerate(jobs):
+        if error is not None:
+            yield index, error
+            continue
+        try:
+            result = engine.calculate_integral(*job)
+        except Exception as e:
+            # Un trabajo que falla no detiene el resto del lote
+            result = {"success": False, "error_message": str(e)}
+        result.pop("numeric_func", None)
+        yield index, result
+
+
+def _run_parallel(engine, jobs, workers: int, ordered: bool):
+    """
+    Procesa la entrada por ventanas para mantener la memoria acotada. Todas las ventanas
+    usan el mismo pool de procesos: los motores de los procesos (y sus cachés) se conservan.
+    """
+    runner = BatchIntegrator(max_workers=workers, time_budget=engine.time_budget)
+    with runner.executor() as executor:
+        yield from _run_windows(runner, executor, jobs, ordered)
+
+
+def _run_windows(runner, executor, jobs, ordered: bool):
+    offset = 0
+    jobs = iter(jobs)
+    while True:
+        window = list(itertools.islice(jobs, STREAM_WINDOW))
+        if not window:
+            break
+        errors = {i: error for i, (_, error) in enumerate(window) if error is not None}
+        valid = [(i, job) for i, (job, error) in enumerate(window) if error is None]
+        for i, error in errors.items():
+            if not ordered:
+                yield offset + i, error
+
+        results = dict((i, error) for i, error in errors.items()) if ordered else {}
+        batch = runner.run([job for _, job in valid], ordered=ordered, executor=executor)
+        next_index = 0
+        for batch_index, result in batch:
+            index = valid[batch_index][0]
+            if not ordered:
+                yield offset + index, result
+                continue
+            results[index] = result
+            while next_index in results:
+                yield offset + next_index, results.pop(next_index)
+                next_index += 1
+        while ordered and next_index < len(window):
+            yield offset + next_index, results.pop(next_index)
+            next_index += 1
+        offset += len(window)
+
+
+def _format_text(index: int, data: dict) -> str:
+    if not data.get("success"):
+        return f"[{index}] ERROR: {data.get('error_message')}"
+    return f"[{index}] {data['func_expr']} -> {data['defined_integral']} ({data['method']})"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Calculadora de integrales definidas sin interfaz gráfica. "
+                    "Acepta una integral por argumentos o líneas JSON por archivo o stdin.")
+    parser.add_argument("function", nargs="?", help="Función a integrar, ej: 'x^2'. Use '-' para leer de stdin.")
+    parser.add_argument("lower_limit", nargs="?", help="Límite inferior")
+    parser.add_argument("upper_limit", nargs="?", help="Límite superior")
+    parser.add_argument("-c", "--constants", default="", help="Constantes simbólicas separadas por comas")
+    parser.add_argument("-f", "--file", help="Archivo JSONL con un trabajo por línea")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Número de procesos (1 = secuencial)")
+    parser.add_argument("-t", "--timeout", type=float, default=5.0,
+                        help="Segundos de espera para la vía simbólica por integral")
+    parser.add_argument("--format", choices=("jsonl", "json", "text"), default="jsonl", help="Formato de salida")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Emitir los resultados en cuanto terminan, sin respetar el orden de entrada")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    engine = CalculatorEngine(time_budget=args.timeout)
+
+    source = None
+    if args.file:
+        source = open(args.file, encoding="utf-8")
+        jobs = _read_jobs(source)
+    elif args.function and args.function != "-":
+        if args.lower_limit is None or args.upper_limit is None:
+            print("Error: se requieren la función y ambos límites.", file=sys.stderr)
+            return 2
+        jobs = iter([((args.function, args.lower_limit, args.upper_limit, args.constants), None)])
+    else:
+        jobs = _read_jobs(sys.stdin)
+
+    if args.workers > 1:
+        results = _run_parallel(engine, jobs, args.workers, ordered=not args.unordered)
+    else:
+        results = _run_sequential(engine, jobs)
+
+    failures = 0
+    collected = []
+    try:
+        for index, result in results:
+            data = result_to_dict(result)
+            data["index"] = index
+            failures += not data.get("success")
+            if args.format == "json":
+                collected.append(data)
+            elif args.format == "text":
+                print(_format_text(index, data), flush=True)
+            else:
+                print(json.dumps(data, ensure_ascii=False), flush=True)
+    finally:
+        if source is not None:
+            source.close()
+
+    if args.format == "json":
+        json.dump(collected, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 1 if failures else 0
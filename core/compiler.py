@@ -0,0 +1,246 @@
+# core/compiler.py
+
+import threading
+
+import numpy as np
+import sympy
+from sympy import lambdify
+
+from .cache import ResultCache
+
+# Funciones de SymPy con ufunc equivalente en NumPy
+_UFUNCS = {
+    sympy.sin: "sin", sympy.cos: "cos", sympy.tan: "tan", sympy.exp: "exp", sympy.log: "log",
+    sympy.asin: "arcsin", sympy.acos: "arccos", sympy.atan: "arctan",
+    sympy.sinh: "sinh", sympy.cosh: "cosh", sympy.tanh: "tanh",
+    sympy.asinh: "arcsinh", sympy.acosh: "arccosh", sympy.atanh: "arctanh",
+    sympy.Abs: "absolute", sympy.sign: "sign", sympy.floor: "floor", sympy.ceiling: "ceil",
+}
+# Recíprocas: sec(u) = 1/cos(u), etc.
+_RECIPROCALS = {sympy.sec: "cos", sympy.csc: "sin", sympy.cot: "tan"}
+
+
+class _Unsupported(Exception):
+    """La expresión tiene nodos sin traducción directa a ufuncs (se usa lambdify)."""
+
+
+class _KernelWriter:
+    """
+    Traduce una expresión (ya pasada por CSE) a una secuencia de llamadas a ufuncs de NumPy
+    con 'out=': cada resultado intermedio va a un buffer preasignado y los buffers se
+    reutilizan en cuanto nadie tiene ya una referencia a su valor.
+    """
+
+    def __init__(self, arg_names: dict):
+        self.arg_names = arg_names  # símbolo -> nombre del parámetro
+        self.lines = []
+        self.free = []
+        self.buffers = 0
+        self.values = {}  # símbolo de CSE -> operando
+        self.uses = {}    # símbolo de CSE -> usos pendientes
+        self.refs = {}    # buffer -> referencias vivas (operandos pendientes y valores de CSE)
+
+    def _allocate(self) -> str:
+        buffer = self.free.pop() if self.free else f"b[{self.buffers}]"
+        if buffer == f"b[{self.buffers}]":
+            self.buffers += 1
+        self.refs[buffer] = 1
+        return buffer
+
+    def _release(self, operand):
+        if operand in self.refs:
+            self.refs[operand] -= 1
+            if self.refs[operand] == 0:
+                del self.refs[operand]
+                self.free.append(operand)
+
+    def _consume(self, symbol):
+        self.uses[symbol] -= 1
+        operand = self.values[symbol]
+        if self.uses[symbol] == 0:
+            # El último uso se queda con la referencia del valor
+            del self.values[symbol]
+        elif operand in self.refs:
+            self.refs[operand] += 1
+        return operand
+
+    def _call(self, ufunc: str, *operands, out: str = None) -> str:
+        for operand in operands:
+            self._release(operand)
+        out = out or self._allocate()
+        self.lines.append(f"np.{ufunc}({', '.join(operands)}, out={out})")
+        return out
+
+    def emit(self, expr, out: str = None) -> str:
+        """Genera el código de 'expr' y devuelve el operando con su valor."""
+        if expr in self.values:
+            operand = self._consume(expr)
+            if out is None:
+                return operand
+            self.lines.append(f"np.copyto({out}, {operand})")
+            self._release(operand)
+            return out
+        if expr in self.arg_names:
+            if out is None:
+                return self.arg_names[expr]
+            self.lines.append(f"np.copyto({out}, {self.arg_names[expr]})")
+            return out
+        if expr.is_number:
+            if not expr.is_real:
+                raise _Unsupported(expr)
+            value = float(expr)
+            value = repr(value) if np.isfinite(value) else f"np.float64('{value}')"
+            if out is None:
+                return value
+            self.lines.append(f"{out}.fill({value})")
+            return out
+        if expr.is_Add:
+            return self._chain("add", expr.args, out)
+        if expr.is_Mul:
+            return self._mul(expr, out)
+        if expr.is_Pow:
+            return self._pow(expr.base, expr.exp, out)
+        if expr.func in _UFUNCS and len(expr.args) == 1:
+            return self._call(_UFUNCS[expr.func], self.emit(expr.args[0]), out=out)
+        if expr.func in _RECIPROCALS and len(expr.args) == 1:
+            inner = self._call(_RECIPROCALS[expr.func], self.emit(expr.args[0]))
+            return self._call("divide", "1.0", inner, out=out)
+        raise _Unsupported(expr)
+
+    def _chain(self, ufunc: str, args, out) -> str:
+        # Las constantes primero: así sólo se combinan una vez con el primer término
+        args = sorted(args, key=lambda arg: not arg.is_number)
+        if len(args) == 1:
+            return self.emit(args[0], out)
+        result = self._call(ufunc, self.emit(args[0]), self.emit(args[1]), out=out if len(args) == 2 else None)
+        for index, arg in enumerate(args[2:], start=3):
+            operand = self.emit(arg)
+            # Las ufuncs admiten que la salida sea una de las entradas: el buffer se reutiliza
+            result = self._call(ufunc, result, operand, out=out if index == len(args) else None)
+        return result
+
+    def _mul(self, expr, out) -> str:
+        # Factores con exponente negativo como divisiones: x*y/z en lugar de x*y*z**-1
+        numerator, denominator = [], []
+        for factor in expr.args:
+            if factor.is_Pow and factor.exp.is_number and factor.exp.is_negative:
+                denominator.append(factor.base ** -factor.exp)
+            else:
+                numerator.append(factor)
+        if numerator == [sympy.S.NegativeOne] and not denominator:
+            return self.emit(sympy.S.NegativeOne, out)
+        if not denominator:
+            if numerator[0] is sympy.S.NegativeOne:
+                return self._call("negative", self._chain("multiply", numerator[1:], None), out=out)
+            return self._chain("multiply", numerator, out)
+        top = self._chain("multiply", numerator, None) if numerator else "1.0"
+        bottom = self._chain("multiply", denominator, None)
+        return self._call("divide", top, bottom, out=out)
+
+    def _pow(self, base, exponent, out) -> str:
+        if exponent == 2:
+            return self._call("square", self.emit(base), out=out)
+        if exponent == sympy.S.Half:
+            return self._call("sqrt", self.emit(base), out=out)
+        if exponent == -1:
+            return self._call("divide", "1.0", self.emit(base), out=out)
+        if exponent == -sympy.S.Half:
+            return self._call("divide", "1.0", self._call("sqrt", self.emit(base)), out=out)
+        return self._call("power", self.emit(base), self.emit(exponent), out=out)
+
+
+class Kernel:
+    """
+    Función numérica compilada. Se llama como la de lambdify, con arrays de NumPy o
+    escalares; 'out' permite escribir el resultado en un array del llamador. Los
+    resultados intermedios usan buffers propios de cada hilo, reutilizados entre llamadas.
+    """
+
+    def __init__(self, expr, args, source: str = None, function=None, buffers: int = 0):
+        self.expr = expr
+        self.args = tuple(args)
+        self.source = source
+        self._function = function
+        self._buffers = buffers
+        self._local = threading.local()
+
+    @property
+    def vectorised(self) -> bool:
+        """False si la expresión no se pudo traducir a ufuncs y se usa lambdify con CSE."""
+        return self.source is not None
+
+    def _scratch(self, shape) -> list:
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None or scratch[0] != shape:
+            scratch = (shape, [np.empty(shape) for _ in range(self._buffers)])
+            self._local.scratch = scratch
+        return scratch[1]
+
+    def __call__(self, *values, out=None):
+        if self.source is None:
+            return self._function(*values)
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast_shapes(*(array.shape for array in arrays)) if arrays else ()
+        if out is not None:
+            return self._function(*arrays, out, self._scratch(shape))
+        result = self._function(*arrays, np.empty(shape), self._scratch(shape))
+        # Con escalares se devuelve un escalar, como lambdify, y no un array 0-d
+        return result[()] if shape == () else result
+
+    def __reduce__(self):
+        # Se recompila al deserializar (p. ej. al enviarlo a otro proceso)
+        return (KernelCompiler.build, (self.expr, self.args))
+
+
+class KernelCompiler:
+    """
+    Compila expresiones de SymPy a kernels de NumPy: elimina subexpresiones comunes (CSE)
+    y genera código que encadena ufuncs escribiendo en buffers preasignados. Los kernels se
+    guardan por expresión, así que la gráfica, la cuadratura y los barridos comparten el mismo.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.cache = ResultCache(max_entries=max_entries, max_bytes=8 * 1024 * 1024)
+
+    def compile(self, expr, args) -> Kernel:
+        args = tuple(args) if isinstance(args, (list, tuple)) else (args,)
+        key = ResultCache.make_key(expr, *args)
+        kernel = self.cache.get(key)
+        if kernel is None:
+            kernel = self.build(expr, args)
+            self.cache.put(key, kernel, persist=False)
+        return kernel
+
+    @staticmethod
+    def build(expr, args) -> Kernel:
+        expr = sympy.sympify(expr)
+        names = {symbol: f"a{index}" for index, symbol in enumerate(args)}
+        try:
+            return KernelCompiler._generate(expr, args, names)
+        except _Unsupported:
+            function = lambdify(args, expr, modules=['numpy', {'ln': sympy.log}], cse=True)
+            return Kernel(expr, args, function=function)
+
+    @staticmethod
+    def _generate(expr, args, names) -> Kernel:
+        replacements, (reduced,) = sympy.cse(expr)
+        writer = _KernelWriter(names)
+        for symbol, _ in replacements:
+            writer.uses[symbol] = 0
+        for node in [value for _, value in replacements] + [reduced]:
+            for sub in sympy.preorder_traversal(node):
+                if sub in writer.uses:
+                    writer.uses[sub] += 1
+        for symbol, value in replacements:
+            if writer.uses[symbol]:
+                writer.values[symbol] = writer.emit(value)
+
+        result = writer.emit(reduced, out="out")
+        body = writer.lines
+        if result != "out":
+            body.append(f"np.copyto(out, {result})")
+        params = ", ".join(list(names.values()) + ["out", "b"])
+        source = f"def kernel({params}):\n" + "".join(f"    {line}\n" for line in body) + "    return out\n"
+        namespace = {"np": np}
+        exec(compile(source, f"<kernel {expr}>", "exec"), namespace)
+        return Kernel(expr, args, source=source, function=namespace["kernel"], buffers=writer.buffers)
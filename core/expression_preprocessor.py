@@ -1,6 +1,6 @@
 #core/expression_preprocessor.py
 
-import re
+from .tokenizer import Tokenizer
 
 class ExpressionPreprocessor:
     """
@@ -8,32 +8,14 @@ class ExpressionPreprocessor:
     antes de pasarlos al parser de SymPy.
     """
     @staticmethod
-    def preprocess(expression: str) -> str:
+    def preprocess(expression: str, known_symbols: dict = None) -> str:
         """
         Preprocesa una expresión matemática para manejar casos especiales.
+        En una sola pasada inserta la multiplicación implícita (2x, 2sin(x), (x+1)(x-1)),
+        traduce '^' a '**' y reconoce los nombres de la tabla de símbolos.
+        Lanza ExpressionSyntaxError con la posición del error si la entrada no es válida.
         """
         if not expression.strip():
             return expression
 
-        # 1. Eliminar espacios en blanco
-        expr = expression.replace(" ", "")
-
-        # 2. Patrones para multiplicación implícita
-        patterns = [
-            # Número seguido de x: 2x -> 2*x
-            (r'(\d+)([x])', r'\1*\2'),
-            # Número seguido de función trigonométrica: 2sin -> 2*sin
-            (r'(\d+)(sin|cos|tan|exp|ln|sqrt)', r'\1*\2'),
-            # Número seguido de constante: 2pi -> 2*pi
-            (r'(\d+)(pi|e)', r'\1*\2'),
-            # Número seguido de paréntesis: 2(x) -> 2*(x)
-            (r'(\d+)(\()', r'\1*\2'),
-            # Paréntesis seguido de número o variable: (2)x -> (2)*x
-            (r'(\))(\d+|x|sin|cos|tan|exp|ln|sqrt|pi|e)', r'\1*\2')
-        ]
-
-        # Aplicar cada patrón de reemplazo
-        for pattern, replacement in patterns:
-            expr = re.sub(pattern, replacement, expr)
-
-        return expr
\ No newline at end of file
+        return Tokenizer.from_symbols(known_symbols).translate(expression)
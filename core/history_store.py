@@ -0,0 +1,242 @@
+# core/history_store.py
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+_COLUMNS = ("id", "created_at", "function", "lower_limit", "upper_limit", "constants", "result", "numeric_value")
+
+# Columnas por las que se puede ordenar (la del resultado usa su valor numérico si lo tiene)
+_ORDER_BY = {
+    "id": "id",
+    "created_at": "created_at",
+    "function": "function COLLATE NOCASE",
+    "lower_limit": "lower_limit",
+    "upper_limit": "upper_limit",
+    "constants": "constants",
+    "result": "numeric_value, result",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    function TEXT NOT NULL,
+    lower_limit TEXT NOT NULL,
+    upper_limit TEXT NOT NULL,
+    constants TEXT NOT NULL DEFAULT '',
+    result TEXT NOT NULL,
+    numeric_value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_history_function ON history (function COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_history_created_at ON history (created_at);
+CREATE INDEX IF NOT EXISTS idx_history_result ON history (numeric_value, result);
+"""
+
+
+class HistoryStore:
+    """
+    Historial de cálculos en SQLite. Las inserciones se encolan y un hilo las escribe
+    por lotes en una sola transacción, así que registrar un cálculo nunca espera al disco.
+    Las consultas son paginadas y filtrables, y una política de retención limita el
+    número de entradas y su antigüedad. Con path=':memory:' el historial no se persiste.
+    """
+
+    def __init__(self, path: str = ":memory:", max_entries: int = 100_000, max_age_days: float = None,
+                 batch_size: int = 256, flush_interval: float = 0.5):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        if path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._writer = None
+        self._closed = False
+        self.written = 0
+        self.apply_retention()
+
+    # --- Escritura ---
+
+    def add(self, function: str, lower_limit: str, upper_limit: str, result: str, constants: str = "",
+            numeric_value: float = None):
+        """Encola una entrada; no bloquea."""
+        if self._closed:
+            return
+        if self._writer is None:
+            self._start_writer()
+        self._queue.put((time.time(), function, str(lower_limit), str(upper_limit), constants or "",
+                         str(result), numeric_value))
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            # Agrupar lo que llegue durante el intervalo, hasta el tamaño del lote
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            except sqlite3.Error as e:
+                print(f"Error al guardar el historial: {e}")
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: list):
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO history (created_at, function, lower_limit, upper_limit, constants, result, "
+                    "numeric_value) VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            self.written += len(batch)
+        self.apply_retention()
+
+    def flush(self):
+        """Espera a que se escriban todas las entradas encoladas."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def apply_retention(self):
+        """Borra las entradas más antiguas que max_age_days y las que exceden max_entries."""
+        with self._lock:
+            with self._conn:
+                if self.max_age_days is not None:
+                    cutoff = time.time() - self.max_age_days * 86400
+                    self._conn.execute("DELETE FROM history WHERE created_at < ?", (cutoff,))
+                if self.max_entries is not None:
+                    self._conn.execute(
+                        "DELETE FROM history WHERE id <= "
+                        "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM history")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    # --- Consultas ---
+
+    @staticmethod
+    def _where(search: str = None, function: str = None, since: float = None, until: float = None):
+        clauses, params = [], []
+        if search:
+            # Búsqueda de subcadena (sin distinguir mayúsculas) en la función y el resultado
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(function LIKE ? ESCAPE '\\' OR result LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        if function is not None:
+            clauses.append("function = ? COLLATE NOCASE")
+            params.append(function)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, search: str = None, function: str = None, since: float = None, until: float = None,
+              order_by: str = "created_at", descending: bool = True, limit: int = 100, offset: int = 0,
+              wait: bool = True) -> list:
+        """
+        Devuelve una página del historial como lista de diccionarios.
+        'search' filtra por subcadena de la función o el resultado; 'function' por igualdad;
+        'since'/'until' por marca de tiempo (segundos desde la época). limit=None devuelve todo.
+        Con wait=False no se espera a las entradas encoladas: se leen sólo las ya escritas,
+        sin bloquear (desde el hilo de la interfaz, p. ej.).
+        """
+        if order_by not in _ORDER_BY:
+            raise ValueError(f"No se puede ordenar el historial por '{order_by}'.")
+        if wait:
+            self.flush()
+        where, params = self._where(search, function, since, until)
+        direction = " DESC" if descending else ""
+        order = ", ".join(part + direction for part in _ORDER_BY[order_by].split(", "))
+        if order_by == "result":
+            # Los resultados sin valor numérico van siempre al final
+            order = "numeric_value IS NULL, " + order
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM history{where} ORDER BY {order}, id{direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_pages(self, page_size: int = 500, search: str = None, **filters):
+        """
+        Recorre todo el historial (del más reciente al más antiguo) en páginas de
+        'page_size' entradas. Pagina por id en lugar de OFFSET para que cada página
+        cueste lo mismo aunque haya cientos de miles de filas.
+        """
+        self.flush()
+        where, params = self._where(search, **filters)
+        last_id = None
+        while True:
+            clause = where
+            page_params = list(params)
+            if last_id is not None:
+                clause += (" AND " if where else " WHERE ") + "id < ?"
+                page_params.append(last_id)
+            sql = f"SELECT {', '.join(_COLUMNS)} FROM history{clause} ORDER BY id DESC LIMIT ?"
+            with self._lock:
+                rows = self._conn.execute(sql, page_params + [page_size]).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last_id = rows[-1]["id"]
+
+    def count(self, search: str = None, function: str = None, since: float = None, until: float = None,
+              wait: bool = True) -> int:
+        if wait:
+            self.flush()
+        where, params = self._where(search, function, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+
+    def __len__(self):
+        return self.count()
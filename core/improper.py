@@ -0,0 +1,195 @@
+# core/improper.py
+
+import math
+
+import numpy as np
+
+from .quadrature import NumericIntegrator
+
+
+class ImproperIntegrator:
+    """
+    Integrales con límites infinitos. Cada cola [c, ∞) se reparte en tramos que doblan
+    su longitud, [c + s·2^(k-1), c + s·2^k] desde k = FIRST_SEGMENT hasta LAST_SEGMENT,
+    integrados a la vez con Gauss-Kronrod. Los tramos cubren escalas desde 2^-10 hasta
+    2^60 veces s, de modo que el decaimiento se observa donde ocurra, y sirven para
+    clasificar la cola (converge, diverge u oscila) y para sumarla: lo que queda más allá
+    del último tramo se extrapola y cuenta entero en la cota de error.
+    """
+
+    # Exponentes del primer y del último tramo doble de la cola
+    FIRST_SEGMENT = -10
+    LAST_SEGMENT = 60
+    # Subintervalos de Gauss-Kronrod por tramo, evaluados en una sola llamada
+    PANELS = 64
+    # Subintervalos con más error que se vuelven a integrar de forma adaptativa
+    REFINED_PANELS = 32
+    # Pendiente de log2|tramo| por encima de la cual se considera divergente (~ 1/x^p con p <= 1.05)
+    DIVERGENCE_SLOPE = -0.05
+    # Fracción del valor total que puede quedar fuera de la ventana de la gráfica
+    WINDOW_TAIL_FRACTION = 0.01
+    # La ventana no pasa de c + s·2^WINDOW_SEGMENT aunque la cola siga pesando (1/x^1.1, p. ej.)
+    WINDOW_SEGMENT = 11
+
+    def __init__(self, integrator: NumericIntegrator = None):
+        self.integrator = integrator or NumericIntegrator()
+
+    def integrate(self, func, a: float, b: float) -> dict:
+        """
+        Integra 'func' (vectorizada) en [a, b] con a y/o b infinitos.
+        Devuelve el formato de NumericIntegrator más 'divergent', 'behaviour'
+        ('converge', 'diverge' u 'oscila') y 'window', un intervalo finito para graficar.
+        'converged' sólo es True si la cota de error cubre también el resto extrapolado.
+        """
+        if a > b:
+            result = self.integrate(func, b, a)
+            result["value"] = -result["value"]
+            return result
+
+        if math.isinf(a) and math.isinf(b):
+            # (-∞, ∞) = (-∞, 0] + [0, ∞)
+            right = self._tail(func, 0.0)
+            left = self._tail(lambda x: func(-x), 0.0)
+            left["window"] = (-left["window"][1], -left["window"][0])
+            return self._combine(left, right)
+        if math.isinf(b):
+            return self._tail(func, a)
+        # (-∞, b]: se refleja para integrar [-b, ∞)
+        result = self._tail(lambda x: func(-x), -b)
+        result["window"] = (-result["window"][1], -result["window"][0])
+        return result
+
+    @staticmethod
+    def _combine(left: dict, right: dict) -> dict:
+        divergent = left["divergent"] or right["divergent"]
+        if divergent:
+            behaviour = "oscila" if "oscila" in (left["behaviour"], right["behaviour"]) else "diverge"
+        else:
+            behaviour = "converge"
+        return {
+            "value": left["value"] + right["value"], "error": left["error"] + right["error"],
+            "method": "improper", "evaluations": left["evaluations"] + right["evaluations"],
+            "converged": left["converged"] and right["converged"], "divergent": divergent,
+            "behaviour": behaviour, "window": (left["window"][0], right["window"][1]),
+        }
+
+    def _panels(self, func, c: float, scale: float):
+        """
+        Bordes de los tramos [c + s·2^(k-1), c + s·2^k] (con [c, c + s·2^FIRST_SEGMENT] como
+        primero) y sus PANELS subintervalos: extremos, valores y errores con forma (tramos, PANELS).
+        """
+        powers = 2.0 ** np.arange(self.FIRST_SEGMENT, self.LAST_SEGMENT + 1)
+        edges = c + scale * np.concatenate([[0.0], powers])
+        fractions = np.linspace(0.0, 1.0, self.PANELS + 1)
+        lefts = edges[:-1, None] + (edges[1:] - edges[:-1])[:, None] * fractions[None, :-1]
+        rights = edges[:-1, None] + (edges[1:] - edges[:-1])[:, None] * fractions[None, 1:]
+        values, errors = self.integrator._gk_batch(func, lefts.ravel(), rights.ravel())
+        return edges, lefts, rights, values.reshape(lefts.shape), errors.reshape(lefts.shape)
+
+    def _refine(self, func, lefts, rights, values, errors, total: float) -> int:
+        """
+        Repite con Gauss-Kronrod adaptativo los subintervalos cuyo error pesa en el total
+        (picos estrechos, p. ej.); actualiza 'values' y 'errors' y devuelve las evaluaciones.
+        """
+        threshold = self.integrator._tolerance(total) / values.size
+        evaluations = 0
+        for index in np.argsort(errors, axis=None)[::-1][:self.REFINED_PANELS]:
+            index = np.unravel_index(index, errors.shape)
+            if not errors[index] > threshold:
+                break
+            result = self.integrator.gauss_kronrod(func, float(lefts[index]), float(rights[index]))
+            evaluations += result["evaluations"]
+            if math.isfinite(result["value"]) and result["error"] < errors[index]:
+                values[index], errors[index] = result["value"], result["error"]
+        return evaluations
+
+    def _classify(self, pieces: np.ndarray, reference: float) -> str:
+        """Decide si la cola converge a partir de cómo decrecen los últimos tramos."""
+        tail = pieces[-8:]
+        magnitudes = np.abs(tail)
+        if not np.all(np.isfinite(tail)):
+            return "diverge"
+        if np.all(magnitudes <= 1e-14 * max(1.0, reference)):
+            return "converge"
+        # Pendiente de log2|tramo| frente a k: 2^(1-p) por tramo para colas del tipo 1/x^p.
+        k = np.arange(len(tail))
+        logs = np.log2(np.maximum(magnitudes, 1e-300))
+        slope, intercept = np.polyfit(k, logs, 1)
+        scatter = np.std(logs - (slope * k + intercept))
+        if slope <= self.DIVERGENCE_SLOPE and scatter < 0.25:
+            return "converge"
+        # Colas oscilantes: los puntos salen muy dispersos, así que se exige además que
+        # la envolvente (máximo por bloques) se reduzca claramente
+        half = len(tail) // 2
+        envelope = magnitudes[half:].max() / max(magnitudes[:half].max(), 1e-300)
+        if slope <= -0.25 and envelope < 0.5:
+            return "converge"
+        signs = np.sign(tail[magnitudes > 0])
+        return "diverge" if np.all(signs == signs[0]) else "oscila"
+
+    @staticmethod
+    def _remainder(pieces: np.ndarray, reference: float) -> float:
+        """Extrapolación geométrica de la cola más allá del último tramo (0 si ya es despreciable)."""
+        tail = pieces[-5:]
+        magnitudes = np.abs(tail)
+        if np.all(magnitudes <= 1e-14 * max(1.0, reference)):
+            return 0.0
+        logs = np.log2(np.maximum(magnitudes, 1e-300))
+        ratio = 2.0 ** np.polyfit(np.arange(len(logs)), logs, 1)[0]
+        if ratio >= 1:
+            return math.inf
+        return float(tail[-1]) * ratio / (1 - ratio)
+
+    @staticmethod
+    def _resolved_segments(pieces: np.ndarray, piece_errors: np.ndarray) -> int:
+        """
+        Número de tramos iniciales que Gauss-Kronrod resuelve: a partir del último tramo
+        con error pequeño, los subintervalos son demasiado anchos para el integrando
+        (oscilaciones de sin(x)/x lejos del origen, p. ej.) y sus valores no significan nada.
+        """
+        floor = 1e-14 * max(1.0, float(np.max(np.abs(pieces), initial=0.0, where=np.isfinite(pieces))))
+        resolved = np.flatnonzero(piece_errors <= 1e-3 * np.abs(pieces) + floor)
+        return int(resolved[-1]) + 1 if resolved.size else len(pieces)
+
+    def _tail(self, func, c: float) -> dict:
+        scale = max(1.0, abs(c))
+        edges, lefts, rights, values, errors = self._panels(func, c, scale)
+        evaluations = values.size * 15
+        # Los tramos no resueltos del final se descartan: la cola se juzga y se extrapola sin ellos
+        count = self._resolved_segments(values.sum(axis=1), errors.sum(axis=1))
+        edges, lefts, rights, values, errors = edges[:count + 1], lefts[:count], rights[:count], \
+            values[:count], errors[:count]
+        pieces = values.sum(axis=1)
+        partial = math.fsum(pieces)
+        behaviour = self._classify(pieces, abs(partial))
+
+        if behaviour != "converge":
+            # Diverge: el signo de los últimos tramos indica hacia dónde
+            value = math.copysign(math.inf, pieces[-1]) if behaviour == "diverge" else math.nan
+            window_index = min(4 - self.FIRST_SEGMENT, len(edges) - 1)
+            return {"value": value, "error": math.inf, "method": "improper", "evaluations": evaluations,
+                    "converged": False, "divergent": True, "behaviour": behaviour,
+                    "window": (c, float(edges[window_index]))}
+
+        evaluations += self._refine(func, lefts, rights, values, errors, partial)
+        pieces = values.sum(axis=1)
+        partial = math.fsum(pieces)
+        # El resto extrapolado es un modelo, no una cota: se suma al valor y, entero
+        # y por duplicado, al error, de modo que las colas lentas no se dan por convergidas
+        remainder = self._remainder(pieces, abs(partial))
+        value = partial + remainder
+        error = math.fsum(errors.ravel()) + 2.0 * abs(remainder)
+        converged = math.isfinite(value) and error <= self.integrator._tolerance(value) * 1e3
+        return {"value": float(value), "error": float(error), "method": "improper",
+                "evaluations": evaluations, "converged": bool(converged), "divergent": False,
+                "behaviour": "converge", "window": (c, self._window_end(edges, pieces, value))}
+
+    def _window_end(self, edges, pieces, total) -> float:
+        """Primer borde a partir del cual lo que queda de la cola es despreciable en la gráfica."""
+        remaining = np.abs(np.cumsum(pieces[::-1])[::-1])  # integral desde cada borde hasta el final
+        threshold = self.WINDOW_TAIL_FRACTION * max(abs(total), 1e-12)
+        last = min(self.WINDOW_SEGMENT - self.FIRST_SEGMENT + 1, len(pieces))
+        for index in range(1, last):
+            if remaining[index] <= threshold:
+                return float(edges[index])
+        return float(edges[last])
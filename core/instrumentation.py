@@ -0,0 +1,166 @@
+# core/instrumentation.py
+
+import cProfile
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import sympy
+
+logger = logging.getLogger("calculadora.instrumentacion")
+
+_request_ids = itertools.count(1)
+
+
+class Instrumentation:
+    """
+    Registro de una petición: duración de cada etapa (ms), tamaño de las expresiones
+    (número de operaciones según sympy.count_ops) y, si algún destino lo pide, un perfil
+    de cProfile. Al terminar, el registro se envía a todos los destinos configurados.
+    """
+
+    def __init__(self, label: str, sinks=()):
+        self.request_id = next(_request_ids)
+        self.label = label
+        self.sinks = list(sinks)
+        self.stages = {}
+        self.sizes = {}
+        self.closed = False
+        self.profiling = any(getattr(sink, "profiles", False) for sink in self.sinks)
+        self._profiler = None
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        if self.profiling:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mide el bloque; si la etapa se repite, los tiempos se suman."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                # Un hilo simbólico que termina tarde no modifica un registro ya enviado
+                if not self.closed:
+                    self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def size(self, name: str, expr):
+        if isinstance(expr, sympy.Basic):
+            ops = sympy.count_ops(expr)
+            with self._lock:
+                if not self.closed:
+                    self.sizes[name] = int(ops)
+
+    def finish(self, status: str = "ok") -> dict:
+        """Cierra el registro, lo envía a los destinos y lo devuelve como diccionario."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        with self._lock:
+            self.closed = True
+            record = {
+                "request_id": self.request_id, "label": self.label, "status": status,
+                "total_ms": (time.perf_counter() - self._started) * 1000,
+                "stages": dict(self.stages), "sizes": dict(self.sizes),
+            }
+        for sink in self.sinks:
+            try:
+                sink.emit(record, self._profiler)
+            except Exception as e:
+                logger.warning("El destino %s falló: %s", type(sink).__name__, e)
+        return record
+
+
+class NullInstrumentation:
+    """Sustituto sin coste cuando la instrumentación está desactivada."""
+
+    profiling = False
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def size(self, name: str, expr):
+        pass
+
+    def finish(self, status: str = "ok"):
+        return None
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def format_breakdown(record: dict) -> str:
+    """Texto legible de un registro, de la etapa más lenta a la más rápida."""
+    lines = [f"Petición #{record['request_id']}: {record['label']}",
+             f"Total: {record['total_ms']:.1f} ms ({record['status']})", "", "Etapas:"]
+    for name, ms in sorted(record["stages"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {name:<24} {ms:9.2f} ms")
+    if record["sizes"]:
+        lines += ["", "Tamaño de las expresiones (operaciones):"]
+        for name, ops in record["sizes"].items():
+            lines.append(f"  {name:<24} {ops:9d}")
+    if record.get("profile_path"):
+        lines += ["", f"Perfil: {record['profile_path']}"]
+    return "\n".join(lines)
+
+
+# --- Destinos ---
+
+class LogSink:
+    """Escribe cada registro en el log (una línea por petición)."""
+
+    def __init__(self, log: logging.Logger = None, level: int = logging.INFO):
+        self.log = log or logger
+        self.level = level
+
+    def emit(self, record: dict, profiler=None):
+        stages = ", ".join(f"{name}={ms:.1f}ms" for name, ms in record["stages"].items())
+        self.log.log(self.level, "#%d %s [%s] total=%.1fms %s sizes=%s", record["request_id"], record["label"],
+                     record["status"], record["total_ms"], stages, record["sizes"])
+
+
+class RingBufferSink:
+    """Guarda en memoria los últimos 'maxlen' registros."""
+
+    def __init__(self, maxlen: int = 256):
+        self._records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict, profiler=None):
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> list:
+        with self._lock:
+            return list(self._records)
+
+    def last(self):
+        with self._lock:
+            return self._records[-1] if self._records else None
+
+
+class ProfileSink:
+    """
+    Vuelca un perfil de cProfile por petición en 'directory' (se abre con pstats o snakeviz).
+    Mientras está activo, la integración simbólica corre en el hilo de la petición para
+    que aparezca en el perfil.
+    """
+
+    profiles = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def emit(self, record: dict, profiler=None):
+        if profiler is None:
+            return
+        path = os.path.join(self.directory, f"peticion-{record['request_id']:06d}.prof")
+        profiler.dump_stats(path)
+        record["profile_path"] = path
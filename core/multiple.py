@@ -0,0 +1,271 @@
+# core/multiple.py
+
+import math
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+import sympy
+from sympy import integrate, latex, symbols
+
+from .background import SymbolicSaturated
+from .cache import ResultCache
+from .quadrature import _GK_NODES, _GK_WEIGHTS, _G_WEIGHTS
+
+
+class CubatureIntegrator:
+    """
+    Cubatura adaptativa para integrales dobles y triples. La región (con límites que pueden
+    depender de las variables exteriores) se lleva al cubo unidad y cada caja se integra con
+    el producto tensorial de Gauss-Kronrod G7-K15: la regla de Gauss usa un subconjunto de los
+    mismos nodos, así que el error sale sin evaluaciones extra. Todas las cajas pendientes se
+    evalúan en una sola llamada vectorizada y las que no alcanzan su tolerancia se dividen.
+    """
+
+    # Tope de evaluaciones del integrando (3375 por caja en 3-D)
+    MAX_EVALUATIONS = 2_000_000
+
+    def __init__(self, abs_tol: float = 1e-10, rel_tol: float = 1e-10):
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+        self._rules = {}
+
+    def _rule(self, dim: int):
+        """Nodos en [0, 1]^dim y pesos de Kronrod y de Gauss del producto tensorial."""
+        rule = self._rules.get(dim)
+        if rule is None:
+            nodes_1d = (_GK_NODES + 1) / 2
+            grids = np.meshgrid(*[nodes_1d] * dim, indexing='ij')
+            nodes = np.stack([g.ravel() for g in grids], axis=1)
+            kronrod, gauss = np.ones(1), np.ones(1)
+            for _ in range(dim):
+                kronrod = np.multiply.outer(kronrod, _GK_WEIGHTS / 2).ravel()
+                gauss = np.multiply.outer(gauss, _G_WEIGHTS / 2).ravel()
+            rule = self._rules[dim] = (nodes, kronrod, gauss)
+        return rule
+
+    @staticmethod
+    def _map(limits, u: np.ndarray):
+        """
+        Del cubo unidad a la región: cada variable recorre [inferior, superior] evaluados en
+        las variables exteriores ya calculadas. Devuelve las coordenadas y el jacobiano.
+        """
+        coords = []
+        jacobian = np.ones(len(u))
+        with np.errstate(all='ignore'):
+            for i, (lower, upper) in enumerate(limits):
+                low = np.broadcast_to(np.asarray(lower(*coords), dtype=float), jacobian.shape)
+                width = np.broadcast_to(np.asarray(upper(*coords), dtype=float), jacobian.shape) - low
+                coords.append(low + width * u[:, i])
+                jacobian = jacobian * width
+        return coords, jacobian
+
+    def _boxes(self, func, limits, lows: np.ndarray, widths: np.ndarray):
+        """Valor y error de cada caja [low, low + width] del cubo unidad, con una sola evaluación."""
+        dim = lows.shape[1]
+        nodes, kronrod_w, gauss_w = self._rule(dim)
+        u = (lows[:, None, :] + widths[:, None, :] * nodes[None, :, :]).reshape(-1, dim)
+        coords, jacobian = self._map(limits, u)
+        with np.errstate(all='ignore'):
+            values = np.asarray(func(*coords))
+        values = np.broadcast_to(values, jacobian.shape)
+        if np.iscomplexobj(values):
+            values = np.where(np.abs(values.imag) <= 1e-12 * np.maximum(1.0, np.abs(values.real)),
+                              values.real, np.nan)
+        values = (values.astype(float) * jacobian).reshape(len(lows), -1)
+        volume = np.prod(widths, axis=1)
+        kronrod = volume * (values @ kronrod_w)
+        gauss = volume * (values @ gauss_w)
+        return kronrod, np.abs(kronrod - gauss), values.size
+
+    def integrate(self, func, limits) -> dict:
+        """
+        Integra 'func(x, y[, z])' (vectorizada). 'limits' va de la variable exterior a la
+        interior: [(a, b), (c(x), d(x)), (e(x, y), f(x, y))], cada límite como función vectorizada.
+        """
+        dim = len(limits)
+        lows = np.zeros((1, dim))
+        widths = np.ones((1, dim))
+        # Esquinas de las 2^dim subcajas al dividir una caja por la mitad en cada dirección
+        corners = np.stack(np.meshgrid(*[[0.0, 0.5]] * dim, indexing='ij'), axis=-1).reshape(-1, dim)
+
+        accepted_value = accepted_error = 0.0
+        evaluations = boxes = 0
+        while True:
+            values, errors, count = self._boxes(func, limits, lows, widths)
+            evaluations += count
+            boxes += len(lows)
+            if not (np.all(np.isfinite(values)) and np.all(np.isfinite(errors))):
+                return {"value": math.nan, "error": math.inf, "method": "cubature", "evaluations": evaluations,
+                        "boxes": boxes, "converged": False}
+
+            total = accepted_value + math.fsum(values)
+            tolerance = max(self.abs_tol, self.rel_tol * abs(total))
+            # Cada caja puede aportar al error en proporción a su volumen
+            pending = errors > tolerance * np.prod(widths, axis=1)
+            accepted_value += math.fsum(values[~pending])
+            accepted_error += math.fsum(errors[~pending])
+            pending_error = math.fsum(errors[pending])
+
+            next_count = pending.sum() * (2 ** dim) * len(self._rule(dim)[1])
+            if not pending.any() or accepted_error + pending_error <= tolerance \
+                    or evaluations + next_count > self.MAX_EVALUATIONS:
+                value = accepted_value + math.fsum(values[pending])
+                error = accepted_error + pending_error
+                return {"value": value, "error": error, "method": "cubature", "evaluations": evaluations,
+                        "boxes": boxes, "converged": bool(error <= max(self.abs_tol, self.rel_tol * abs(value)))}
+
+            # Dividir las cajas pendientes en 2^dim hijas
+            half = widths[pending] / 2
+            lows = (lows[pending][:, None, :] + corners[None, :, :] * widths[pending][:, None, :]).reshape(-1, dim)
+            widths = np.repeat(half, 2 ** dim, axis=0)
+
+
+class MultipleIntegral:
+    """
+    Integrales dobles y triples en las variables x, y, z. Se intenta primero la integración
+    simbólica iterada (de la variable interior a la exterior) dentro del presupuesto de tiempo
+    del motor y, mientras tanto, se calcula la cubatura numérica.
+    """
+
+    VARIABLES = ("x", "y", "z")
+
+    def __init__(self, engine, cubature: CubatureIntegrator = None):
+        self.engine = engine
+        self.cubature = cubature or CubatureIntegrator()
+        self.variables = symbols(self.VARIABLES)
+
+    def _symbols(self, constants_str: str):
+        constants_key = tuple(name for name in self.engine._constants_signature(constants_str)
+                              if name not in self.VARIABLES)
+        local_symbols = dict(self.engine._prepare_local_symbols(",".join(constants_key)))
+        local_symbols.update(zip(self.VARIABLES, self.variables))
+        # Clave distinta de la de una variable: 'y' y 'z' no son constantes aquí
+        return local_symbols, (*constants_key, "|xyz")
+
+    @staticmethod
+    def integral_latex(func_expr, variables, limits) -> str:
+        """∫∫ f dy dx con sus límites, del exterior al interior."""
+        signs = "".join(rf"\int_{{{latex(low)}}}^{{{latex(high)}}}" for low, high in limits)
+        differentials = r"\,".join(f"d{v}" for v in reversed(variables))
+        return rf"{signs} {latex(func_expr)} \, {differentials}"
+
+    def run(self, func_str: str, limit_strs, constants_str: str = "") -> dict:
+        engine = self.engine
+        started = time.monotonic()
+        dim = len(limit_strs)
+        if dim not in (2, 3):
+            raise ValueError("Sólo se admiten integrales dobles o triples.")
+        variables = self.variables[:dim]
+
+        local_symbols, constants_key = self._symbols(constants_str)
+        func_expr = engine._parse_cached(func_str, constants_key, local_symbols)
+        limits = [tuple(engine._parse_cached(text, constants_key, local_symbols) for text in pair)
+                  for pair in limit_strs]
+
+        # Los límites de cada variable sólo pueden depender de las exteriores
+        for i, (low, high) in enumerate(limits):
+            inner = set(self.variables[i:])
+            if (low.free_symbols | high.free_symbols) & inner:
+                names = ", ".join(str(v) for v in self.variables[:i]) or "ninguna variable"
+                raise ValueError(f"Los límites de {variables[i]} sólo pueden depender de: {names}.")
+            if not (low.is_finite is not False and high.is_finite is not False):
+                raise ValueError("Las integrales múltiples requieren límites finitos.")
+        if func_expr.free_symbols & set(self.variables[dim:]):
+            raise ValueError(f"La función usa variables que no se integran (sólo {', '.join(map(str, variables))}).")
+
+        numeric_free = (func_expr.free_symbols | {s for pair in limits for e in pair for s in e.free_symbols}) \
+            - set(variables)
+        numeric_func = None
+        if not numeric_free:
+            numeric_func = self.engine.compiler.compile(func_expr, variables)
+
+        key = ResultCache.make_key(func_expr, *limits, constants_key)
+        integral = engine.result_cache.get(key)
+        if integral is None:
+            integral = self._integrate(func_expr, variables, limits, numeric_func, started)
+            if not integral.get("provisional"):
+                engine.result_cache.put(key, integral)
+
+        # La región se delimita antes de anotar el historial: si falla, el cálculo no cuenta
+        region = self._region(limits) if numeric_func is not None and dim == 2 else None
+
+        inner = "; ".join(f"{v} en [{low}, {high}]" for v, (low, high) in zip(variables[1:], limits[1:]))
+        engine.add_to_history(f"{func_str} ; {inner}", str(limits[0][0]), str(limits[0][1]),
+                              integral["defined_latex"], constants_str,
+                              engine._numeric_value(integral["defined_integral"]))
+
+        result = {"success": True, **integral, "elapsed": time.monotonic() - started,
+                  "func_expr": func_expr, "numeric_func": numeric_func, "limits": limits}
+        if region is not None:
+            result["region"] = region
+        return result
+
+    def _integrate(self, func_expr, variables, limits, numeric_func, started) -> dict:
+        engine = self.engine
+        # Integración simbólica iterada en segundo plano: de la variable interior a la exterior
+        ranges = [(v, low, high) for v, (low, high) in zip(variables, limits)]
+        symbolic_future = engine._run_in_background(lambda: integrate(func_expr, *reversed(ranges)))
+
+        numeric = None
+        if numeric_func is not None:
+            numeric_limits = [tuple(engine.compiler.compile(bound, variables[:i]) for bound in pair)
+                              for i, pair in enumerate(limits)]
+            numeric = self.cubature.integrate(numeric_func, numeric_limits)
+            if not math.isfinite(numeric["value"]):
+                numeric = None
+
+        definite = None
+        symbolic_error = None
+        # Como en CalculatorEngine._integrate: sin la respuesta de SymPy el resultado no se guarda
+        provisional = True
+        if not (numeric and numeric["converged"] and not engine.prefer_exact and not symbolic_future.done()):
+            remaining = max(0.0, engine.time_budget - (time.monotonic() - started))
+            try:
+                definite = symbolic_future.result(timeout=remaining)
+                provisional = False
+            except SymbolicSaturated as exc:
+                symbolic_error = exc
+            except FutureTimeoutError:
+                symbolic_error = TimeoutError(
+                    f"La integración simbólica superó el límite de {engine.time_budget:g} s "
+                    "y no hay resultado numérico disponible.")
+            except Exception as exc:
+                symbolic_error = exc
+                provisional = False
+
+        if definite is not None and not definite.has(sympy.Integral):
+            value = definite.evalf(n=10) if definite.is_Number else definite
+            method, error, evaluations = "symbolic", 0.0, 0
+        elif numeric is not None:
+            value = sympy.Float(numeric["value"], 10)
+            method, error, evaluations = numeric["method"], numeric["error"], numeric["evaluations"]
+        elif definite is not None:
+            value, method, error, evaluations = definite, "symbolic", 0.0, 0
+        else:
+            raise symbolic_error
+
+        return {
+            "defined_integral": value, "method": method, "error_estimate": error,
+            "evaluations": evaluations, "dimension": len(variables),
+            "provisional": provisional and method != "symbolic",
+            "integral_latex": self.integral_latex(func_expr, variables, limits),
+            "func_latex": latex(func_expr), "defined_latex": latex(value),
+        }
+
+    def _region(self, limits):
+        """Rectángulo que contiene la región 2-D y funciones vectorizadas de los límites de y."""
+        x, _ = self.variables[:2]
+        (a, b), (c, d) = limits
+        a, b = float(a), float(b)
+        lower = self.engine.compiler.compile(c, (x,))
+        upper = self.engine.compiler.compile(d, (x,))
+        xs = np.linspace(min(a, b), max(a, b), 257)
+        with np.errstate(all='ignore'):
+            ys = np.concatenate([np.broadcast_to(np.asarray(lower(xs), dtype=float), xs.shape),
+                                 np.broadcast_to(np.asarray(upper(xs), dtype=float), xs.shape)])
+        ys = ys[np.isfinite(ys)]
+        if not ys.size:
+            raise ValueError(f"Los límites de y no toman valores reales para x en [{min(a, b):g}, {max(a, b):g}].")
+        return {"x_range": (min(a, b), max(a, b)), "y_range": (float(ys.min()), float(ys.max())),
+                "y_lower": lower, "y_upper": upper}
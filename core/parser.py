@@ -1,8 +1,18 @@
 #core/parser.py
 
+import re
+
 import sympy
-from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
+from sympy.parsing.sympy_parser import parse_expr, standard_transformations
 from .expression_preprocessor import ExpressionPreprocessor
+from .instrumentation import NULL_INSTRUMENTATION
+from .tokenizer import ExpressionSyntaxError
+
+# La cadena de transformaciones se construye una sola vez
+_TRANSFORMATIONS = standard_transformations
+
+# Números simples ('2', '-1', '2.5', '.5') que no necesitan pasar por parse_expr
+_PLAIN_NUMBER = re.compile(r"[+-]?(?:\d+(\.\d*)?|\.\d+)")
 
 class InputParser:
     """
@@ -10,25 +20,47 @@ class InputParser:
     Es un traductor de 'texto de usuario' a 'expresión matemática'.
     """
     @staticmethod
-    def parse(expression_str: str, local_symbols: dict) -> sympy.Expr:
+    def parse(expression_str: str, local_symbols: dict, instrumentation=NULL_INSTRUMENTATION) -> sympy.Expr:
         """
         Analiza una cadena y la convierte en una expresión SymPy.
         Aplica transformaciones para sintaxis común (ej: '2x' -> '2*x').
+        Si se pasa un registro de instrumentación, mide el preprocesado y parse_expr por separado.
         """
-        if not expression_str.strip():
+        text = expression_str.strip()
+        if not text:
             return sympy.S.Zero # Devuelve un cero simbólico para entradas vacías
 
-        # 1. Preprocesar la expresión
-        preprocessed_str = ExpressionPreprocessor.preprocess(expression_str)
-
-        # 2. Reemplazar la potencia '^' por el '**' de Python
-        parsed_str = preprocessed_str.replace('^', '**')
+        # Vía rápida para límites habituales: '0', '2.5', 'pi', 'oo', '-oo'...
+        fast = InputParser._parse_plain(text, local_symbols)
+        if fast is not None:
+            return fast
 
         try:
-            # 3. Definir que la multiplicación implícita se procese PRIMERO
-            transformations = (implicit_multiplication_application,) + standard_transformations
+            # 1. Preprocesar la expresión: multiplicación implícita y '^' -> '**' en una pasada
+            with instrumentation.stage("preprocess"):
+                parsed_str = ExpressionPreprocessor.preprocess(expression_str, local_symbols)
 
-            # 4. Usar el parser AVANZADO de SymPy, que acepta transformaciones
-            return parse_expr(parsed_str, local_dict=local_symbols, transformations=transformations)
+            # 2. La entrada ya es explícita: basta con las transformaciones estándar de SymPy
+            with instrumentation.stage("parse_expr"):
+                return parse_expr(parsed_str, local_dict=local_symbols, transformations=_TRANSFORMATIONS)
+        except ExpressionSyntaxError as e:
+            raise ExpressionSyntaxError(f"Error al parsear la expresión '{expression_str}': {e.message}",
+                                        e.position) from None
         except Exception as e:
-            raise ValueError(f"Error al parsear la expresión '{expression_str}': {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error al parsear la expresión '{expression_str}': {str(e)}")
+
+
+    @staticmethod
+    def _parse_plain(text: str, local_symbols: dict):
+        """Devuelve la expresión de un número o constante simple, o None si hace falta el parser completo."""
+        match = _PLAIN_NUMBER.fullmatch(text)
+        # Los literales largos siguen por el tokenizador, que limita su número de cifras
+        if match and len(text) <= 64:
+            # Los decimales se leen exactos, como en el tokenizador: '0.1' -> 1/10
+            return sympy.Rational(text) if "." in text else sympy.Integer(text)
+
+        sign, name = (-1, text[1:]) if text[0] == "-" else (1, text.lstrip("+"))
+        value = local_symbols.get(name)
+        if isinstance(value, sympy.Expr) and value.is_number:
+            return -value if sign < 0 else value
+        return None
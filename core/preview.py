@@ -0,0 +1,75 @@
+# core/preview.py
+
+import math
+
+import numpy as np
+from sympy import latex
+
+
+class PreviewCancelled(Exception):
+    pass
+
+
+class LivePreview:
+    """
+    Vista previa mientras se escribe: parsea la entrada, compila el kernel numérico y da una
+    estimación rápida de la integral con un número fijo de evaluaciones. Nunca espera a la
+    integración simbólica, que sólo se lanza con "Calcular".
+    """
+
+    # Subintervalos G7-K15 de la estimación (15 evaluaciones cada uno, en una sola llamada)
+    PANELS = 16
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def run(self, func_str: str, lower_limit_str: str = "", upper_limit_str: str = "", constants_str: str = "",
+            cancelled=None) -> dict:
+        """
+        'cancelled()' se consulta entre etapas; si devuelve True se lanza PreviewCancelled.
+        Los límites vacíos o con constantes simplemente omiten la estimación.
+        """
+        engine = self.engine
+        x = engine.variable
+
+        def check():
+            if cancelled is not None and cancelled():
+                raise PreviewCancelled()
+
+        local_symbols = engine._prepare_local_symbols(constants_str)
+        constants_key = engine._constants_signature(constants_str)
+        func_expr = engine._parse_cached(func_str, constants_key, local_symbols)
+        result = {"success": True, "func_latex": latex(func_expr), "numeric_func": None,
+                  "a": None, "b": None, "estimate": None, "window": None}
+        check()
+
+        if func_expr.free_symbols - {x}:
+            return result
+        result["numeric_func"] = numeric_func = engine._numeric_function(func_expr)
+        if not (lower_limit_str.strip() and upper_limit_str.strip()):
+            return result
+
+        a_expr = engine._parse_cached(lower_limit_str, constants_key, local_symbols)
+        b_expr = engine._parse_cached(upper_limit_str, constants_key, local_symbols)
+        if not (a_expr.is_number and b_expr.is_number):
+            return result
+        result["a"], result["b"] = a, b = float(a_expr), float(b_expr)
+        check()
+
+        if math.isinf(a) or math.isinf(b):
+            improper = engine.improper_integrator.integrate(numeric_func, a, b)
+            result["window"] = improper["window"]
+            result["estimate"] = {"value": improper["value"], "error": improper["error"],
+                                  "divergent": improper["divergent"], "evaluations": improper["evaluations"]}
+        else:
+            result["estimate"] = self.estimate(numeric_func, a, b)
+        return result
+
+    def estimate(self, numeric_func, a: float, b: float) -> dict:
+        """Gauss-Kronrod sobre PANELS subintervalos iguales, sin refinamiento adaptativo."""
+        edges = np.linspace(a, b, self.PANELS + 1)
+        values, errors = self.engine.numeric_integrator._gk_batch(numeric_func, edges[:-1], edges[1:])
+        value, error = float(np.sum(values)), float(np.sum(errors))
+        if not math.isfinite(value):
+            error = math.inf
+        return {"value": value, "error": error, "divergent": False, "evaluations": 15 * self.PANELS}
@@ -0,0 +1,305 @@
+# core/quadrature.py
+
+import heapq
+import math
+
+import numpy as np
+
+
+# Nodos y pesos de la regla de Gauss-Kronrod G7-K15 (QUADPACK).
+# Sólo se guarda la mitad positiva; el resto se obtiene por simetría.
+_XGK = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.000000000000000000000000000000000,
+])
+_WGK = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714,
+])
+# Pesos de Gauss de 7 puntos, asociados a los nodos de índice impar de _XGK.
+_WG = np.array([
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327,
+])
+
+_GK_NODES = np.concatenate([-_XGK[:-1], _XGK[::-1]])
+_GK_WEIGHTS = np.concatenate([_WGK[:-1], _WGK[::-1]])
+_G_WEIGHTS = np.zeros(15)
+_G_WEIGHTS[[1, 3, 5, 7, 9, 11, 13]] = np.concatenate([_WG[:-1], _WG[::-1]])
+
+
+class NumericIntegrator:
+    """
+    Motor de cuadratura numérica con estimación de error.
+    Implementa Gauss-Kronrod adaptativo, tanh-sinh y Clenshaw-Curtis.
+    """
+
+    METHODS = ("gauss_kronrod", "tanh_sinh", "clenshaw_curtis")
+
+    def __init__(self, abs_tol: float = 1e-10, rel_tol: float = 1e-10, max_subintervals: int = 200):
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+        self.max_subintervals = max_subintervals
+        self._cc_weights = {}
+
+    # --- Punto de entrada ---
+
+    def integrate(self, func, a: float, b: float, method: str = "auto") -> dict:
+        """
+        Integra 'func' (vectorizada sobre arrays de NumPy) en [a, b].
+        Con method='auto' prueba las reglas en orden y devuelve la primera que converge,
+        o la de menor error estimado si ninguna lo consigue.
+        """
+        if method != "auto":
+            if method not in self.METHODS:
+                raise ValueError(f"Método de cuadratura desconocido: '{method}'")
+            return getattr(self, method)(func, a, b)
+
+        best = None
+        for name in self.METHODS:
+            result = getattr(self, name)(func, a, b)
+            if result["converged"]:
+                return result
+            if math.isfinite(result["value"]) and (best is None or result["error"] < best["error"]):
+                best = result
+        return best if best is not None else result
+
+    def _tolerance(self, value: float) -> float:
+        return max(self.abs_tol, self.rel_tol * abs(value))
+
+    @staticmethod
+    def _evaluate(func, x: np.ndarray) -> np.ndarray:
+        """Evalúa la función sobre un array, tolerando funciones constantes y resultados complejos."""
+        with np.errstate(all='ignore'):
+            y = np.asarray(func(x))
+        if y.shape != x.shape:
+            y = np.broadcast_to(y, x.shape)
+        if np.iscomplexobj(y):
+            y = np.where(np.abs(y.imag) <= 1e-12 * np.maximum(1.0, np.abs(y.real)), y.real, np.nan)
+        return y.astype(float, copy=False)
+
+    @staticmethod
+    def _result(value, error, method, evaluations, converged) -> dict:
+        return {"value": float(value), "error": float(error), "method": method,
+                "evaluations": evaluations, "converged": bool(converged)}
+
+    # --- Gauss-Kronrod adaptativo ---
+
+    def _gk_batch(self, func, lefts: np.ndarray, rights: np.ndarray):
+        """Aplica G7-K15 a varios subintervalos con una sola llamada a la función."""
+        # Con límites enormes ('1e1000' -> inf) los nodos salen inf o nan: sin avisos de NumPy
+        with np.errstate(all='ignore'):
+            centers = (lefts + rights) / 2
+            halves = (rights - lefts) / 2
+            x = centers[:, None] + halves[:, None] * _GK_NODES[None, :]
+        y = self._evaluate(func, x.ravel()).reshape(x.shape)
+        with np.errstate(all='ignore'):
+            kronrod = halves * (y @ _GK_WEIGHTS)
+            gauss = halves * (y @ _G_WEIGHTS)
+            return kronrod, np.abs(kronrod - gauss)
+
+    def gauss_kronrod(self, func, a: float, b: float) -> dict:
+        values, errors = self._gk_batch(func, np.array([a]), np.array([b]))
+        evaluations = 15
+        # Montículo de subintervalos ordenados por error (negativo para obtener el mayor)
+        heap = [(-errors[0], a, b, values[0])]
+        total, total_error = values[0], errors[0]
+
+        while total_error > self._tolerance(total) and len(heap) < self.max_subintervals:
+            if not (np.isfinite(total) and np.isfinite(total_error)):
+                break
+            neg_err, left, right, value = heapq.heappop(heap)
+            mid = (left + right) / 2
+            if mid <= left or mid >= right:
+                heapq.heappush(heap, (neg_err, left, right, value))
+                break
+            new_values, new_errors = self._gk_batch(func, np.array([left, mid]), np.array([mid, right]))
+            evaluations += 30
+            heapq.heappush(heap, (-new_errors[0], left, mid, new_values[0]))
+            heapq.heappush(heap, (-new_errors[1], mid, right, new_values[1]))
+            total += new_values[0] + new_values[1] - value
+            total_error += new_errors[0] + new_errors[1] + neg_err
+
+        # Recalcular las sumas para no arrastrar errores de redondeo
+        total = math.fsum(item[3] for item in heap)
+        total_error = math.fsum(-item[0] for item in heap)
+        converged = np.isfinite(total) and total_error <= self._tolerance(total)
+        return self._result(total, total_error, "gauss_kronrod", evaluations, converged)
+
+    # --- Tanh-sinh (doble exponencial) ---
+
+    def tanh_sinh(self, func, a: float, b: float, max_level: int = 10, t_max: float = 3.5) -> dict:
+        """
+        Cuadratura tanh-sinh con niveles anidados. Es robusta frente a singularidades
+        integrables en los extremos, ya que nunca evalúa exactamente en a ni en b.
+        """
+        half = (b - a) / 2
+        evaluations = 0
+
+        def level_sum(t):
+            nonlocal evaluations
+            s = (math.pi / 2) * np.sinh(t)
+            with np.errstate(all='ignore'):
+                # Distancia al extremo calculada directamente para no perder precisión
+                complement = 2.0 / (np.exp(2 * np.abs(s)) + 1.0)
+                weights = (math.pi / 2) * np.cosh(t) / np.cosh(s) ** 2
+                x = np.where(t > 0, b - half * complement, a + half * complement)
+            useful = weights > 0
+            y = self._evaluate(func, x[useful])
+            evaluations += y.size
+            terms = weights[useful] * y
+            if not np.all(np.isfinite(terms)):
+                # Sólo se descartan valores no finitos con peso despreciable
+                bad = ~np.isfinite(terms)
+                if np.any(weights[useful][bad] > 1e-200):
+                    return math.nan
+                terms = terms[~bad]
+            return math.fsum(terms)
+
+        h = 1.0
+        n = int(t_max / h)
+        total = level_sum(np.arange(-n, n + 1) * h)
+        estimate = half * h * total
+        previous = math.nan
+        for _ in range(max_level):
+            h /= 2
+            n = int(t_max / h)
+            odd = np.arange(-n + (1 - n % 2), n + 1, 2) * h
+            total += level_sum(odd)
+            previous, estimate = estimate, half * h * total
+            if not math.isfinite(estimate):
+                break
+            if abs(estimate - previous) <= self._tolerance(estimate):
+                break
+
+        error = abs(estimate - previous) if math.isfinite(previous) else math.inf
+        converged = math.isfinite(estimate) and error <= self._tolerance(estimate)
+        return self._result(estimate, error, "tanh_sinh", evaluations, converged)
+
+    # --- Clenshaw-Curtis ---
+
+    def _clenshaw_curtis_weights(self, n: int) -> np.ndarray:
+        """Pesos de Clenshaw-Curtis para n+1 nodos cos(k*pi/n), con n par."""
+        if n not in self._cc_weights:
+            k = np.arange(n + 1)
+            j = np.arange(1, n // 2 + 1)
+            b = np.where(j == n // 2, 1.0, 2.0)
+            cosines = np.cos(2 * np.outer(k, j) * math.pi / n)
+            c = np.where((k == 0) | (k == n), 1.0, 2.0)
+            self._cc_weights[n] = c / n * (1 - cosines @ (b / (4 * j ** 2 - 1)))
+        return self._cc_weights[n]
+
+    def clenshaw_curtis(self, func, a: float, b: float, max_points: int = 2048) -> dict:
+        """Clenshaw-Curtis con duplicación de nodos; los valores del nivel anterior se reutilizan."""
+        center, half = (a + b) / 2, (b - a) / 2
+        n = 8
+        nodes = np.cos(np.arange(n + 1) * math.pi / n)
+        with np.errstate(all='ignore'):
+            y = self._evaluate(func, center + half * nodes)
+        evaluations = n + 1
+        estimate = half * float(self._clenshaw_curtis_weights(n) @ y)
+        previous = math.nan
+
+        while n < max_points:
+            n *= 2
+            new_y = np.empty(n + 1)
+            new_y[::2] = y
+            odd_nodes = np.cos(np.arange(1, n, 2) * math.pi / n)
+            with np.errstate(all='ignore'):
+                new_y[1::2] = self._evaluate(func, center + half * odd_nodes)
+            evaluations += odd_nodes.size
+            y = new_y
+            previous, estimate = estimate, half * float(self._clenshaw_curtis_weights(n) @ y)
+            if not math.isfinite(estimate):
+                break
+            if abs(estimate - previous) <= self._tolerance(estimate):
+                break
+
+        error = abs(estimate - previous) if math.isfinite(previous) else math.inf
+        converged = math.isfinite(estimate) and error <= self._tolerance(estimate)
+        return self._result(estimate, error, "clenshaw_curtis", evaluations, converged)
+
+    # --- Gauss-Kronrod vectorizado para familias de integrales ---
+
+    def gauss_kronrod_batch(self, func, a, b, args=(), max_subintervals: int = 256) -> dict:
+        """
+        Integra func(x, *args) para muchos valores de los parámetros a la vez.
+        'a', 'b' y cada elemento de 'args' son arrays que se difunden a una forma común;
+        en cada ronda la función se evalúa una sola vez sobre todos los puntos pendientes,
+        y sólo los que no han convergido se vuelven a subdividir.
+        """
+        arrays = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float),
+                                     *[np.asarray(arg, dtype=float) for arg in args])
+        shape = arrays[0].shape
+        lower, upper, *params = [array.ravel() for array in arrays]
+        values = np.full(lower.size, np.nan)
+        errors = np.full(lower.size, np.inf)
+        active = np.ones(lower.size, dtype=bool)
+        evaluations = 0
+        pieces = 1
+
+        while active.any():
+            rows = np.flatnonzero(active)
+            fractions = np.linspace(0.0, 1.0, pieces + 1)
+            with np.errstate(all='ignore'):
+                edges = lower[rows, None] + (upper[rows] - lower[rows])[:, None] * fractions
+                centers = (edges[:, :-1] + edges[:, 1:]) / 2
+                halves = (edges[:, 1:] - edges[:, :-1]) / 2
+                x = centers[..., None] + halves[..., None] * _GK_NODES
+            flat_x = x.reshape(rows.size, -1)
+            with np.errstate(all='ignore'):
+                y = np.asarray(func(flat_x, *[p[rows, None] for p in params]))
+            y = np.broadcast_to(y, flat_x.shape)
+            if np.iscomplexobj(y):
+                y = np.where(np.abs(y.imag) <= 1e-12 * np.maximum(1.0, np.abs(y.real)), y.real, np.nan)
+            y = y.astype(float).reshape(x.shape)
+            evaluations += y.size
+
+            with np.errstate(all='ignore'):
+                kronrod = (halves * (y @ _GK_WEIGHTS)).sum(axis=1)
+                gauss = (halves * (y @ _G_WEIGHTS)).sum(axis=1)
+                values[rows] = kronrod
+                errors[rows] = np.abs(kronrod - gauss)
+
+            tolerance = np.maximum(self.abs_tol, self.rel_tol * np.abs(kronrod))
+            done = (errors[rows] <= tolerance) | ~np.isfinite(kronrod)
+            active[rows[done]] = False
+            if pieces >= max_subintervals:
+                break
+            pieces *= 2
+
+        return {"value": values.reshape(shape), "error": errors.reshape(shape), "method": "gauss_kronrod",
+                "evaluations": evaluations, "converged": (~active).reshape(shape) & np.isfinite(values.reshape(shape))}
+
+    # --- Precisión arbitraria (mpmath) ---
+
+    # Dígitos que cubre la aritmética de doble precisión de NumPy
+    DOUBLE_DIGITS = 15
+
+    @staticmethod
+    def arbitrary_precision(func, points, digits: int) -> dict:
+        """
+        Integra con mpmath.quad (tanh-sinh) a 'digits' dígitos significativos.
+        'func' debe aceptar números de mpmath (lambdify con modules='mpmath') y 'points'
+        son los extremos y puntos interiores donde partir el intervalo (pueden ser ±inf).
+        La precisión de trabajo se amplía con los dígitos pedidos para absorber la
+        cancelación; el valor devuelto es un mpf y el error la estimación de mpmath.
+        """
+        import mpmath
+
+        working = digits + max(10, digits // 5)
+        with mpmath.workdps(working):
+            pts = [mpmath.mpf(p) if not isinstance(p, mpmath.mpf) else p for p in points]
+            value, error = mpmath.quad(func, pts, error=True)
+            if isinstance(value, mpmath.mpc):
+                if abs(value.imag) > mpmath.mpf(10) ** (-digits) * max(1, abs(value.real)):
+                    raise ValueError("La integral numérica tiene parte imaginaria no despreciable.")
+                value = value.real
+            tolerance = mpmath.mpf(10) ** (-digits) * max(1, abs(value))
+            converged = mpmath.isfinite(value) and error <= tolerance
+            return {"value": +value, "error": float(error), "method": "mpmath", "evaluations": None,
+                    "converged": bool(converged), "digits": digits}
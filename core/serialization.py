@@ -0,0 +1,39 @@
+# core/serialization.py
+
+import math
+
+import numpy as np
+import sympy
+
+
+def to_serializable(value):
+    """Convierte recursivamente un valor del motor a tipos compatibles con JSON."""
+    if isinstance(value, dict):
+        return {str(k): to_serializable(v) for k, v in value.items() if not callable(v)}
+    if isinstance(value, (list, tuple)):
+        return [to_serializable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_serializable(value.tolist())
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return to_serializable(value.item())
+    if isinstance(value, float):
+        # JSON estricto no admite NaN ni infinitos
+        return value if math.isfinite(value) else str(value)
+    if isinstance(value, sympy.Basic):
+        return str(value)
+    return value
+
+
+def result_to_dict(result: dict) -> dict:
+    """
+    Prepara el resultado de calculate_integral para su salida como JSON.
+    Descarta 'numeric_func' y añade el valor numérico de la integral cuando existe.
+    """
+    data = to_serializable(result)
+    defined = result.get("defined_integral")
+    if isinstance(defined, sympy.Basic) and defined.is_number:
+        try:
+            data["numeric_value"] = to_serializable(float(defined))
+        except TypeError:
+            data["numeric_value"] = None
+    return data
@@ -0,0 +1,369 @@
+# core/server.py
+"""
+Servicio HTTP/JSON local sobre CalculatorEngine.
+
+Uso:
+    python -m core.server [--port 8765] [--workers 4] [--queue 8] [--cache-path cache.db]
+
+Endpoints:
+    POST /integral  {"function", "lower_limit", "upper_limit", "constants"?, "digits"?, "timeout"?}
+    POST /batch     {"jobs": [trabajo, ...], "timeout"?}  (cada trabajo como en /integral o como lista)
+    POST /sweep     {"function", "lower_limit", "upper_limit", "constants", "values", "grid"?, "timeout"?}
+    GET  /health, GET /stats
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .batch import BatchIntegrator
+from .cache import ResultCache
+from .calculator import CalculatorEngine
+from .serialization import result_to_dict, to_serializable
+
+# Motor propio de cada proceso del pool
+_worker_engine = None
+
+
+def _init_worker(time_budget: float, cache_path: str):
+    global _worker_engine
+    # Todos los procesos comparten el nivel en disco de la caché de resultados
+    _worker_engine = CalculatorEngine(time_budget=time_budget, cache_path=cache_path)
+    _worker_engine.warm_up()
+
+
+def _expired() -> dict:
+    return {"success": False, "error_message": "Se superó el plazo de la petición antes de calcular.",
+            "expired": True}
+
+
+def _budget(deadline: float) -> float:
+    """
+    Espera simbólica para un cálculo: la del motor, recortada al tiempo que le queda a la
+    petición. Se pasa en cada llamada; el motor lo comparten peticiones con plazos distintos.
+    """
+    return min(_worker_engine.time_budget, deadline - time.time())
+
+
+def _run_integrals(jobs: list, deadline: float) -> list:
+    """Calcula un bloque de integrales (función, a, b, constantes, dígitos) en un proceso del pool."""
+    results = []
+    for job in jobs:
+        budget = _budget(deadline)
+        if budget <= 0:
+            results.append(_expired())
+            continue
+        results.append(result_to_dict(_worker_engine.calculate_integral(*job, time_budget=budget)))
+    return results
+
+
+def _run_sweep(job: tuple, values: dict, grid: bool, deadline: float) -> dict:
+    budget = _budget(deadline)
+    if budget <= 0:
+        return _expired()
+    return to_serializable(_worker_engine.calculate_sweep(*job, values, grid=grid, time_budget=budget))
+
+
+class ServiceSaturated(Exception):
+    """No quedan plazas en el pool ni en su cola: la petición se rechaza con 429."""
+
+
+class IntegrationService:
+    """
+    Reparte las peticiones entre un pool de procesos acotado. Admite como mucho
+    'workers + queue_size' tareas a la vez; el resto se rechaza en lugar de encolarse sin
+    límite. Las respuestas se guardan en una caché compartida por todas las peticiones, y las
+    tareas idénticas en curso se calculan una sola vez.
+    """
+
+    # Plazo por defecto y máximo de una petición (segundos)
+    DEFAULT_TIMEOUT = 10.0
+    MAX_TIMEOUT = 120.0
+    # Mínimo de integrales por tarea del pool en /batch, y máximo de integrales por petición
+    CHUNKSIZE = 8
+    MAX_BATCH = 1000
+
+    def __init__(self, workers: int = None, queue_size: int = None, time_budget: float = 5.0,
+                 cache_path: str = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + (self.workers if queue_size is None else queue_size)
+        self.time_budget = time_budget
+        self.cache_path = cache_path
+        self.cache = ResultCache(max_entries=4096, max_bytes=64 * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._pending = {}  # clave -> (Future de la tarea en curso, su plazo)
+        self.counters = {"requests": 0, "rejected": 0, "timeouts": 0, "coalesced": 0}
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.time_budget, self.cache_path))
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def deadline(self, data: dict) -> float:
+        timeout = float(data.get("timeout", self.DEFAULT_TIMEOUT))
+        if not 0 < timeout <= self.MAX_TIMEOUT:
+            raise ValueError(f"El plazo debe estar entre 0 y {self.MAX_TIMEOUT:g} segundos.")
+        return time.time() + timeout
+
+    def _submit(self, tasks: list, deadline: float) -> list:
+        """
+        Envía al pool las tareas (clave, store, función, argumentos) que no están ya en curso;
+        'store' recibe el resultado al terminar. Reserva todas las plazas a la vez: o entran
+        todas las tareas nuevas o ninguna. Sólo se reutiliza una tarea en curso si su plazo
+        no vence antes que 'deadline': con menos tiempo su resultado podría ser provisional.
+        """
+        def shared(key) -> bool:
+            entry = self._pending.get(key)
+            return entry is not None and entry[1] >= deadline
+
+        with self._lock:
+            new = [task for task in tasks if not shared(task[0])]
+            if self._in_flight + len(new) > self.capacity:
+                self.counters["rejected"] += 1
+                raise ServiceSaturated()
+            self.counters["coalesced"] += len(tasks) - len(new)
+            for key, store, fn, *args in new:
+                try:
+                    future = self._executor.submit(fn, *args)
+                except BrokenProcessPool:
+                    # Un proceso murió en una petición anterior: se reemplaza el pool entero
+                    self._executor = self._new_executor()
+                    future = self._executor.submit(fn, *args)
+                self._in_flight += 1
+                self._pending[key] = (future, deadline)
+                future.add_done_callback(lambda f, key=key, store=store: self._finished(key, store, f))
+            return [self._pending[key][0] for key, *_ in tasks]
+
+    def _finished(self, key: str, store, future):
+        # La plaza se libera cuando el proceso termina, aunque el cliente ya no espere;
+        # el resultado se guarda igualmente para quien repita la petición
+        with self._lock:
+            self._in_flight -= 1
+            entry = self._pending.get(key)
+            if entry is not None and entry[0] is future:
+                del self._pending[key]
+        if not future.cancelled() and future.exception() is None:
+            store(future.result())
+
+    @staticmethod
+    def _wait(future, deadline: float):
+        # No se cancela al vencer: otra petición puede estar esperando la misma tarea, y el
+        # proceso descarta por sí mismo los trabajos cuyo plazo ya pasó
+        return future.result(timeout=max(0.0, deadline - time.time()))
+
+    def _store(self, key: str, result: dict):
+        # Los resultados provisionales dependen del plazo de quien los pidió: no se comparten
+        if result.get("success") and not result.get("provisional"):
+            self.cache.put(key, result, persist=False)
+
+    @staticmethod
+    def _integral_job(data) -> tuple:
+        job = BatchIntegrator.normalize_job(data)
+        return job + (None,) * (5 - len(job))
+
+    def integrals(self, jobs: list, deadline: float) -> list:
+        """Resultados de varias integrales en el orden recibido; los trabajos inválidos no detienen el resto."""
+        if len(jobs) > self.MAX_BATCH:
+            raise ValueError(f"Como máximo {self.MAX_BATCH} integrales por petición.")
+        results = [None] * len(jobs)
+        missing = {}  # clave -> (trabajo, índices)
+        for index, job in enumerate(jobs):
+            try:
+                job = self._integral_job(job)
+            except Exception as e:
+                results[index] = {"success": False, "error_message": str(e)}
+                continue
+            key = ResultCache.make_key("integral", *job)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                missing.setdefault(key, (job, []))[1].append(index)
+
+        # Como mucho una tarea por proceso, para que un lote grande quepa en el pool
+        keys = list(missing)
+        size = max(self.CHUNKSIZE, -(-len(keys) // self.workers))
+        chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        tasks = [(ResultCache.make_key("chunk", *chunk), lambda found, chunk=chunk: self._store_chunk(chunk, found),
+                  _run_integrals, [missing[key][0] for key in chunk], deadline) for chunk in chunks]
+        for chunk, future in zip(chunks, self._submit(tasks, deadline) if tasks else []):
+            for key, result in zip(chunk, self._wait(future, deadline)):
+                for index in missing[key][1]:
+                    results[index] = result
+        return results
+
+    def _store_chunk(self, keys: list, results: list):
+        for key, result in zip(keys, results):
+            self._store(key, result)
+
+    def sweep(self, data: dict, deadline: float) -> dict:
+        job = BatchIntegrator.normalize_job(data)[:4]
+        values, grid = data.get("values") or {}, bool(data.get("grid", False))
+        key = ResultCache.make_key("sweep", *job, json.dumps(values, sort_keys=True), grid)
+        result = self.cache.get(key)
+        if result is None:
+            (future,) = self._submit([(key, lambda found: self._store(key, found),
+                                       _run_sweep, job, values, grid, deadline)], deadline)
+            result = self._wait(future, deadline)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "capacity": self.capacity, "in_flight": self._in_flight,
+                    **self.counters, "cache": self.cache.stats()}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "CalculadoraIntegrales/1.0"
+    # Tamaño máximo del cuerpo de una petición (bytes)
+    MAX_BODY = 1024 * 1024
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, data: dict, headers: dict = None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: dict = None):
+        self._reply(status, {"success": False, "error_message": message}, headers)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._reply(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._reply(200, service.stats())
+        else:
+            self._error(404, f"Ruta desconocida: {self.path}")
+
+    def do_POST(self):
+        service = self.server.service
+        routes = {"/integral": self._integral, "/batch": self._batch, "/sweep": self._sweep}
+        if self.path not in routes:
+            self._error(404, f"Ruta desconocida: {self.path}")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self._error(400, f"Cabecera Content-Length inválida: {self.headers.get('Content-Length')!r}")
+            return
+        if length > self.MAX_BODY:
+            self._error(413, f"El cuerpo supera {self.MAX_BODY} bytes.")
+            return
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(data, dict):
+                raise ValueError("se esperaba un objeto")
+        except ValueError as e:
+            self._error(400, f"JSON inválido: {e}")
+            return
+
+        service._count("requests")
+        started = time.monotonic()
+        try:
+            status, result = routes[self.path](service, data, service.deadline(data))
+        except ServiceSaturated:
+            self._error(429, "Servidor saturado: inténtelo de nuevo en unos instantes.", {"Retry-After": "1"})
+            return
+        except FutureTimeoutError:
+            service._count("timeouts")
+            self._error(504, "Se superó el plazo de la petición.")
+            return
+        except BrokenProcessPool:
+            self._error(500, "Un proceso del pool terminó inesperadamente; el pool se ha reiniciado.")
+            return
+        except (KeyError, TypeError, ValueError) as e:
+            self._error(400, f"Petición inválida: {e}")
+            return
+        self._reply(status, {**result, "elapsed": time.monotonic() - started})
+
+    @staticmethod
+    def _integral(service, data, deadline):
+        (result,) = service.integrals([data], deadline)
+        if result.get("expired"):
+            raise FutureTimeoutError()
+        return (200 if result.get("success") else 422), result
+
+    @staticmethod
+    def _batch(service, data, deadline):
+        jobs = data["jobs"]
+        if not isinstance(jobs, list):
+            raise ValueError("'jobs' debe ser una lista")
+        results = [{**result, "index": index} for index, result in enumerate(service.integrals(jobs, deadline))]
+        return 200, {"success": True, "results": results}
+
+    @staticmethod
+    def _sweep(service, data, deadline):
+        result = service.sweep(data, deadline)
+        if result.get("expired"):
+            raise FutureTimeoutError()
+        return (200 if result.get("success") else 422), result
+
+
+class IntegrationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: IntegrationService, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.server",
+        description="Servicio HTTP/JSON local para calcular integrales con un pool de procesos.")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha (por defecto sólo localhost)")
+    parser.add_argument("--port", type=int, default=8765, help="Puerto TCP")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("-q", "--queue", type=int, default=None,
+                        help="Tareas en espera admitidas además de las que se ejecutan (por defecto, --workers)")
+    parser.add_argument("-t", "--timeout", type=float, default=5.0,
+                        help="Segundos de espera para la vía simbólica por integral")
+    parser.add_argument("--cache-path", help="Archivo SQLite de la caché de resultados compartida por los procesos")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Registrar cada petición en stderr")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    service = IntegrationService(workers=args.workers, queue_size=args.queue, time_budget=args.timeout,
+                                 cache_path=args.cache_path)
+    server = IntegrationServer((args.host, args.port), service, verbose=args.verbose)
+    print(f"Escuchando en http://{args.host}:{server.server_port} "
+          f"({service.workers} procesos, {service.capacity} tareas como máximo)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
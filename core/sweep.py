@@ -0,0 +1,201 @@
+# core/sweep.py
+
+import time
+
+import numpy as np
+import sympy
+
+from .background import SymbolicSaturated
+from .cache import ResultCache
+
+
+class ParameterSweep:
+    """
+    Evalúa una misma integral para muchos valores de sus constantes simbólicas.
+    Integra una sola vez de forma simbólica y evalúa la forma cerrada sobre arrays
+    de NumPy; si no hay forma cerrada, usa cuadratura vectorizada (o, con límites
+    infinitos, la suma por tramos de la cola en cada punto).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    @staticmethod
+    def _parameter_arrays(values: dict, grid: bool) -> dict:
+        names = list(values)
+        arrays = [np.asarray(values[name], dtype=float) for name in names]
+        if grid:
+            # Producto cartesiano: una dimensión por constante, en el orden recibido
+            arrays = np.meshgrid(*[array.ravel() for array in arrays], indexing='ij')
+        else:
+            arrays = np.broadcast_arrays(*arrays)
+        return dict(zip(names, arrays))
+
+    @staticmethod
+    def _as_real(values, shape) -> np.ndarray:
+        values = np.broadcast_to(np.asarray(values), shape)
+        if np.iscomplexobj(values):
+            values = np.where(np.abs(values.imag) <= 1e-12 * np.maximum(1.0, np.abs(values.real)),
+                              values.real, np.nan)
+        return np.array(values, dtype=float)
+
+    def _poles(self, func_expr, params) -> list:
+        """
+        Posiciones (en función de las constantes) de los polos no integrables del integrando:
+        ceros de bases con exponente <= -1, p. ej. k en 1/(x - k) o en 1/(x - k)^2.
+        """
+        x = self.engine.variable
+        poles = []
+        for node in sympy.preorder_traversal(func_expr):
+            if not (node.is_Pow and node.base.has(x) and node.exp.is_number and node.exp <= -1):
+                continue
+            try:
+                roots = sympy.solve(node.base, x)
+            except (NotImplementedError, ValueError):
+                continue
+            poles.extend(root for root in roots if not root.free_symbols - set(params))
+        return poles
+
+    @staticmethod
+    def _evaluable(defined):
+        """
+        Parte evaluable de la forma cerrada: las ramas de un Piecewise que siguen siendo una
+        Integral (exp(-k*x) en [0, oo] para k <= 0, p. ej.) se sustituyen por NaN y esos
+        puntos pasan a la vía numérica. None si no queda nada que evaluar.
+        """
+        if isinstance(defined, sympy.Piecewise):
+            defined = sympy.Piecewise(*[(sympy.nan if branch.has(sympy.Integral) else branch, condition)
+                                        for branch, condition in defined.args])
+        return None if defined.has(sympy.Integral) else defined
+
+    def _pointwise(self, func, param_arrays, shape) -> np.ndarray:
+        """Evalúa 'func' punto a punto; los puntos que fallan quedan como NaN (y pasan a la cuadratura)."""
+        values = np.full(shape, np.nan, dtype=complex)
+        for index in np.ndindex(shape):
+            try:
+                values[index] = complex(func(*[float(p[index]) for p in param_arrays]))
+            except (TypeError, ValueError, ArithmeticError):
+                pass
+        return self._as_real(values, shape)
+
+    def _limit_values(self, limit, params, param_arrays, shape) -> np.ndarray:
+        """Valores de un límite en cada punto; los constantes demasiado grandes ('1e1000') quedan como ±inf."""
+        if limit.is_number:
+            return np.full(shape, float(limit))
+        return self._as_real(self.engine.compiler.compile(limit, params)(*param_arrays), shape)
+
+    def _singular_mask(self, func_expr, lower, upper, params, param_arrays, shape) -> np.ndarray:
+        """True en los puntos del barrido con un polo del integrando dentro de [a, b] (extremos incluidos)."""
+        singular = np.zeros(shape, dtype=bool)
+        low, high = np.minimum(lower, upper), np.maximum(lower, upper)
+        for pole in self._poles(func_expr, params):
+            with np.errstate(all='ignore'):
+                position = self._as_real(self.engine.compiler.compile(pole, params)(*param_arrays), shape)
+                singular |= (position >= low) & (position <= high)
+        return singular
+
+    def _improper_points(self, integrand, lower, upper, param_arrays, pending, result, error):
+        """
+        Integra uno a uno los puntos pendientes con ImproperIntegrator (límites infinitos).
+        Las colas divergentes quedan como ±inf y las que oscilan sin amortiguarse, como NaN.
+        """
+        improper_integrator = self.engine.improper_integrator
+        for index in zip(*np.nonzero(pending)):
+            args = [float(p[index]) for p in param_arrays]
+            tail = improper_integrator.integrate(lambda t: integrand(t, *args), lower[index], upper[index])
+            result[index] = tail["value"]
+            error[index] = tail["error"]
+
+    def run(self, func_str: str, lower_limit_str: str, upper_limit_str: str, constants_str: str,
+            values: dict, grid: bool = False, time_budget: float = None) -> dict:
+        engine = self.engine
+        started = time.monotonic()
+        x = engine.variable
+
+        local_symbols = engine._prepare_local_symbols(constants_str)
+        constants_key = engine._constants_signature(constants_str)
+        func_expr = engine._parse_cached(func_str, constants_key, local_symbols)
+        a_expr = engine._parse_cached(lower_limit_str, constants_key, local_symbols)
+        b_expr = engine._parse_cached(upper_limit_str, constants_key, local_symbols)
+
+        if not values:
+            raise ValueError("El barrido necesita al menos una constante con valores.")
+        unknown = [name for name in values if name not in constants_key]
+        if unknown:
+            raise ValueError(f"Constantes no declaradas en el barrido: {', '.join(unknown)}")
+        params = [local_symbols[name] for name in values]
+        free = (func_expr.free_symbols | a_expr.free_symbols | b_expr.free_symbols) - {x}
+        missing = free - set(params)
+        if missing:
+            names = ', '.join(sorted(str(s) for s in missing))
+            raise ValueError(f"Faltan valores para las constantes: {names}")
+
+        arrays = self._parameter_arrays(values, grid)
+        param_arrays = [arrays[name] for name in values]
+        shape = param_arrays[0].shape if param_arrays else ()
+
+        # 1. Forma cerrada, compartida con la caché de resultados del motor
+        key = ResultCache.make_key(func_expr, a_expr, b_expr, constants_key)
+        integral = engine.result_cache.get(key)
+        provisional = False
+        if integral is None:
+            try:
+                integral = engine._integrate(func_expr, a_expr, b_expr, None, False, started,
+                                             time_budget=time_budget)
+                provisional = integral.get("provisional", False)
+                if not provisional:
+                    engine.result_cache.put(key, integral)
+            except (TimeoutError, SymbolicSaturated):
+                integral, provisional = None, True
+
+        closed_form = None
+        result = np.full(shape, np.nan)
+        method = "gauss_kronrod"
+        error = np.full(shape, np.inf)
+        evaluable = None
+        if integral is not None and integral["method"] == "symbolic":
+            evaluable = self._evaluable(integral["defined_integral"])
+        if evaluable is not None:
+            closed_form = integral["defined_integral"]
+            closed_func = engine.compiler.compile(evaluable, params)
+            with np.errstate(all='ignore'):
+                try:
+                    result = self._as_real(closed_func(*param_arrays), shape)
+                except (TypeError, ValueError, ArithmeticError):
+                    # Funciones sin versión de NumPy (erf pasa a math.erf) o enteros enormes: punto a punto
+                    result = self._pointwise(closed_func, param_arrays, shape)
+            method = "closed_form"
+            error = np.zeros(shape)
+
+        # 2. Los puntos con un polo en el intervalo divergen: la forma cerrada lo atravesaría
+        #    dando un valor finito falso, así que se marcan y quedan como NaN
+        with np.errstate(all='ignore'):
+            lower, upper = (self._limit_values(limit, params, param_arrays, shape) for limit in (a_expr, b_expr))
+        singular = self._singular_mask(func_expr, lower, upper, params, param_arrays, shape)
+        result[singular] = np.nan
+        error[singular] = np.inf
+
+        # 3. Cuadratura para los puntos sin forma cerrada evaluable: vectorizada con límites
+        #    finitos y, con límites infinitos, por tramos de la cola en cada punto
+        pending = ~np.isfinite(result) & ~singular
+        if pending.any():
+            integrand = engine.compiler.compile(func_expr, [x, *params])
+            improper = np.isinf(lower[pending]) | np.isinf(upper[pending])
+            if improper.any():
+                self._improper_points(integrand, lower, upper, param_arrays, pending, result, error)
+                numeric_method = "improper"
+            else:
+                numeric = engine.numeric_integrator.gauss_kronrod_batch(
+                    integrand, lower[pending], upper[pending], args=[p[pending] for p in param_arrays])
+                finite = np.isfinite(numeric["value"]) & np.isfinite(numeric["error"])
+                result[pending] = np.where(finite, numeric["value"], np.nan)
+                error[pending] = np.where(finite, numeric["error"], np.inf)
+                numeric_method = "gauss_kronrod"
+            method = f"closed_form+{numeric_method}" if method == "closed_form" else numeric_method
+
+        return {
+            "success": True, "values": result, "error_estimate": error, "singular": singular,
+            "parameters": arrays, "closed_form": closed_form, "method": method,
+            # Sin la forma cerrada por falta de tiempo: con más plazo el resultado sería otro
+            "provisional": provisional, "elapsed": time.monotonic() - started
+        }
@@ -0,0 +1,325 @@
+# core/tokenizer.py
+
+import inspect
+from fractions import Fraction
+
+import sympy
+
+from .cache import ResultCache
+
+# Tipos de token
+NUMBER, NAME, FUNCTION, OPERATOR, LPAREN, RPAREN, COMMA, BANG = (
+    "NUMBER", "NAME", "FUNCTION", "OPERATOR", "LPAREN", "RPAREN", "COMMA", "BANG")
+
+# Tokens tras los que una nueva operando implica multiplicación: '2x', ')(' , 'x!y'
+_ENDS_OPERAND = {NUMBER, NAME, RPAREN, BANG}
+_STARTS_OPERAND = {NUMBER, NAME, FUNCTION, LPAREN}
+
+# Potencia de 10 máxima de un literal que se escribe como fracción exacta; más allá, Float
+_EXACT_EXPONENT_LIMIT = 1000
+# Exponente máximo admitido en notación científica y cifras máximas de un literal
+_MAX_EXPONENT = 1_000_000
+_MAX_DIGITS = 4000
+
+# Nombres usados cuando no se proporciona una tabla de símbolos
+_DEFAULT_FUNCTIONS = ("sin", "cos", "tan", "exp", "ln", "log", "sqrt")
+_DEFAULT_NAMES = ("pi", "e", "x")
+# Funciones de SymPy que también se reconocen dentro de una palabra, para que 'sinh' no
+# se divida en sin·h ni 'xcosh' en x·cos·h
+_HYPERBOLIC = ("sinh", "cosh", "tanh", "coth", "sech", "csch",
+               "asinh", "acosh", "atanh", "acoth", "asech", "acsch")
+# Nombres de Python que parse_expr entiende tal cual (condiciones de Piecewise, p. ej.)
+_LITERAL_NAMES = ("True", "False")
+
+
+class ExpressionSyntaxError(ValueError):
+    """Error de sintaxis en la entrada del usuario, con la posición (base 0) donde se detectó."""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (posición {position + 1})")
+        self.message = message
+        self.position = position
+
+
+# Tokenizadores ya construidos, por conjunto de nombres de la tabla de símbolos (LRU acotada)
+_TOKENIZER_CACHE = ResultCache(max_entries=256, max_bytes=8 * 1024 * 1024)
+
+
+class Tokenizer:
+    """
+    Analizador léxico de una sola pasada. Reconoce números, nombres y funciones de la
+    tabla de símbolos, inserta la multiplicación implícita y traduce '^' a '**'.
+    El coste es lineal en la longitud de la entrada.
+    """
+
+    def __init__(self, functions, names):
+        self.functions = frozenset(functions)
+        self.names = frozenset(names)
+        self._known = self.functions | self.names
+        self._hyperbolic = frozenset(_HYPERBOLIC) - self._known
+        self._max_length = max((len(n) for n in self._known | self._hyperbolic), default=1)
+
+    @classmethod
+    def from_symbols(cls, symbols_table: dict = None) -> "Tokenizer":
+        """Construye el tokenizador a partir de la tabla de símbolos del motor."""
+        key = ResultCache.make_key(None if symbols_table is None else frozenset(symbols_table))
+        tokenizer = _TOKENIZER_CACHE.get(key)
+        if tokenizer is None:
+            if symbols_table is None:
+                tokenizer = cls(_DEFAULT_FUNCTIONS, _DEFAULT_NAMES)
+            else:
+                functions = [name for name, value in symbols_table.items()
+                             if callable(value) and not isinstance(value, sympy.Basic)]
+                names = [name for name, value in symbols_table.items() if name not in functions]
+                tokenizer = cls(functions, names)
+            _TOKENIZER_CACHE.put(key, tokenizer, persist=False)
+        return tokenizer
+
+    @staticmethod
+    def _is_sympy_function(name: str, followed_by_paren: bool) -> bool:
+        """
+        Nombre entero de una función de SymPy que no está en la tabla: las clases (sinh, erf,
+        gamma...) se aplican también sin paréntesis; las funciones de Python (diff, integrate...)
+        sólo cuando las sigue '('.
+        """
+        candidate = getattr(sympy, name, None)
+        if isinstance(candidate, sympy.FunctionClass):
+            return True
+        return followed_by_paren and inspect.isfunction(candidate)
+
+    def tokenize(self, text: str) -> list:
+        """Devuelve una lista de (tipo, valor, posición)."""
+        tokens = []
+        last_number = (-1, -1)  # inicio y fin del último literal numérico
+        i, n = 0, len(text)
+        while i < n:
+            char = text[i]
+            if char.isspace():
+                i += 1
+            elif char.isdigit() or (char == "." and i + 1 < n and text[i + 1].isdigit()):
+                start, seen_dot = i, False
+                while i < n and (text[i].isdigit() or text[i] == "."):
+                    if text[i] == ".":
+                        if seen_dot:
+                            raise ExpressionSyntaxError("Número con más de un punto decimal", i)
+                        seen_dot = True
+                    i += 1
+                i = self._exponent_end(text, i)
+                if tokens and tokens[-1][0] == NUMBER and tokens[-1][2] == last_number[0] \
+                        and text[last_number[1]:start].isspace():
+                    # Números separados sólo por espacios forman uno solo, como antes: '1 000' -> 1000
+                    start = self._join_numbers(text, last_number, (start, i))
+                    tokens.pop()
+                tokens.append((NUMBER, self._exact("".join(text[start:i].split()), start), start))
+                last_number = (start, i)
+            elif char.isalpha() or char == "_":
+                start = i
+                while i < n and (text[i].isalnum() or text[i] == "_"):
+                    i += 1
+                self._split_identifier(text, start, i, tokens)
+            elif char == "*" and text.startswith("**", i):
+                tokens.append((OPERATOR, "**", i))
+                i += 2
+            elif char in "<>" and text.startswith("=", i + 1):
+                tokens.append((OPERATOR, char + "=", i))
+                i += 2
+            elif char in "+-*/^%<>&|":
+                tokens.append((OPERATOR, "**" if char == "^" else char, i))
+                i += 1
+            elif char == "(":
+                tokens.append((LPAREN, char, i))
+                i += 1
+            elif char == ")":
+                tokens.append((RPAREN, char, i))
+                i += 1
+            elif char == ",":
+                tokens.append((COMMA, char, i))
+                i += 1
+            elif char == "!":
+                tokens.append((BANG, char, i))
+                i += 1
+            else:
+                raise ExpressionSyntaxError(f"Carácter no válido '{char}'", i)
+        return tokens
+
+    @staticmethod
+    def _join_numbers(text: str, previous: tuple, current: tuple) -> int:
+        """
+        Comprueba que dos literales separados por espacios formen un número válido
+        ('2 3' -> 23, '2 .5' -> 2.5) y devuelve dónde empieza el número unido.
+        """
+        first, second = text[previous[0]:previous[1]], text[current[0]:current[1]]
+        if "e" in first.lower() or (first + second).count(".") > 1:
+            raise ExpressionSyntaxError(f"Número mal formado '{first} {second}'", previous[0])
+        return previous[0]
+
+    @staticmethod
+    def _exact(number: str, position: int) -> str:
+        """
+        Escribe un literal decimal como fracción exacta: '0.1' -> '(1/10)', '2.5e3' -> '2500'.
+        parse_expr convertiría '0.1' en un Float de 15 dígitos, que no sirve para precisiones mayores.
+        El exponente se comprueba antes de expandirlo: más allá de 10^±_EXACT_EXPONENT_LIMIT el
+        literal queda como Float con sus cifras, y los exponentes absurdos se rechazan.
+        """
+        mantissa, _, exponent = number.lower().partition("e")
+        whole, _, fraction = mantissa.partition(".")
+        digits = (whole + fraction).lstrip("0")
+        if len(digits) > _MAX_DIGITS:
+            raise ExpressionSyntaxError(f"Número con más de {_MAX_DIGITS} cifras", position)
+        if len(exponent.lstrip("+-")) > len(str(_MAX_EXPONENT)) or abs(int(exponent or 0)) > _MAX_EXPONENT:
+            raise ExpressionSyntaxError(f"Exponente fuera de rango en '{number}' (máximo 1e±{_MAX_EXPONENT})",
+                                        position)
+        if not (fraction or exponent):
+            return number
+        if not digits:
+            return "0"
+        scale = int(exponent or 0) - len(fraction)
+        if abs(scale) > _EXACT_EXPONENT_LIMIT:
+            return f"Float('{digits}e{scale}', {max(len(digits), 15)})"
+        value = Fraction(int(digits)) * Fraction(10) ** scale
+        return str(value.numerator) if value.denominator == 1 else f"({value.numerator}/{value.denominator})"
+
+    @staticmethod
+    def _exponent_end(text: str, i: int) -> int:
+        """
+        Fin de la notación científica que empieza en i ('e5', 'E-3'), o i si no la hay.
+        Sólo cuenta si la 'e' va seguida de dígitos: '2e' y '2e^x' siguen siendo 2*e.
+        """
+        if i >= len(text) or text[i] not in "eE":
+            return i
+        j = i + 1
+        if j < len(text) and text[j] in "+-":
+            j += 1
+        if j >= len(text) or not text[j].isdigit():
+            return i
+        while j < len(text) and text[j].isdigit():
+            j += 1
+        return j
+
+    def _split_identifier(self, text: str, start: int, end: int, tokens: list):
+        """
+        Divide una secuencia alfanumérica en nombres conocidos por coincidencia más larga:
+        'xsin' -> x, sin; '2pi' se separa antes, en el número. Las letras desconocidas
+        se convierten en símbolos de una letra, igual que hacía la división de SymPy.
+        Los identificadores con '_' ('x_1', 'k_max') se mantienen enteros, y las funciones de
+        SymPy se reconocen por su nombre completo antes de dividir: 'sinh x' -> sinh(x).
+        """
+        word = text[start:end]
+        k = end
+        while k < len(text) and text[k].isspace():
+            k += 1
+        followed_by_paren = text[k:k + 1] == "("
+        if word in self._known:
+            kind = FUNCTION if word in self.functions else NAME
+            tokens.append((kind, word, start))
+            return
+        if word in self._hyperbolic or self._is_sympy_function(word, followed_by_paren):
+            # Funciones de SymPy que no están en la tabla (sinh, erf, gamma, diff...)
+            tokens.append((FUNCTION, word, start))
+            return
+        if "_" in word or word in _LITERAL_NAMES:
+            tokens.append((NAME, word, start))
+            return
+
+        i = 0
+        while i < len(word):
+            for length in range(min(self._max_length, len(word) - i), 0, -1):
+                piece = word[i:i + length]
+                if piece in self._known or piece in self._hyperbolic:
+                    kind = NAME if piece in self.names else FUNCTION
+                    tokens.append((kind, piece, start + i))
+                    i += length
+                    break
+            else:
+                if word[i].isdigit():
+                    j = i
+                    while j < len(word) and word[j].isdigit():
+                        j += 1
+                    tokens.append((NUMBER, word[i:j], start + i))
+                    i = j
+                else:
+                    tokens.append((NAME, word[i], start + i))
+                    i += 1
+
+    def translate(self, text: str) -> str:
+        """
+        Convierte la entrada en una expresión Python explícita para parse_expr:
+        '2x sin x' -> '2*x*sin(x)', 'x^2' -> 'x**2'.
+        """
+        tokens = self.tokenize(text)
+        out = []
+        depth = []  # (posición, sufijo) de los paréntesis abiertos; el sufijo se añade al cerrarlo
+        power = ""  # potencia de una función escrita como 'sin^2(x)', pendiente de su argumento
+        previous = None  # tipo del último token emitido
+        last_operator = None
+        i, n = 0, len(tokens)
+
+        while i < n:
+            kind, value, position = tokens[i]
+
+            if kind in _STARTS_OPERAND and previous in _ENDS_OPERAND:
+                out.append("*")
+
+            if kind == OPERATOR:
+                # Mostrar el operador tal como lo escribió el usuario ('^' en lugar de '**')
+                written = "^" if text[position] == "^" else value
+                unary = value in "+-" and len(value) == 1
+                if previous in (None, OPERATOR, LPAREN, COMMA) and not unary:
+                    raise ExpressionSyntaxError(f"Falta un operando antes de '{written}'", position)
+                out.append(value)
+                last_operator = (written, position)
+            elif kind == FUNCTION:
+                out.append(value)
+                if i + 2 < n and tokens[i + 1][:2] == (OPERATOR, "**") and tokens[i + 2][0] == NUMBER \
+                        and i + 3 < n and tokens[i + 3][0] in (LPAREN, NUMBER, NAME):
+                    # 'sin^2(x)' y 'sin^2 x' -> sin(x)**2
+                    power = "**" + tokens[i + 2][1]
+                    i += 2
+                if i + 1 < n and tokens[i + 1][0] == LPAREN:
+                    pass
+                else:
+                    # Aplicación implícita: 'sinx' -> sin(x), 'sin2x' -> sin(2*x)
+                    j = i + 1
+                    argument = []
+                    while j < n and tokens[j][0] in (NUMBER, NAME):
+                        if argument:
+                            argument.append("*")
+                        argument.append(tokens[j][1])
+                        j += 1
+                    if not argument:
+                        raise ExpressionSyntaxError(f"Se esperaba '(' o un argumento después de '{value}'",
+                                                    position + len(value))
+                    out.append("(" + "".join(argument) + ")" + power)
+                    power = ""
+                    i = j
+                    previous = RPAREN
+                    continue
+            elif kind == LPAREN:
+                depth.append((position, power))
+                power = ""
+                out.append(value)
+            elif kind == RPAREN:
+                if not depth:
+                    raise ExpressionSyntaxError("Paréntesis de cierre sin abrir", position)
+                if previous in (LPAREN, OPERATOR, COMMA):
+                    raise ExpressionSyntaxError("Falta una expresión antes de ')'", position)
+                out.append(value + depth.pop()[1])
+            elif kind == COMMA:
+                if not depth or previous in (LPAREN, OPERATOR, COMMA):
+                    raise ExpressionSyntaxError("Coma inesperada", position)
+                out.append(value)
+            elif kind == BANG:
+                if previous not in _ENDS_OPERAND:
+                    raise ExpressionSyntaxError("'!' debe seguir a un valor", position)
+                out.append(value)
+            else:
+                out.append(value)
+
+            previous = kind
+            i += 1
+
+        if depth:
+            raise ExpressionSyntaxError("Paréntesis sin cerrar", depth[-1][0])
+        if previous == OPERATOR:
+            raise ExpressionSyntaxError(f"Falta un operando después de '{last_operator[0]}'", last_operator[1])
+        return "".join(out)
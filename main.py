@@ -1,22 +1,109 @@
 # main.py (Corregido)
-from ui.main_window import MainWindow
-from core.calculator import CalculatorEngine
-from sympy import latex
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.startup import startup_report
+
+# La interfaz se importa primero; SymPy y el motor se cargan en segundo plano tras el primer pintado
+with startup_report.timed("ui.main_window (customtkinter)"):
+    from ui.main_window import MainWindow
 from ui.components.windows.history_window import HistoryWindow
 
 class AppController:
     """Controlador que conecta la UI con la lógica de cálculo."""
 
+    # Cada cuánto se revisa la cola de resultados del hilo de cálculo
+    POLL_INTERVAL_MS = 50
+    # Tiempo máximo de una petición completa (parseo, integración y LaTeX)
+    REQUEST_TIMEOUT_S = 20.0
+    # Espera tras la última pulsación antes de lanzar la vista previa
+    PREVIEW_DELAY_MS = 250
+    # Historial persistente entre sesiones
+    HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".calculadora_integrales", "historial.db")
+
     def __init__(self):
-        self.model = CalculatorEngine()
+        # El motor (SymPy, NumPy) se crea de forma perezosa: ver la propiedad 'model'
+        self._model = None
+        self._model_lock = threading.Lock()
         # 2. El controlador crea la Vista, pasándose a sí mismo como referencia.
         #    Ahora la vista SIEMPRE tendrá un controlador válido desde el inicio.
         self.view = MainWindow(self)
 
+        # Los cálculos corren en hilos de fondo y devuelven (id_petición, resultado) por esta cola
+        self._results = queue.Queue()
+        self._request_counter = 0
+        self._active_request = None
+        self._timeout_after_id = None
+        # Petición cuyo resultado provisional espera aún la forma cerrada de SymPy
+        self._upgrade_request = None
+
+        # Exportación en segundo plano: progreso y resultado llegan por esta cola
+        self._export_events = queue.Queue()
+        self._export_thread = None
+        # Se activa con el botón Cancelar para detener la exportación en curso
+        self._export_cancel = threading.Event()
+
+        # Desglose de tiempos del último cálculo (se muestra al pulsar la barra de estado)
+        self._last_instrumentation = None
+
+        # Vista previa en vivo: un solo hilo; cada edición invalida las vistas previas anteriores
+        self._preview_executor = None
+        self._preview_future = None
+        self._preview_after_id = None
+        self._preview_generation = 0
+
+    @property
+    def model(self):
+        """Motor de cálculo; si el precalentado aún no terminó, se espera a que termine."""
+        if self._model is None:
+            return self._load_model()
+        return self._model
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                with startup_report.timed("core.calculator (sympy, numpy)"):
+                    from core.calculator import CalculatorEngine
+                self._model = CalculatorEngine(time_budget=10.0, history_path=self.HISTORY_PATH,
+                                               instrument=True, sinks=self._instrumentation_sinks())
+        return self._model
+
+    @staticmethod
+    def _instrumentation_sinks():
+        """Con CALCULADORA_PROFILE_DIR se guarda además un perfil de cProfile por cálculo."""
+        profile_dir = os.environ.get("CALCULADORA_PROFILE_DIR")
+        if not profile_dir:
+            return []
+        from core.instrumentation import ProfileSink
+        return [ProfileSink(profile_dir)]
+
     def run(self):
         """Inicia el bucle principal de la aplicación."""
+        startup_report.mark("ventana creada")
         self.view.update_statusbar("Aplicación iniciada. Lista para calcular.")
+        # Forzar el primer pintado antes de cargar los módulos pesados
+        self.view.update()
+        startup_report.mark("primer pintado")
+        self.view.after(0, self._finish_startup)
         self.view.mainloop()
+        if self._preview_executor is not None:
+            self._preview_executor.shutdown(wait=False, cancel_futures=True)
+        # Escribir las entradas del historial que aún estén en cola
+        if self._model is not None:
+            self._model.history.close()
+
+    def _finish_startup(self):
+        """Carga Matplotlib en el hilo de Tk y precalienta SymPy en segundo plano."""
+        self.view.load_heavy_components()
+        startup_report.mark("gráfica y etiquetas LaTeX cargadas")
+        threading.Thread(target=self._warm_up_model, name="precalentado", daemon=True).start()
+
+    def _warm_up_model(self):
+        self._load_model().warm_up()
+        startup_report.mark("motor simbólico precalentado")
+        startup_report.emit()
 
     def on_calculate_click(self):
         """Maneja el evento del botón 'Calcular'."""
@@ -30,31 +117,253 @@ class AppController:
             view.update_statusbar("Error: Todos los campos son requeridos.", is_error=True)
             return
 
+        # El cálculo completo sustituye a la vista previa pendiente
+        self._cancel_preview()
+
+        # Una nueva petición deja obsoleta a cualquier otra que siga en curso
+        self._request_counter += 1
+        request_id = self._request_counter
+        self._active_request = request_id
+        self._upgrade_request = None
+
+        view.set_busy(True)
         view.update_statusbar("Calculando...")
-        result = self.model.calculate_integral(
-            inputs["function"], inputs["lower_limit"], inputs["upper_limit"], inputs["constants"]
-        )
 
-        if result["success"]:
+        worker = threading.Thread(target=self._calculate_in_background, args=(request_id, inputs),
+                                  name=f"calculo-{request_id}", daemon=True)
+        worker.start()
+
+        self._cancel_timeout()
+        self._timeout_after_id = view.after(int(self.REQUEST_TIMEOUT_S * 1000),
+                                            lambda: self._on_request_timeout(request_id))
+        view.after(self.POLL_INTERVAL_MS, self._poll_results)
+
+    def _calculate_in_background(self, request_id, inputs):
+        """Se ejecuta fuera del hilo de Tk: nunca toca la vista directamente."""
+        if inputs.get("inner_limits"):
+            # Integral doble o triple: los límites de x son los exteriores
+            limits = [(inputs["lower_limit"], inputs["upper_limit"]), *inputs["inner_limits"]]
+            result = self.model.calculate_multiple_integral(inputs["function"], limits, inputs["constants"])
+            self._results.put((request_id, result))
+            return
+        job = (inputs["function"], inputs["lower_limit"], inputs["upper_limit"], inputs["constants"])
+        result = self.model.calculate_integral(*job, digits=inputs.get("digits"))
+        self._results.put((request_id, result))
+        if not result.get("provisional"):
+            return
+        # Resultado numérico a la espera de SymPy: si llega la forma cerrada y no hay una
+        # petición más reciente, se calcula de nuevo (ya desde caché) y se muestra como mejora
+        model = self.model
+        if model.wait_for_symbolic(result["symbolic_key"], timeout=model.BACKGROUND_HARD_LIMIT) \
+                and request_id == self._request_counter:
+            upgraded = model.calculate_integral(*job, digits=inputs.get("digits"), record_history=False)
+            if upgraded["success"] and not upgraded.get("provisional"):
+                self._results.put((request_id, upgraded))
+
+    def _poll_results(self):
+        """Recoge los resultados terminados desde el hilo de Tk (programado con after())."""
+        while True:
+            try:
+                request_id, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            # Los resultados de peticiones canceladas o reemplazadas se descartan
+            if request_id == self._active_request:
+                self._finish_request()
+                self._show_result(result)
+                if result.get("provisional"):
+                    self._upgrade_request = request_id
+            elif request_id == self._upgrade_request:
+                # La forma cerrada sustituye al resultado numérico provisional
+                self._upgrade_request = None
+                self._show_result(result)
+
+        if self._active_request is not None or self._upgrade_request is not None:
+            self.view.after(self.POLL_INTERVAL_MS, self._poll_results)
+
+    def _finish_request(self):
+        self._active_request = None
+        self._cancel_timeout()
+        # El botón Cancelar sigue activo si queda una exportación en curso
+        self.view.set_busy(self._exporting())
+
+    def _exporting(self) -> bool:
+        return self._export_thread is not None and self._export_thread.is_alive()
+
+    def _cancel_timeout(self):
+        if self._timeout_after_id is not None:
+            self.view.after_cancel(self._timeout_after_id)
+            self._timeout_after_id = None
+
+    def _on_request_timeout(self, request_id):
+        self._timeout_after_id = None
+        if request_id != self._active_request:
+            return
+        self._finish_request()
+        self.view.update_statusbar(
+            f"Tiempo agotado: el cálculo superó {self.REQUEST_TIMEOUT_S:g} s y fue descartado.", is_error=True)
+
+    def on_cancel_click(self):
+        """Cancela el cálculo en curso (su resultado se ignorará cuando llegue) y la exportación."""
+        self._upgrade_request = None
+        if self._exporting():
+            self._export_cancel.set()
+            self.view.update_statusbar("Cancelando la exportación...", is_error=True)
+        if self._active_request is None:
+            return
+        self._finish_request()
+        self.view.update_statusbar("Cálculo cancelado.", is_error=True)
+
+    def on_statusbar_click(self):
+        """Muestra las etapas del último cálculo con su duración y el tamaño de las expresiones."""
+        if self._last_instrumentation is None:
+            return
+        from core.instrumentation import format_breakdown
+        self.view.show_info("Desglose del cálculo", format_breakdown(self._last_instrumentation))
+
+    def _show_result(self, result):
+        view = self.view
+        self._last_instrumentation = result.get("instrumentation")
+
+        if result["success"] and result.get("dimension"):
+            self._show_multiple_result(result)
+        elif result["success"]:
             # Manejar el caso donde el resultado es simbólico
             # Usar LaTeX para una presentación matemática limpia
-            defined_result_str = str(latex(result['defined_integral']))
-            indef_result_str = str(latex(result['indefinite_integral']))
+            defined_result_str = result['defined_latex']
+            if result['indefinite_latex'] is not None:
+                indef_result_str = result['indefinite_latex']
+            else:
+                # La vía simbólica no terminó dentro del presupuesto de tiempo
+                indef_result_str = r"\text{No disponible}"
 
             view.update_results(defined_result_str, indef_result_str)
 
+            if result.get("divergent"):
+                view.update_statusbar("La integral diverge: el área bajo la curva no es finita.", is_error=True)
+            elif result["method"] != "symbolic":
+                pending = " (buscando la forma exacta...)" if result.get("provisional") else ""
+                view.update_statusbar(
+                    f"Resultado numérico ({result['method']}), error estimado: {result['error_estimate']:.2e}{pending}")
+            elif result.get("digits"):
+                view.update_statusbar(
+                    f"Cálculo completado con {result['digits']} dígitos, cota de error: {result['error_estimate']:.2e}")
+            else:
+                view.update_statusbar("Cálculo completado. (Clic aquí para ver el desglose de tiempos)")
+
             if result["numeric_func"]:
                 view.plot_function(
                     result["numeric_func"], result["a"], result["b"],
-                    title=f"Gráfica de: ${latex(result['func_expr'])}$",
-                    fill_area=result["can_fill_area"]  # <--- Ahora usamos el nuevo flag can_fill_area
+                    title=f"Gráfica de: ${result['func_latex']}$",
+                    fill_area=result["can_fill_area"],  # <--- Ahora usamos el nuevo flag can_fill_area
+                    window=result.get("plot_window")
                 )
             else:
                 # Si no se puede graficar (contiene símbolos), limpiamos el plot
                 view.clear_plot("Función no graficable (contiene símbolos)")
                 view.update_statusbar("Cálculo simbólico completado. No se puede graficar la función.", is_error=True)
+        else:
+            view.update_statusbar(f"Error: {result['error_message']}", is_error=True)
+
+    def _show_multiple_result(self, result):
+        """Integral doble o triple: resultado, coste de la cubatura y mapa de calor en 2-D."""
+        view = self.view
+        if result["method"] == "symbolic":
+            cost = "Integración simbólica iterada"
+        else:
+            cost = f"Cubatura: {result['evaluations']:,} evaluaciones, error estimado {result['error_estimate']:.1e}"
+        view.update_multiple_results(result["integral_latex"], result["defined_latex"], cost)
+        view.update_statusbar(f"Cálculo completado ({result['elapsed'] * 1000:.0f} ms). {cost}.")
+
+        if result.get("region") is not None:
+            view.plot_heatmap(result["numeric_func"], result["region"],
+                              title=f"Mapa de calor de: ${result['func_latex']}$")
+        elif result["dimension"] == 3:
+            view.clear_plot("Integral triple: sin vista gráfica")
+        else:
+            view.clear_plot("Función no graficable (contiene símbolos)")
+
+    # --- Vista previa en vivo ---
+
+    def on_input_changed(self):
+        """Cada edición reinicia la espera; la vista previa sólo se lanza cuando se deja de escribir."""
+        self._cancel_preview()
+        if not self.view.preview_enabled():
+            return
+        self._preview_after_id = self.view.after(self.PREVIEW_DELAY_MS, self._start_preview)
+
+    def _cancel_preview(self):
+        # Las vistas previas en curso ven el cambio de generación y se abandonan entre etapas
+        self._preview_generation += 1
+        if self._preview_after_id is not None:
+            self.view.after_cancel(self._preview_after_id)
+            self._preview_after_id = None
+        if self._preview_future is not None:
+            self._preview_future.cancel()  # sólo tiene efecto si aún no había empezado
+            self._preview_future = None
+
+    def _start_preview(self):
+        self._preview_after_id = None
+        inputs = self.view.get_inputs()
+        if not inputs["function"].strip():
+            self.view.clear_preview()
+            return
+        if self._preview_executor is None:
+            self._preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vista-previa")
+        generation = self._preview_generation
+        self._preview_future = self._preview_executor.submit(self._run_preview, generation, inputs)
+        self.view.after(self.POLL_INTERVAL_MS, self._poll_preview, self._preview_future, generation)
+
+    def _run_preview(self, generation, inputs):
+        """Se ejecuta en el hilo de la vista previa: nunca toca la vista."""
+        def stale():
+            return generation != self._preview_generation
+
+        if stale():
+            return None
+        # En las integrales múltiples sólo se previsualiza f; la estimación es de una variable
+        lower, upper = ("", "") if inputs.get("inner_limits") else (inputs["lower_limit"], inputs["upper_limit"])
+        return self.model.preview_integral(inputs["function"], lower, upper, inputs["constants"], cancelled=stale)
+
+    def _poll_preview(self, future, generation):
+        if generation != self._preview_generation or future.cancelled():
+            return
+        if not future.done():
+            self.view.after(self.POLL_INTERVAL_MS, self._poll_preview, future, generation)
+            return
+        self._preview_future = None
+        result = future.result()
+        if result is not None:
+            self._show_preview(result)
+
+    def _show_preview(self, result):
+        view = self.view
+        if not result["success"]:
+            view.clear_preview()
+            view.update_statusbar(f"Vista previa: {result['error_message']}", is_error=True)
+            return
+
+        estimate = result["estimate"]
+        preview = rf"f(x) = {result['func_latex']}"
+        if estimate is None:
+            view.update_statusbar("Vista previa lista. Pulse Calcular para la integral.")
+        elif estimate["divergent"]:
+            preview += r"\quad \int f(x)dx\ \text{no converge}"
+            view.update_statusbar("Vista previa: la integral parece no converger. Pulse Calcular para confirmarlo.",
+                                  is_error=True)
+        else:
+            preview += rf"\quad \int f(x)dx \approx {estimate['value']:.6g}"
+            view.update_statusbar(f"Vista previa: estimación rápida ({estimate['evaluations']} evaluaciones, "
+                                  f"error ~{estimate['error']:.1e}). Pulse Calcular para el resultado exacto.")
+        view.update_preview(preview)
+
+        # No se sustituye la gráfica mientras hay un cálculo completo en curso
+        if result["numeric_func"] is not None and self._active_request is None:
+            view.plot_preview(result["numeric_func"], result["a"], result["b"],
+                              title=f"Vista previa de: ${result['func_latex']}$", window=result["window"])
 
     def on_clear_click(self):
+        self._cancel_preview()
         self.view.clear_ui()
 
     def on_key_press(self, value):
@@ -63,17 +372,70 @@ class AppController:
     # >>> NUEVO: Método para mostrar la ventana de historial
     def on_show_history_click(self):
         """Muestra una ventana con el historial de cálculos."""
-        history = self.model.get_history()
-        if not history:
+        # La ventana pide páginas al historial según se desplaza; sólo lee las entradas ya
+        # escritas, así que nunca espera en el hilo de Tk al hilo que las guarda
+        model = self.model
+        if not model.history_count(wait=False):
             self.view.show_info("Historial", "El historial de cálculos está vacío.")
             return
 
-        # Crea la ventana del historial, pasándole la data
-        history_window = HistoryWindow(master=self.view, history_data=history)
+        history_window = HistoryWindow(
+            master=self.view,
+            fetch_page=lambda **query: model.get_history(wait=False, **query),
+            count=lambda search: model.history_count(search, wait=False))
         history_window.focus()
 
     def on_export_click(self):
-        self.view.update_statusbar("FUNCIONALIDAD: Exportar a PDF (aún no implementada)")
+        """Exporta el historial (y la gráfica actual) a PDF, CSV o JSON en segundo plano."""
+        if self._exporting():
+            self.view.update_statusbar("Ya hay una exportación en curso.", is_error=True)
+            return
+        if not self.model.history_count():
+            self.view.show_info("Exportar", "El historial de cálculos está vacío.")
+            return
+        path = self.view.ask_export_path()
+        if not path:
+            return
+
+        # La figura pertenece a Tk: la imagen se captura aquí, en el hilo de la interfaz
+        plot_png = self.view.get_plot_image()
+        self.view.update_statusbar("Exportando historial... (Cancelar la detiene)")
+        self._export_cancel = threading.Event()
+        self._export_thread = threading.Thread(target=self._export_in_background,
+                                               args=(path, plot_png, self._export_cancel),
+                                               name="exportacion", daemon=True)
+        self._export_thread.start()
+        self.view.set_busy(True)
+        self.view.after(self.POLL_INTERVAL_MS, self._poll_export)
+
+    def _export_in_background(self, path, plot_png, cancel_event):
+        from utils.export import HistoryExporter
+
+        exporter = HistoryExporter(self.model.history)
+        result = exporter.export(path, plot_png=plot_png, cancel_event=cancel_event,
+                                 progress=lambda done, total: self._export_events.put(("progress", done, total)))
+        self._export_events.put(("done", result, None))
+
+    def _poll_export(self):
+        finished = False
+        while True:
+            try:
+                kind, first, second = self._export_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                percent = 100 * first / second if second else 100
+                self.view.update_statusbar(f"Exportando historial... {first}/{second} ({percent:.0f}%)")
+            else:
+                finished = True
+                self.view.set_busy(self._active_request is not None)
+                if first["success"]:
+                    self.view.update_statusbar(f"Historial exportado ({first['rows']} entradas): {first['path']}")
+                else:
+                    self.view.update_statusbar(f"Error al exportar: {first['error_message']}", is_error=True)
+
+        if not finished:
+            self.view.after(self.POLL_INTERVAL_MS, self._poll_export)
 
     def on_show_help_click(self):
         self.view.update_statusbar("FUNCIONALIDAD: Mostrar ventana de ayuda (aún no implementada)")
@@ -0,0 +1,44 @@
+# tests/test_benchmarks.py
+import pytest
+
+from benchmarks import bench_pipeline
+from core.calculator import CalculatorEngine
+
+
+def test_definida_nula_no_repite_integrate(monkeypatch):
+    calls = []
+    original = bench_pipeline.integrate
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(bench_pipeline, "integrate", counting)
+    case = ("impar", "trigonometrica", "sin(x)", "-1", "1", "")
+    timings = bench_pipeline.run_case(CalculatorEngine(time_budget=10.0), case, timeout=10.0)
+    assert timings["definite"] is not None
+    # Sólo la antiderivada: la integral definida (0) sale de ella
+    assert len(calls) == 1
+
+
+def test_corpus_con_casos_unicos():
+    names = [case[0] for case in bench_pipeline.CORPUS]
+    assert len(names) == len(set(names)) == 22
+
+
+def test_etapa_colgada_no_afecta_a_los_casos_siguientes():
+    # Una etapa que no termina se interrumpe y no ocupa huecos simbólicos del motor
+    engine = CalculatorEngine(time_budget=10.0)
+
+    def forever():
+        while True:
+            pass
+
+    with pytest.raises(bench_pipeline.StageTimeout):
+        bench_pipeline.run_with_limit(forever, limit=0.1)
+    assert bench_pipeline.run_with_limit(lambda a: a + 1, 1, limit=5) == 2
+    assert engine._background_slots.acquire(blocking=False)
+
+    case = ("polinomio", "polinomio", "3x^2 + 2x + 1", "0", "1", "")
+    timings = bench_pipeline.run_case(engine, case, timeout=10.0)
+    assert timings["indefinite"] is not None and timings["definite"] is not None
@@ -0,0 +1,121 @@
+# tests/test_calculator.py
+import threading
+import time
+
+import pytest
+import sympy
+
+from core.background import SymbolicSaturated
+from core.calculator import CalculatorEngine
+
+
+@pytest.fixture
+def engine():
+    return CalculatorEngine(time_budget=10.0, prefer_exact=True)
+
+
+def test_integral_simbolica(engine):
+    result = engine.calculate_integral("3x^2 + 2x + 1", "0", "1")
+    assert result["success"]
+    assert result["method"] == "symbolic"
+    assert float(result["defined_integral"]) == pytest.approx(3.0)
+
+
+def test_hilos_simbolicos_acotados_por_motor():
+    # Sin hueco libre, la vía simbólica falla al momento (y con su propio error) en lugar de crear otro hilo
+    engine, other = CalculatorEngine(), CalculatorEngine()
+    engine._background_slots = threading.BoundedSemaphore(1)
+    release = threading.Event()
+    first = engine._run_in_background(release.wait)
+    second = engine._run_in_background(lambda: 1)
+    with pytest.raises(SymbolicSaturated):
+        second.result(timeout=0)
+    # Los huecos son de cada motor: los demás no se ven afectados
+    assert other._run_in_background(lambda: 2).result(timeout=5) == 2
+    release.set()
+    assert first.result(timeout=5)
+    assert engine._run_in_background(lambda: 1).result(timeout=5) == 1
+
+
+def test_hilo_colgado_libera_su_hueco(monkeypatch):
+    # Un hilo que no termina se abandona al pasar el plazo máximo y deja de ocupar su hueco
+    monkeypatch.setattr(CalculatorEngine, "BACKGROUND_HARD_LIMIT", 0.2)
+    engine = CalculatorEngine(time_budget=0.0)
+    engine._background_slots = threading.BoundedSemaphore(1)
+
+    def forever():
+        while True:
+            pass
+
+    hung = engine._run_in_background(forever)
+    with pytest.raises(TimeoutError):
+        hung.result(timeout=5)
+    assert engine._run_in_background(lambda: 1).result(timeout=5) == 1
+    deadline = time.monotonic() + 5
+    while any(t.name == "integracion-simbolica" and t.is_alive() for t in threading.enumerate()) \
+            and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not any(t.name == "integracion-simbolica" and t.is_alive() for t in threading.enumerate())
+
+
+def test_sin_hueco_se_usa_la_via_numerica(monkeypatch):
+    monkeypatch.setattr(CalculatorEngine, "MAX_BACKGROUND_THREADS", 0)
+    result = CalculatorEngine().calculate_integral("exp(-x^2)", "0", "1")
+    assert result["success"]
+    assert result["method"] != "symbolic" and result["provisional"]
+    assert float(result["defined_integral"]) == pytest.approx(float(sympy.sqrt(sympy.pi) / 2 * sympy.erf(1)))
+
+
+def test_sin_hueco_ni_via_numerica_no_es_un_plazo_vencido(monkeypatch):
+    monkeypatch.setattr(CalculatorEngine, "MAX_BACKGROUND_THREADS", 0)
+    result = CalculatorEngine(time_budget=1.0).calculate_integral("k*x", "0", "1", "k")
+    assert not result["success"]
+    assert "integraciones simbólicas en curso" in result["error_message"]
+    assert "límite" not in result["error_message"]
+
+
+def test_resultado_por_plazo_vencido_no_se_guarda(tmp_path):
+    engine = CalculatorEngine(time_budget=0.0, prefer_exact=True, cache_path=str(tmp_path / "cache.db"))
+    degraded = engine.calculate_integral("x^3 exp(-x)", "0", "5")
+    assert degraded["success"]
+    assert degraded["method"] != "symbolic" and degraded["provisional"]
+    assert len(engine.result_cache) == 0
+
+    # Con más tiempo vuelve la forma cerrada, también desde otro motor sobre la misma caché en disco
+    engine.time_budget = 10.0
+    exact = engine.calculate_integral("x^3 exp(-x)", "0", "5")
+    assert exact["method"] == "symbolic" and exact["indefinite_integral"] is not None
+    assert not exact["provisional"]
+    other = CalculatorEngine(time_budget=10.0, cache_path=str(tmp_path / "cache.db"))
+    assert other.calculate_integral("x^3 exp(-x)", "0", "5")["method"] == "symbolic"
+
+
+def test_respuesta_numerica_sin_esperar_a_sympy(monkeypatch):
+    # Por defecto no se espera a SymPy si la cuadratura ya convergió; la forma cerrada llega después
+    engine = CalculatorEngine(time_budget=10.0)
+    release = threading.Event()
+    original = engine._symbolic_integrals
+
+    def slow(*args):
+        release.wait(10)
+        return original(*args)
+
+    monkeypatch.setattr(engine, "_symbolic_integrals", slow)
+    started = time.monotonic()
+    result = engine.calculate_integral("x^3 exp(-x)", "0", "5")
+    assert time.monotonic() - started < 5
+    assert result["method"] != "symbolic" and result["provisional"]
+    assert float(result["defined_integral"]) == pytest.approx(6 - 236 * float(sympy.exp(-5)))
+
+    release.set()
+    assert engine.wait_for_symbolic(result["symbolic_key"], timeout=10)
+    upgraded = engine.calculate_integral("x^3 exp(-x)", "0", "5", record_history=False)
+    assert upgraded["method"] == "symbolic" and not upgraded["provisional"]
+    assert engine.history_count() == 1
+
+
+def test_resultado_simbolico_se_reutiliza(engine):
+    engine.calculate_integral("sin(x)^2", "0", "pi")
+    hits = engine.result_cache.hits
+    assert engine.calculate_integral("sin(x) sin(x)", "0", "pi")["method"] == "symbolic"
+    assert engine.result_cache.hits == hits + 1
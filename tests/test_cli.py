@@ -0,0 +1,70 @@
+# tests/test_cli.py
+import io
+import json
+
+import pytest
+
+from core import cli
+from core.batch import BatchIntegrator
+
+
+def run_cli(capsys, monkeypatch, lines, *argv):
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines) + "\n"))
+    code = cli.main(["-", *argv])
+    return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_normalize_job():
+    assert BatchIntegrator.normalize_job(["x", 0, 1]) == ("x", "0", "1", "")
+    assert BatchIntegrator.normalize_job({"function": "x", "lower_limit": 0, "upper_limit": 1, "digits": "20"}) \
+        == ("x", "0", "1", "", 20)
+    with pytest.raises(ValueError):
+        BatchIntegrator.normalize_job(["x", "0"])
+    with pytest.raises(ValueError):
+        BatchIntegrator.normalize_job(["x", "0", "1", "", "muchos"])
+    with pytest.raises(ValueError):
+        BatchIntegrator.normalize_job(42)
+
+
+def test_lineas_invalidas_no_detienen_el_lote(capsys, monkeypatch):
+    lines = [
+        '["x^2", "0", "1"]',
+        '["x", "0"]',                                   # faltan campos
+        '{"function": "x", "lower_limit": "0", "upper_limit": "1", "digits": "diez"}',
+        '{"function": "x"}',                            # faltan los límites
+        'no es json',
+        '["x", "0", "2", "", 20]',
+    ]
+    code, results = run_cli(capsys, monkeypatch, lines)
+    assert code == 1
+    assert [r["index"] for r in results] == list(range(6))
+    assert [r["success"] for r in results] == [True, False, False, False, False, True]
+    assert results[0]["numeric_value"] == pytest.approx(1 / 3)
+    assert results[5]["digits"] == 20 and results[5]["numeric_value"] == pytest.approx(2.0)
+
+
+def test_lote_en_paralelo(capsys, monkeypatch):
+    lines = ['["x", "0", "1"]', '["x", "0"]', '["2x", "0", "1"]']
+    code, results = run_cli(capsys, monkeypatch, lines, "--workers", "2")
+    assert code == 1
+    assert [r["success"] for r in results] == [True, False, True]
+    assert results[2]["numeric_value"] == pytest.approx(1.0)
+
+
+def test_un_solo_pool_para_todas_las_ventanas(capsys, monkeypatch):
+    # Cada ventana de la entrada se reparte en el mismo pool en lugar de crear uno nuevo
+    monkeypatch.setattr(cli, "STREAM_WINDOW", 2)
+    pools = []
+    original = BatchIntegrator.executor
+
+    def counting(self):
+        pools.append(self)
+        return original(self)
+
+    monkeypatch.setattr(BatchIntegrator, "executor", counting)
+    lines = [f'["{n}x", "0", "1"]' for n in range(1, 6)] + ['["x", "0"]']
+    code, results = run_cli(capsys, monkeypatch, lines, "--workers", "2")
+    assert code == 1
+    assert len(pools) == 1
+    assert [r["index"] for r in results] == list(range(6))
+    assert [r["numeric_value"] for r in results[:5]] == pytest.approx([n / 2 for n in range(1, 6)])
@@ -0,0 +1,64 @@
+# tests/test_compiler.py
+import pickle
+
+import numpy as np
+import pytest
+import sympy
+
+from core.compiler import KernelCompiler
+
+x, k = sympy.symbols("x k")
+GRID = np.linspace(0.1, 2.9, 57)
+
+
+@pytest.fixture
+def compiler():
+    return KernelCompiler()
+
+
+@pytest.mark.parametrize("expr", [
+    # Subexpresiones comunes reutilizadas varias veces
+    sympy.sin(x) ** 2 + sympy.sin(x) * sympy.cos(x) + sympy.cos(x) ** 2,
+    sympy.exp(-x ** 2) * sympy.sin(x ** 3) + sympy.exp(-x ** 2),
+    # Cadenas de Add/Mul que comparten factores: los buffers liberados no deben pisar valores vivos
+    (x + 1) * (x + 2) * (x + 3) + (x + 1) * (x + 2) + (x + 1),
+    (sympy.sin(x) + 1) * (sympy.cos(x) + 2) / ((sympy.sin(x) + 1) * (x + 3)) - sympy.cos(x) - 4,
+    -x * sympy.exp(x) / (1 + x ** 2) ** sympy.Rational(1, 2) + sympy.sec(x) * sympy.cot(x),
+    x ** k + k * sympy.log(x) + sympy.sqrt(x * k),
+])
+def test_kernel_igual_que_lambdify(compiler, expr):
+    args = (x, k)
+    kernel = compiler.compile(expr, args)
+    reference = sympy.lambdify(args, expr, modules="numpy")
+    assert kernel.vectorised
+    np.testing.assert_allclose(kernel(GRID, 1.5), reference(GRID, 1.5), rtol=1e-12)
+    # Segunda llamada con los buffers ya usados y otra forma
+    grid = GRID.reshape(3, 19)
+    np.testing.assert_allclose(kernel(grid, np.array([[0.5], [1.0], [2.0]])),
+                               reference(grid, np.array([[0.5], [1.0], [2.0]])), rtol=1e-12)
+
+
+def test_escalar_devuelve_escalar(compiler):
+    kernel = compiler.compile(x ** 2 + sympy.sin(x), x)
+    value = kernel(0.5)
+    assert np.ndim(value) == 0 and not isinstance(value, np.ndarray)
+    assert value == pytest.approx(0.25 + np.sin(0.5))
+
+
+def test_salida_del_llamador(compiler):
+    kernel = compiler.compile(sympy.exp(-x) * x, x)
+    out = np.empty_like(GRID)
+    assert kernel(GRID, out=out) is out
+    np.testing.assert_allclose(out, np.exp(-GRID) * GRID)
+
+
+def test_sin_traduccion_usa_lambdify(compiler):
+    kernel = compiler.compile(sympy.Piecewise((x, x < 1), (1, True)), x)
+    assert not kernel.vectorised
+    np.testing.assert_allclose(kernel(np.array([0.5, 2.0])), [0.5, 1.0])
+
+
+def test_kernel_se_recompila_al_deserializar(compiler):
+    kernel = compiler.compile(sympy.tan(x) + x, x)
+    copy = pickle.loads(pickle.dumps(kernel))
+    np.testing.assert_allclose(copy(GRID), kernel(GRID))
@@ -0,0 +1,47 @@
+# tests/test_export.py
+import csv
+import json
+import threading
+
+import pytest
+
+from core.history_store import HistoryStore
+from utils.export import HistoryExporter
+
+
+@pytest.fixture
+def history():
+    store = HistoryStore()
+    for n in range(12):
+        store.add(f"{n}x", "0", "1", f"\\frac{{{n}}}{{2}}", "", n / 2)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+def test_exporta_por_paginas(tmp_path, history, fmt):
+    path = str(tmp_path / f"historial.{fmt}")
+    progress = []
+    result = HistoryExporter(history, page_size=5).export(path, progress=lambda done, total: progress.append(done))
+    assert result["success"] and result["rows"] == 12
+    assert progress == [5, 10, 12]
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f)) if fmt == "csv" else json.load(f)
+    assert len(rows) == 12 and rows[0]["function"] == "11x"
+
+
+def test_cancelar_no_deja_archivo(tmp_path, history):
+    path = tmp_path / "historial.csv"
+    cancel = threading.Event()
+    exporter = HistoryExporter(history, page_size=5)
+    result = exporter.export(str(path), progress=lambda done, total: cancel.set(), cancel_event=cancel)
+    assert not result["success"] and "cancelada" in result["error_message"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pdf_limitado_a_pdf_max_rows(tmp_path, history, monkeypatch):
+    # El PDF se compone en memoria: los historiales grandes se rechazan antes de empezar
+    monkeypatch.setattr(HistoryExporter, "PDF_MAX_ROWS", 10)
+    result = HistoryExporter(history).export(str(tmp_path / "historial.pdf"))
+    assert not result["success"] and "CSV o JSON" in result["error_message"]
+    assert list(tmp_path.iterdir()) == []
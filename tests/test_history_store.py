@@ -0,0 +1,32 @@
+# tests/test_history_store.py
+import time
+
+from core.history_store import HistoryStore
+
+
+def test_consulta_sin_esperar_a_la_escritura():
+    # El hilo de escritura agrupa durante flush_interval: wait=False lee sólo lo ya escrito, sin bloquear
+    store = HistoryStore(flush_interval=2.0)
+    try:
+        store.add("x", "0", "1", "\\frac{1}{2}", "", 0.5)
+        started = time.monotonic()
+        assert store.count(wait=False) == 0
+        assert store.query(wait=False) == []
+        assert time.monotonic() - started < 1.0
+        assert store.count() == 1
+        assert store.query(wait=False, order_by="result", limit=1)[0]["numeric_value"] == 0.5
+    finally:
+        store.close()
+
+
+def test_paginas_ordenadas_y_filtradas():
+    store = HistoryStore()
+    try:
+        for n in range(30):
+            store.add(f"{n}x", "0", "1", f"r{n}", "", float(n))
+        store.flush()
+        page = store.query(order_by="result", descending=False, limit=5, offset=10, wait=False)
+        assert [entry["numeric_value"] for entry in page] == [10.0, 11.0, 12.0, 13.0, 14.0]
+        assert store.count("2", wait=False) == len(store.query("2", limit=None, wait=False)) == 12
+    finally:
+        store.close()
@@ -0,0 +1,99 @@
+# tests/test_improper.py
+import math
+
+import numpy as np
+import pytest
+import sympy
+
+from core.calculator import CalculatorEngine
+from core.improper import ImproperIntegrator
+
+
+@pytest.fixture
+def integrator():
+    return ImproperIntegrator()
+
+
+@pytest.fixture
+def no_symbolic(monkeypatch):
+    """Motores sin huecos para la vía simbólica: sólo disponen de la numérica."""
+    monkeypatch.setattr(CalculatorEngine, "MAX_BACKGROUND_THREADS", 0)
+
+
+@pytest.mark.parametrize("func, a, b, expected", [
+    (lambda x: np.exp(-x / 100), 0.0, math.inf, 100.0),
+    (lambda x: np.exp(-x / 1000), 0.0, math.inf, 1000.0),
+    (lambda x: np.exp(-(x - 1000) ** 2), 0.0, math.inf, math.sqrt(math.pi)),
+    (lambda x: np.exp(-1000 * x), 0.0, math.inf, 1e-3),
+    (lambda x: 1 / (1 + x ** 2), -math.inf, math.inf, math.pi),
+    (lambda x: np.exp(x), -math.inf, 0.0, 1.0),
+])
+def test_colas_que_convergen(integrator, func, a, b, expected):
+    # La escala del decaimiento no tiene por qué parecerse a la de los límites
+    result = integrator.integrate(func, a, b)
+    assert result["behaviour"] == "converge" and result["converged"]
+    assert result["value"] == pytest.approx(expected, rel=1e-9)
+    assert abs(result["value"] - expected) <= max(result["error"], 1e-12 * expected)
+
+
+@pytest.mark.parametrize("func, a, expected", [
+    (lambda x: x ** -1.1, 1.0, 10.0),
+    (lambda x: 1 / (x * np.log(x) ** 2), 2.0, 1 / math.log(2)),
+])
+def test_colas_lentas_no_se_dan_por_convergidas(integrator, func, a, expected):
+    result = integrator.integrate(func, a, math.inf)
+    assert result["behaviour"] == "converge"
+    assert not result["converged"]
+    assert abs(result["value"] - expected) <= result["error"]
+
+
+@pytest.mark.parametrize("func, a", [
+    (lambda x: 1 / x, 1.0),
+    (lambda x: 1 / (x * np.log(x)), 2.0),
+    (lambda x: x ** 2, 0.0),
+])
+def test_colas_divergentes(integrator, func, a):
+    result = integrator.integrate(func, a, math.inf)
+    assert result["behaviour"] == "diverge" and result["divergent"]
+    assert result["value"] == math.inf
+
+
+def test_ventana_acotada_en_colas_lentas(integrator):
+    result = integrator.integrate(lambda x: x ** -1.1, 1.0, math.inf)
+    assert result["window"][1] <= 1.0 + 2.0 ** ImproperIntegrator.WINDOW_SEGMENT
+
+
+@pytest.mark.parametrize("func, expected", [("exp(-x/100)", 100), ("exp(-x/1000)", 1000)])
+def test_decaimiento_lento_no_es_divergencia(func, expected):
+    result = CalculatorEngine(time_budget=10.0).calculate_integral(func, "0", "oo")
+    assert result["success"] and not result["divergent"]
+    assert float(result["defined_integral"]) == pytest.approx(expected)
+
+
+def test_divergencia_confirmada_por_sympy():
+    result = CalculatorEngine(time_budget=10.0).calculate_integral("1/x", "1", "oo")
+    assert result["success"] and result["divergent"]
+    assert result["method"] == "symbolic" and result["defined_integral"] == sympy.oo
+
+
+def test_divergencia_por_tramos_es_provisional(no_symbolic):
+    engine = CalculatorEngine(time_budget=1.0)
+    result = engine.calculate_integral("1/x", "1", "oo")
+    assert result["success"] and result["divergent"] and result["provisional"]
+    assert result["defined_integral"] == sympy.oo
+    assert len(engine.result_cache) == 0
+
+
+def test_cola_numerica_sin_sympy(no_symbolic):
+    result = CalculatorEngine(time_budget=1.0).calculate_integral("exp(-(x-1000)^2)", "0", "oo")
+    assert result["success"] and not result["divergent"]
+    assert result["method"] == "improper"
+    assert float(result["defined_integral"]) == pytest.approx(math.sqrt(math.pi), rel=1e-9)
+
+
+def test_cola_lenta_sin_sympy_informa_su_error(no_symbolic):
+    # log es decimal en el parser: la integral vale ln(10)^2 / ln(2)
+    expected = math.log(10) ** 2 / math.log(2)
+    result = CalculatorEngine(time_budget=1.0).calculate_integral("1/(x*log(x)^2)", "2", "oo")
+    assert result["success"] and not result["divergent"]
+    assert abs(float(result["defined_integral"]) - expected) <= result["error_estimate"]
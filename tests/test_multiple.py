@@ -0,0 +1,37 @@
+# tests/test_multiple.py
+import pytest
+
+from core.calculator import CalculatorEngine
+
+
+@pytest.fixture
+def engine():
+    return CalculatorEngine(time_budget=10.0)
+
+
+def test_integral_doble_con_region(engine):
+    result = engine.calculate_multiple_integral("x*y", [("0", "1"), ("0", "x")])
+    assert result["success"]
+    assert float(result["defined_integral"]) == pytest.approx(0.125)
+    assert result["region"]["x_range"] == (0.0, 1.0)
+    assert result["region"]["y_range"] == pytest.approx((0.0, 1.0))
+
+
+def test_integral_triple(engine):
+    result = engine.calculate_multiple_integral("1", [("0", "1"), ("0", "1 - x"), ("0", "1 - x - y")])
+    assert result["success"]
+    assert float(result["defined_integral"]) == pytest.approx(1 / 6)
+
+
+def test_region_sin_valores_reales(engine):
+    # sqrt(x) no es real en [-2, -1]: ningún límite de y deja puntos para delimitar la región
+    result = engine.calculate_multiple_integral("x*y", [("-2", "-1"), ("sqrt(x)", "sqrt(x) + 1")])
+    assert not result["success"]
+    assert "no toman valores reales" in result["error_message"]
+    assert engine.history_count() == 0
+
+
+def test_limites_infinitos_no_admitidos(engine):
+    result = engine.calculate_multiple_integral("exp(-x - y)", [("0", "oo"), ("0", "1")])
+    assert not result["success"]
+    assert "límites finitos" in result["error_message"]
@@ -0,0 +1,111 @@
+# tests/test_parser.py
+import pytest
+import sympy
+
+from core.calculator import CalculatorEngine
+from core.parser import InputParser
+from core.tokenizer import ExpressionSyntaxError
+
+x = sympy.Symbol("x")
+
+
+@pytest.fixture(scope="module")
+def symbols():
+    return CalculatorEngine()._prepare_local_symbols("k")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3x^2 + 2x + 1", 3 * x ** 2 + 2 * x + 1),
+    ("2sin(x)cos(x)", 2 * sympy.sin(x) * sympy.cos(x)),
+    ("xsinx", x * sympy.sin(x)),
+    ("2pi x", 2 * sympy.pi * x),
+    ("(x+1)(x-1)", (x + 1) * (x - 1)),
+    ("e^x", sympy.exp(x)),
+    ("2e", 2 * sympy.E),
+    ("k x^2", sympy.Symbol("k") * x ** 2),
+    # Notación científica y decimales, leídos de forma exacta
+    ("1E5", sympy.Integer(100000)),
+    ("2.5e3", sympy.Integer(2500)),
+    ("3e-2", sympy.Rational(3, 100)),
+    ("1e5x", 100000 * x),
+    ("0.5x^2", x ** 2 / 2),
+    ("x^0.5", sympy.sqrt(x)),
+    # Potencia de una función antes de su argumento
+    ("sin^2(x)", sympy.sin(x) ** 2),
+    ("sin^2x", sympy.sin(x) ** 2),
+    ("2sin^3(2x)", 2 * sympy.sin(2 * x) ** 3),
+    # Identificadores con guion bajo y módulo
+    ("x_1", sympy.Symbol("x_1")),
+    ("x_1 + x_2", sympy.Symbol("x_1") + sympy.Symbol("x_2")),
+    ("x%2", sympy.Mod(x, 2)),
+])
+def test_gramatica(symbols, text, expected):
+    assert InputParser.parse(text, symbols) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Funciones de SymPy reconocidas por su nombre completo, con o sin paréntesis
+    ("sinh x", sympy.sinh(x)),
+    ("cosh x", sympy.cosh(x)),
+    ("tanh x", sympy.tanh(x)),
+    ("xcosh x", x * sympy.cosh(x)),
+    ("sinh^2 x", sympy.sinh(x) ** 2),
+    ("erf x", sympy.erf(x)),
+    ("gamma x", sympy.gamma(x)),
+    ("diff(x^2, x)", 2 * x),
+    ("Piecewise((x, x<1), (1, True))", sympy.Piecewise((x, x < 1), (1, True))),
+    # Números separados por espacios forman uno solo, como hacía el parser original
+    ("2 3", sympy.Integer(23)),
+    ("2 3x", 23 * x),
+    ("1 000", sympy.Integer(1000)),
+    ("2 .5", sympy.Rational(5, 2)),
+])
+def test_compatibilidad_con_el_parser_original(symbols, text, expected):
+    assert InputParser.parse(text, symbols) == expected
+
+
+@pytest.mark.parametrize("text, position", [("x^", 2), ("(x+1", 1), ("x)", 2), ("2..5", 3), ("x$", 2),
+                                                     ("2.5 .5", 1), ("1e3 4", 1)])
+def test_errores_con_posicion(symbols, text, position):
+    with pytest.raises(ExpressionSyntaxError) as info:
+        InputParser.parse(text, symbols)
+    assert info.value.position + 1 == position
+
+
+def test_vacio_es_cero(symbols):
+    assert InputParser.parse("  ", symbols) == 0
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2", sympy.Integer(2)), ("-1", sympy.Integer(-1)), ("0.1", sympy.Rational(1, 10)),
+    ("-.5", sympy.Rational(-1, 2)), ("2.", sympy.Integer(2)), ("pi", sympy.pi), ("-oo", -sympy.oo),
+])
+def test_via_rapida_exacta(symbols, text, expected):
+    value = InputParser.parse(text, symbols)
+    assert value == expected and not value.is_Float
+
+
+def test_exponentes_grandes_sin_expandir(symbols):
+    # Más allá de 10^±1000 el literal queda como Float, sin construir enteros enormes
+    tiny = InputParser.parse("1e-5000", symbols)
+    assert tiny.is_Float and tiny > 0 and sympy.log(tiny, 10).evalf() == pytest.approx(-5000)
+    assert InputParser.parse("1.5e-1001x", symbols) == sympy.Float("1.5e-1001", 15) * x
+    assert InputParser.parse("1e999", symbols) == sympy.Integer(10) ** 999
+
+
+@pytest.mark.parametrize("text", ["1e50000000", "2.5E-99999999999", "1" + "0" * 5000])
+def test_literales_absurdos_se_rechazan(symbols, text):
+    with pytest.raises(ExpressionSyntaxError):
+        InputParser.parse(text, symbols)
+
+
+def test_tablas_de_simbolos_acotadas():
+    from core import tokenizer
+
+    engine = CalculatorEngine()
+    for i in range(300):
+        InputParser.parse("k x", engine._prepare_local_symbols(f"k, c{i}"))
+    assert len(engine._symbol_tables) <= 256
+    assert len(tokenizer._TOKENIZER_CACHE) <= 256
+    # La tabla más reciente se reutiliza
+    assert engine._prepare_local_symbols("k, c299") is engine._prepare_local_symbols("c299, k")
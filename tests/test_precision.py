@@ -0,0 +1,33 @@
+# tests/test_precision.py
+import pytest
+import sympy
+
+from core.calculator import CalculatorEngine
+
+
+def test_limite_decimal_exacto_a_50_digitos():
+    result = CalculatorEngine(time_budget=10.0).calculate_integral("x", "0", "0.1", digits=50)
+    assert result["success"]
+    expected = sympy.Rational(1, 200)
+    assert abs(result["defined_integral"] - expected) < sympy.Float(10) ** -51
+    assert result["error_estimate"] < 1e-50
+
+
+def test_mpmath_sin_forma_cerrada():
+    # Sin esperar a SymPy, los 30 dígitos salen de mpmath
+    result = CalculatorEngine(time_budget=0.0).calculate_integral("exp(-x^2)", "0", "oo", digits=30)
+    assert result["success"] and result["method"] == "mpmath"
+    expected = (sympy.sqrt(sympy.pi) / 2).evalf(35)
+    assert abs(result["defined_integral"] - expected) < sympy.Float(10) ** -29
+
+
+def test_mpmath_sin_convergencia_es_un_error():
+    # La cola oscilante de sin(x)/x no converge con tanh-sinh: no se devuelve un valor falso
+    result = CalculatorEngine(time_budget=0.0).calculate_integral("sin(x)/x", "1", "oo", digits=30)
+    assert not result["success"]
+    assert "mpmath" in result["error_message"]
+
+
+@pytest.mark.parametrize("digits", [0, CalculatorEngine.MAX_DIGITS + 1])
+def test_precision_fuera_de_rango(digits):
+    assert not CalculatorEngine().calculate_integral("x", "0", "1", digits=digits)["success"]
@@ -0,0 +1,53 @@
+# tests/test_quadrature.py
+import math
+import warnings
+
+import numpy as np
+import pytest
+
+from core.quadrature import NumericIntegrator
+
+
+@pytest.fixture
+def integrator():
+    return NumericIntegrator()
+
+
+@pytest.mark.parametrize("method", NumericIntegrator.METHODS)
+def test_integra_polinomio(integrator, method):
+    result = integrator.integrate(lambda x: 3 * x ** 2 + 1, 0.0, 2.0, method=method)
+    assert result["converged"]
+    assert result["value"] == pytest.approx(10.0, rel=1e-10)
+
+
+def test_auto_con_singularidad_integrable(integrator):
+    result = integrator.integrate(lambda x: 1 / np.sqrt(x), 0.0, 1.0)
+    assert result["value"] == pytest.approx(2.0, rel=1e-8)
+
+
+def test_gauss_kronrod_sin_avisos_de_numpy(integrator):
+    # Polo en el intervalo: los valores infinitos no deben emitir RuntimeWarning
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = integrator.gauss_kronrod(lambda x: 1 / x, -1.0, 1.0)
+        batch = integrator.gauss_kronrod_batch(lambda x, k: 1 / (x - k), 0.0, 1.0, args=[np.array([0.0, 2.0])])
+    assert not result["converged"]
+    assert batch["converged"].tolist() == [False, True]
+    assert batch["value"][1] == pytest.approx(-math.log(2), rel=1e-8)
+
+
+@pytest.mark.parametrize("method", NumericIntegrator.METHODS)
+@pytest.mark.parametrize("a, b", [(-1e308, 1e308), (0.0, math.inf), (-math.inf, math.inf)])
+def test_limites_desbordados_sin_avisos(integrator, method, a, b):
+    # Límites como '1e1000' llegan como inf: el resultado no converge, pero sin RuntimeWarning
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = integrator.integrate(lambda x: np.exp(-x * x), a, b, method=method)
+    assert not result["converged"]
+
+
+def test_gauss_kronrod_batch_por_parametro(integrator):
+    k = np.array([1.0, 2.0, 3.0])
+    result = integrator.gauss_kronrod_batch(lambda x, k: k * x, 0.0, 1.0, args=[k])
+    np.testing.assert_allclose(result["value"], k / 2, rtol=1e-12)
+    assert result["converged"].all()
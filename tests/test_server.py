@@ -0,0 +1,102 @@
+# tests/test_server.py
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from core import server
+from core.server import IntegrationServer, IntegrationService
+
+
+@pytest.fixture(scope="module")
+def address():
+    service = IntegrationService(workers=1, queue_size=2, time_budget=5.0)
+    httpd = IntegrationServer(("127.0.0.1", 0), service)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+
+def post(address, path: str, body: bytes, headers: dict):
+    connection = http.client.HTTPConnection(*address, timeout=60)
+    try:
+        connection.putrequest("POST", path)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def post_json(address, path: str, data: dict):
+    body = json.dumps(data).encode("utf-8")
+    return post(address, path, body, {"Content-Type": "application/json", "Content-Length": str(len(body))})
+
+
+def test_integral_por_http(address):
+    status, data = post_json(address, "/integral", {"function": "3x^2", "lower_limit": "0", "upper_limit": "1"})
+    assert status == 200
+    assert data["success"] and data["numeric_value"] == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "1.5"])
+def test_content_length_invalido(address, length):
+    status, data = post(address, "/integral", b"{}", {"Content-Length": length})
+    assert status == 400
+    assert "Content-Length" in data["error_message"]
+
+
+def test_plazo_por_llamada_no_cambia_el_motor(monkeypatch):
+    # Un plazo corto recorta la espera de esa llamada, no la del motor compartido
+    server._init_worker(5.0, None)
+    budgets = []
+    engine = server._worker_engine
+    original = engine.calculate_integral
+
+    def spy(*job, time_budget=None):
+        budgets.append(time_budget)
+        return original(*job, time_budget=time_budget)
+
+    monkeypatch.setattr(engine, "calculate_integral", spy)
+    (result,) = server._run_integrals([("x^3 exp(-x)", "0", "5", "", None)], time.time() + 0.5)
+    assert result["success"]
+    assert 0 < budgets[0] <= 0.5
+    assert engine.time_budget == 5.0
+
+    (expired,) = server._run_integrals([("x", "0", "1", "", None)], time.time() - 1)
+    assert expired["expired"]
+
+
+def test_resultados_provisionales_no_se_comparten():
+    service = IntegrationService(workers=1)
+    try:
+        service._store("provisional", {"success": True, "provisional": True})
+        service._store("fallido", {"success": False})
+        service._store("completo", {"success": True, "provisional": False})
+        assert service.cache.get("provisional") is None and service.cache.get("fallido") is None
+        assert service.cache.get("completo") is not None
+    finally:
+        service.close()
+
+
+
+def test_solo_se_comparten_tareas_con_plazo_suficiente():
+    # Quien tiene más plazo no recibe el resultado de una tarea calculada con menos tiempo
+    service = IntegrationService(workers=1, queue_size=4)
+    try:
+        now = time.time()
+        (first,) = service._submit([("clave", lambda found: None, time.sleep, 0.5)], now + 1)
+        (shorter,) = service._submit([("clave", lambda found: None, time.sleep, 0.5)], now + 0.5)
+        (longer,) = service._submit([("clave", lambda found: None, time.sleep, 0.5)], now + 20)
+        assert shorter is first
+        assert longer is not first
+        assert service.counters["coalesced"] == 1
+        longer.result(timeout=30)
+    finally:
+        service.close()
@@ -0,0 +1,69 @@
+# tests/test_sweep.py
+import math
+
+import numpy as np
+import pytest
+
+from core.calculator import CalculatorEngine
+
+
+@pytest.fixture
+def engine():
+    return CalculatorEngine(time_budget=10.0)
+
+
+def test_forma_cerrada_vectorizada(engine):
+    result = engine.calculate_sweep("k*x^2", "0", "1", "k", {"k": [1, 2, 3]})
+    assert result["success"] and result["method"] == "closed_form"
+    np.testing.assert_allclose(result["values"], [1 / 3, 2 / 3, 1.0])
+    assert not result["singular"].any()
+
+
+def test_rejilla(engine):
+    result = engine.calculate_sweep("a*x + b", "0", "1", "a, b", {"a": [1, 2], "b": [0, 1, 2]}, grid=True)
+    assert result["values"].shape == (2, 3)
+    np.testing.assert_allclose(result["values"][1, 2], 3.0)
+
+
+@pytest.mark.parametrize("func", ["1/(x-k)", "1/(x-k)^2"])
+def test_polo_en_el_intervalo(engine, func):
+    # k = 0.5 está dentro de [0, 1] y k = 0 en un extremo: ambas integrales divergen
+    result = engine.calculate_sweep(func, "0", "1", "k", {"k": [0.5, 0.0, 2.0]})
+    assert result["singular"].tolist() == [True, True, False]
+    assert np.isnan(result["values"][:2]).all()
+    assert np.isinf(result["error_estimate"][:2]).all()
+    assert math.isfinite(result["values"][2])
+
+
+def test_limite_infinito_con_forma_cerrada_por_tramos(engine):
+    # SymPy da Piecewise((1/k, |arg(k)| < pi/2), (Integral(...), True)): la rama cerrada se
+    # evalúa y el resto de puntos se integra por tramos de la cola
+    result = engine.calculate_sweep("exp(-k*x)", "0", "oo", "k", {"k": [0.5, 2.0, -1.0]})
+    assert result["success"] and result["method"] == "closed_form+improper"
+    np.testing.assert_allclose(result["values"][:2], [2.0, 0.5])
+    assert result["values"][2] == math.inf
+
+
+def test_forma_cerrada_sin_version_de_numpy(engine):
+    # erf no tiene versión de NumPy sin SciPy: la forma cerrada se evalúa punto a punto
+    result = engine.calculate_sweep("exp(-k*x^2)", "0", "1", "k", {"k": [1.0, 2.0]})
+    assert result["success"] and result["method"] == "closed_form"
+    expected = [math.sqrt(math.pi / k) / 2 * math.erf(math.sqrt(k)) for k in (1.0, 2.0)]
+    np.testing.assert_allclose(result["values"], expected)
+
+
+def test_constante_no_declarada(engine):
+    result = engine.calculate_sweep("k*x", "0", "1", "k", {"m": [1]})
+    assert not result["success"]
+
+
+def test_barrido_sin_forma_cerrada_a_tiempo_es_provisional(monkeypatch):
+    # Sin hueco para la vía simbólica el barrido se resuelve por cuadratura y no se da por definitivo
+    monkeypatch.setattr(CalculatorEngine, "MAX_BACKGROUND_THREADS", 0)
+    engine = CalculatorEngine(time_budget=10.0)
+    result = engine.calculate_sweep("k*x^3 exp(-x)", "0", "5", "k", {"k": [1, 2]}, time_budget=0.5)
+    assert result["success"] and result["provisional"]
+    assert result["method"] == "gauss_kronrod"
+    assert len(engine.result_cache) == 0
+    exact = 6 - 236 * math.exp(-5)
+    np.testing.assert_allclose(result["values"], [exact, 2 * exact])
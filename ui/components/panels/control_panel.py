@@ -8,6 +8,9 @@ from ui.components.widgets.math_label import MathLabel
 
 
 class ControlPanel(ctk.CTkFrame):
+    # Opciones del selector de precisión -> dígitos pedidos al motor (None = formato estándar)
+    PRECISION_OPTIONS = {"Estándar (10)": None, "15 dígitos": 15, "50 dígitos": 50, "200 dígitos": 200}
+
     def __init__(self, master, controller):
         super().__init__(master, fg_color="transparent")
         self.controller = controller
@@ -70,19 +73,48 @@ class ControlPanel(ctk.CTkFrame):
         # Ahora sí podemos agregar el Tooltip, después de crear el widget
         Tooltip(self.constants_entry, "Define tus constantes simbólicas separadas por comas")
 
+        # Precisión del resultado numérico
+        ctk.CTkLabel(input_group, text="Precisión:").grid(row=4, column=0, padx=5, pady=2, sticky="w")
+        self.precision_menu = ctk.CTkOptionMenu(input_group, values=list(self.PRECISION_OPTIONS), width=150)
+        self.precision_menu.grid(row=4, column=1, padx=5, pady=2, sticky="w")
+        Tooltip(self.precision_menu, "Dígitos significativos del resultado (más de 15 usa aritmética de mpmath)")
+
+        # Límites de y y z para integrales dobles y triples (vacíos = integral simple en x)
+        self.inner_limit_entries = {}
+        for row, variable, hint in ((5, "y", "x"), (6, "z", "x, y")):
+            ctk.CTkLabel(input_group, text=f"Límites de {variable}:").grid(row=row, column=0, padx=5, pady=2,
+                                                                          sticky="w")
+            lower = ctk.CTkEntry(input_group, width=150, placeholder_text="inferior")
+            lower.grid(row=row, column=1, padx=5, pady=2, sticky="w")
+            upper = ctk.CTkEntry(input_group, width=150, placeholder_text="superior")
+            upper.grid(row=row, column=2, padx=5, pady=2, sticky="w")
+            Tooltip(lower, f"Opcional: integral múltiple en {variable}; los límites pueden depender de {hint}")
+            self.inner_limit_entries[variable] = (lower, upper)
+
         # Grupo de botones
         button_group = ctk.CTkFrame(self, fg_color="transparent")
         button_group.grid(row=1, column=0, padx=10, pady=(5, 10), sticky="ew")
 
         # Botón Calcular con icono
-        calc_button = ctk.CTkButton(
+        self.calc_button = ctk.CTkButton(
             button_group, 
             text="Calcular",
             image=self.calc_icon,
             compound="left",
             command=lambda: self.controller.on_calculate_click()
         )
-        calc_button.pack(side="left", padx=5)
+        self.calc_button.pack(side="left", padx=5)
+
+        # Botón Cancelar: sólo activo mientras hay un cálculo en curso
+        self.cancel_button = ctk.CTkButton(
+            button_group,
+            text="Cancelar",
+            fg_color="#DC3545",
+            hover_color="#B02A37",
+            state="disabled",
+            command=lambda: self.controller.on_cancel_click()
+        )
+        self.cancel_button.pack(side="left", padx=5)
 
 
         # Botón Limpiar con icono
@@ -97,11 +129,21 @@ class ControlPanel(ctk.CTkFrame):
         )
         clear_button.pack(side="left", padx=5)
 
+        # Vista previa en vivo: parseo, gráfica y estimación mientras se escribe
+        self.preview_switch = ctk.CTkSwitch(button_group, text="Vista previa",
+                                            command=lambda: self.controller.on_input_changed())
+        self.preview_switch.select()
+        self.preview_switch.pack(side="left", padx=5)
+        Tooltip(self.preview_switch, "Muestra f(x), su gráfica y una estimación rápida mientras escribe")
 
     def _create_result_display(self):
         result_group = ctk.CTkFrame(self, fg_color="transparent")
         result_group.grid(row=2, column=0, padx=10, pady=5, sticky="ew")
 
+        # Vista previa de la entrada (f(x) y estimación rápida)
+        self.preview_label = MathLabel(result_group, font_size=11)
+        self.preview_label.pack(fill="x", pady=(0, 5))
+
         # Para el resultado principal (la integral definida)
         self.result_label = MathLabel(result_group, font_size=16)
         self.result_label.pack(fill="x", pady=(0, 5))
@@ -112,12 +154,24 @@ class ControlPanel(ctk.CTkFrame):
         self.indefinite_result_label.pack(fill="x")
         self.indefinite_result_label.set_text(r"\text{Antiderivada: } + C") # Texto inicial
 
+    def load_math_labels(self):
+        """Construye el renderizado LaTeX de los resultados (requiere Matplotlib)."""
+        self.result_label.build()
+        self.indefinite_result_label.build()
+        self.preview_label.build()
+
     def _setup_focus_tracking(self):
         self.last_focused_entry = self.func_entry
         self.func_entry.bind("<FocusIn>", lambda e: self.set_focus(self.func_entry))
         self.lower_limit_entry.bind("<FocusIn>", lambda e: self.set_focus(self.lower_limit_entry))
         self.upper_limit_entry.bind("<FocusIn>", lambda e: self.set_focus(self.upper_limit_entry))
         self.constants_entry.bind("<FocusIn>", lambda e: self.set_focus(self.constants_entry))
+        for entries in self.inner_limit_entries.values():
+            for entry in entries:
+                entry.bind("<FocusIn>", lambda e, w=entry: self.set_focus(w))
+        # Cada edición programa una vista previa (el controlador agrupa las pulsaciones)
+        for entry in (self.func_entry, self.lower_limit_entry, self.upper_limit_entry, self.constants_entry):
+            entry.bind("<KeyRelease>", lambda e: self.controller.on_input_changed(), add="+")
 
     def set_focus(self, entry_widget):
         self.last_focused_entry = entry_widget
@@ -127,25 +181,60 @@ class ControlPanel(ctk.CTkFrame):
             if self.last_focused_entry == self.constants_entry and not (value.isalpha() or value == ','):
                 return
             self.last_focused_entry.insert(tk.END, value)
+            self.controller.on_input_changed()
 
     def on_backspace_press(self):
         if self.last_focused_entry:
             current_text = self.last_focused_entry.get()
             if current_text: self.last_focused_entry.delete(len(current_text) - 1, tk.END)
+            self.controller.on_input_changed()
+
+    def set_busy(self, busy: bool):
+        self.cancel_button.configure(state="normal" if busy else "disabled")
 
     def get_inputs(self):
         return {"function": self.func_entry.get(), "lower_limit": self.lower_limit_entry.get(),
-                "upper_limit": self.upper_limit_entry.get(), "constants": self.constants_entry.get()}
+                "upper_limit": self.upper_limit_entry.get(), "constants": self.constants_entry.get(),
+                "digits": self.PRECISION_OPTIONS[self.precision_menu.get()],
+                "inner_limits": self.get_inner_limits()}
+
+    def get_inner_limits(self):
+        """Pares (inferior, superior) de y y z que se han rellenado, en ese orden."""
+        limits = []
+        for lower, upper in self.inner_limit_entries.values():
+            if not (lower.get().strip() or upper.get().strip()):
+                break
+            limits.append((lower.get(), upper.get()))
+        return limits
 
     def update_results(self, defined_integral_str, indefinite_integral_str):
         self.result_label.set_text(rf"\int f(x)dx = {defined_integral_str}", is_result=True)
         self.indefinite_result_label.set_text(rf"\int f(x)dx = {indefinite_integral_str} + C")
 
+    def preview_enabled(self) -> bool:
+        return bool(self.preview_switch.get())
+
+    def update_preview(self, preview_str):
+        self.preview_label.set_text(preview_str)
+
+    def clear_preview(self):
+        self.preview_label.clear()
+
+    def update_multiple_results(self, integral_str, defined_integral_str, cost_str):
+        """Resultado de una integral doble o triple: no hay antiderivada, se muestra el coste."""
+        self.result_label.set_text(rf"{integral_str} = {defined_integral_str}", is_result=True)
+        self.indefinite_result_label.set_text(rf"\text{{{cost_str}}}")
+
     def clear_inputs(self):
         self.func_entry.delete(0, 'end')
         self.lower_limit_entry.delete(0, 'end')
         self.upper_limit_entry.delete(0, 'end')
         self.constants_entry.delete(0, 'end')
+        for entries in self.inner_limit_entries.values():
+            for entry in entries:
+                entry.delete(0, 'end')
+
+        self.preview_label.clear()
 
         # Limpiar los nuevos labels matemáticos
         self.result_label.set_text(r"\text{Resultado:}")
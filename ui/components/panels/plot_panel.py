@@ -1,21 +1,73 @@
+import math
+import time
+from collections import deque
+
 import customtkinter as ctk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import numpy as np
 from ui.style import AppTheme
+from utils.startup import lazy_import, startup_report
+
+# NumPy y Matplotlib se cargan al crear la gráfica, no al importar el módulo
+np = lazy_import("numpy")
 
 
 class PlotPanel(ctk.CTkFrame):
+    # Intervalo mínimo entre redibujados durante pan/zoom (agrupa los eventos xlim_changed)
+    REDRAW_INTERVAL_MS = 16
+    # Objetivo de tiempo por fotograma durante el arrastre
+    FRAME_BUDGET_MS = 16.0
+    # Resolución (celdas por lado) del mapa de calor de las integrales dobles
+    HEATMAP_RESOLUTION = 200
+    # Fracción de las muestras por píxel que usa la vista previa mientras se escribe
+    PREVIEW_RESOLUTION = 0.25
+    # Intervalo que se muestra en la vista previa si aún no hay límites
+    PREVIEW_RANGE = (-5.0, 5.0)
+
     def __init__(self, master):
         super().__init__(master, fg_color=AppTheme.FG_COLOR, corner_radius=8)
 
         self.current_numeric_func = None
         self.view_change_cid = None
+        self.fig = None
+
+        # Artistas reutilizados en cada redibujado
+        self.line = None
+        self.fill = None
+        self.integration_limits = None
+        # Muestras por píxel (menos de 1 en la vista previa)
+        self.resolution = 1.0
+        # Mapa de calor de una integral doble y su barra de color
+        self.heatmap = None
+        self.colorbar = None
+
+        # Estado del redibujado agrupado y del blitting
+        self._redraw_after_id = None
+        self._interacting = False
+        self._background = None
+        self._background_view = None
+        self.frame_times = deque(maxlen=240)  # ms por fotograma de actualización
 
-        self._create_plot_widgets()
+        # Marcador visible mientras Matplotlib termina de cargarse
+        self._placeholder = ctk.CTkLabel(self, text="Cargando gráfica...", text_color=AppTheme.TEXT_COLOR)
+        self._placeholder.pack(expand=True)
+
+    def ensure_widgets(self):
+        """Crea la gráfica si todavía no existe (se difiere hasta después del primer pintado)."""
+        if self.fig is None:
+            self._create_plot_widgets()
 
     def _create_plot_widgets(self):
         """Crea la infraestructura de Matplotlib de forma robusta."""
+        with startup_report.timed("matplotlib (TkAgg)"):
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+            from utils.sampling import FunctionSampler
+            from utils.tile_cache import TileCache
+
+        self.sampler = FunctionSampler()
+        # Muestras reutilizables entre desplazamientos y zooms de la misma función
+        self.tiles = TileCache(self.sampler)
+
+        self._placeholder.destroy()
         self.fig = Figure(figsize=(7, 4), dpi=100, facecolor=AppTheme.FG_COLOR)
         self.fig.subplots_adjust(bottom=0.15, top=0.95, left=0.1, right=0.95)
 
@@ -32,92 +84,256 @@ class PlotPanel(ctk.CTkFrame):
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True, padx=10, pady=5)
 
-        toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
-        toolbar.update()
-        toolbar.configure(background=AppTheme.FG_COLOR)
-        for button in toolbar.winfo_children():
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        self.toolbar.update()
+        self.toolbar.configure(background=AppTheme.FG_COLOR)
+        for button in self.toolbar.winfo_children():
             button.configure(background=AppTheme.FG_COLOR, relief=ctk.FLAT)
-        toolbar.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        self.toolbar.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+
+        # Eventos para el blitting durante el arrastre
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
 
         self.clear_plot()
 
     def clear_plot(self, title="Gráfica de f(x)"):
         """Limpia el gráfico y desconecta cualquier callback activo."""
+        self.ensure_widgets()
         # >>> CORREGIDO: Desconectar del objeto 'ax', no de la figura <<<
         if self.view_change_cid:
             self.ax.callbacks.disconnect(self.view_change_cid)
             self.view_change_cid = None
+        if self._redraw_after_id is not None:
+            self.after_cancel(self._redraw_after_id)
+            self._redraw_after_id = None
 
         self.current_numeric_func = None
+        self.tiles.clear()
+        self.line = None
+        self.fill = None
+        self._interacting = False
+        self._background = None
+        if self.colorbar is not None:
+            self.colorbar.remove()
+            self.colorbar = None
+        self.heatmap = None
 
         self.ax.clear()
         self.ax.grid(True, linestyle="--", alpha=0.3)
         self.ax.set_title(title, color=AppTheme.TEXT_COLOR)
         self.canvas.draw()
 
-    def plot_function(self, numeric_func, a, b, title, fill_area=True):
-        """Dibuja la gráfica inicial y activa el redibujado dinámico."""
+    def plot_function(self, numeric_func, a, b, title, fill_area=True, window=None, resolution=1.0):
+        """
+        Dibuja la gráfica inicial y activa el redibujado dinámico. Si algún límite es
+        infinito, 'window' es el tramo finito que se muestra (el que aporta casi todo el área).
+        """
         self.clear_plot(title=title)
 
         self.current_numeric_func = numeric_func
+        self.resolution = resolution
         # Guardar los límites de integración para el redibujado
         if fill_area:
             self.integration_limits = (a, b)
         else:
             self.integration_limits = None
 
-        self._draw_initial_view(a, b, fill_area)
+        self._draw_initial_view(a, b, fill_area, window)
         self.view_change_cid = self.ax.callbacks.connect('xlim_changed', self.on_view_change)
 
+    def plot_preview(self, numeric_func, a, b, title, window=None):
+        """Gráfica de baja resolución para la vista previa; sin límites se muestra PREVIEW_RANGE."""
+        fill_area = a is not None and b is not None
+        if not fill_area:
+            a, b = self.PREVIEW_RANGE
+        self.plot_function(numeric_func, a, b, title, fill_area, window, resolution=self.PREVIEW_RESOLUTION)
+
+    def plot_heatmap(self, numeric_func, region, title):
+        """
+        Mapa de calor de f(x, y) sobre la región de una integral doble. Fuera de la región
+        (y entre los límites c(x) y d(x)) las celdas se dejan vacías y el borde se dibuja encima.
+        """
+        self.clear_plot(title=title)
+        (x_min, x_max), (y_min, y_max) = region["x_range"], region["y_range"]
+        if y_max <= y_min:
+            y_min, y_max = y_min - 0.5, y_max + 0.5
+
+        xs = np.linspace(x_min, x_max, self.HEATMAP_RESOLUTION)
+        ys = np.linspace(y_min, y_max, self.HEATMAP_RESOLUTION)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        with np.errstate(all='ignore'):
+            values = np.broadcast_to(np.asarray(numeric_func(grid_x, grid_y)), grid_x.shape)
+            lower = np.broadcast_to(np.asarray(region["y_lower"](xs), dtype=float), xs.shape)
+            upper = np.broadcast_to(np.asarray(region["y_upper"](xs), dtype=float), xs.shape)
+        if np.iscomplexobj(values):
+            values = np.where(np.abs(values.imag) <= 1e-12 * np.maximum(1.0, np.abs(values.real)),
+                              values.real, np.nan)
+        low, high = np.minimum(lower, upper), np.maximum(lower, upper)
+        outside = (grid_y < low[None, :]) | (grid_y > high[None, :]) | ~np.isfinite(values)
+        values = np.ma.masked_array(np.asarray(values, dtype=float), mask=outside)
+
+        self.heatmap = self.ax.pcolormesh(grid_x, grid_y, values, shading="auto", cmap="viridis")
+        self.ax.plot(xs, lower, color=AppTheme.TEXT_COLOR, linewidth=1)
+        self.ax.plot(xs, upper, color=AppTheme.TEXT_COLOR, linewidth=1)
+        self.ax.set_xlabel("x", color=AppTheme.TEXT_COLOR)
+        self.ax.set_ylabel("y", color=AppTheme.TEXT_COLOR)
+        self.colorbar = self.fig.colorbar(self.heatmap, ax=self.ax)
+        self.colorbar.ax.tick_params(colors=AppTheme.TEXT_COLOR)
+        self.canvas.draw()
+
     def on_view_change(self, axes):
-        """Callback que se activa al panear/hacer zoom, redibuja la línea de la función y el área."""
-        if self.current_numeric_func is None:
+        """
+        Callback de 'xlim_changed'. No redibuja en el acto: agrupa los eventos y
+        programa como mucho un redibujado cada REDRAW_INTERVAL_MS.
+        """
+        if self.current_numeric_func is None or self._redraw_after_id is not None:
             return
+        self._redraw_after_id = self.after(self.REDRAW_INTERVAL_MS, self._apply_view_change)
 
-        new_xmin, new_xmax = axes.get_xlim()
-        x_dynamic = np.linspace(new_xmin, new_xmax, 800)
+    def _apply_view_change(self):
+        """Vuelve a muestrear la vista actual y actualiza los artistas existentes sin recrearlos."""
+        self._redraw_after_id = None
+        if self.current_numeric_func is None or self.line is None:
+            return
+        started = time.perf_counter()
 
-        with np.errstate(invalid='ignore'):
-            y_dynamic = np.array([self.current_numeric_func(v) for v in x_dynamic])
+        new_xmin, new_xmax = self.ax.get_xlim()
+        x_dynamic, y_dynamic = self.tiles.sample(self.current_numeric_func, new_xmin, new_xmax,
+                                                 self._pixel_width())
 
         # Actualizar la línea principal
-        if self.ax.lines:
-            self.ax.lines[0].set_data(x_dynamic, y_dynamic)
+        self.line.set_data(x_dynamic, y_dynamic)
 
         # Actualizar el área sombreada si existe
-        if self.ax.collections and hasattr(self, 'integration_limits'):
+        if self.fill is not None and self.integration_limits is not None:
             a, b = self.integration_limits
             fill_mask = ((x_dynamic >= a) & (x_dynamic <= b))
-            # Remover el área sombreada anterior
-            self.ax.collections[0].remove()
-            # Crear nueva área sombreada
-            self.ax.fill_between(x_dynamic[fill_mask], y_dynamic[fill_mask],
-                                 color=AppTheme.PRIMARY, alpha=0.4)
+            if hasattr(self.fill, "set_data"):
+                self.fill.set_data(x_dynamic[fill_mask], y_dynamic[fill_mask], 0)
+            else:
+                # Matplotlib < 3.10 no permite actualizar el área en su sitio
+                self.fill.remove()
+                self.fill = self.ax.fill_between(x_dynamic[fill_mask], y_dynamic[fill_mask],
+                                                 color=AppTheme.PRIMARY, alpha=0.4, animated=self._interacting)
 
-        # Re-calcular los límites Y
-        self.ax.relim()
-        self.ax.autoscale_view(True, True, True)
+        # Los límites Y no se recalculan: respetar el zoom del usuario
+        if self._interacting and self._background is not None \
+                and self._background_view == self._current_view():
+            self._blit_artists()
+        else:
+            # Este método ya está agrupado con after(): se dibuja en el acto en lugar de con
+            # draw_idle, de modo que el tiempo del fotograma incluye el dibujado completo
+            self.canvas.draw()
 
+        # Muestreo, actualización de artistas y dibujado (blit o completo)
+        self.frame_times.append((time.perf_counter() - started) * 1000)
+
+    # --- Blitting durante el arrastre ---
+
+    def _current_view(self):
+        return tuple(self.ax.get_xlim()) + tuple(self.ax.get_ylim())
+
+    def _animated_artists(self):
+        return [artist for artist in (self.line, self.fill) if artist is not None]
+
+    def _on_press(self, event):
+        # Sólo el pan actualiza los límites continuamente; el zoom por rectángulo cambia al soltar
+        if event.inaxes is not self.ax or self.line is None or self.toolbar.mode != 'pan/zoom':
+            return
+        self._interacting = True
+        for artist in self._animated_artists():
+            artist.set_animated(True)
+        self.canvas.draw_idle()
+
+    def _on_release(self, event):
+        if not self._interacting:
+            return
+        self._interacting = False
+        self._background = None
+        for artist in self._animated_artists():
+            artist.set_animated(False)
         self.canvas.draw_idle()
 
-    def _draw_initial_view(self, a, b, fill_area):
+    def _on_draw(self, event):
+        """Tras cada dibujado completo se guarda el fondo (sin la curva) y se pinta la curva encima."""
+        if not self._interacting:
+            return
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._background_view = self._current_view()
+        self._blit_artists()
+
+    def _blit_artists(self):
+        self.canvas.restore_region(self._background)
+        for artist in self._animated_artists():
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+    def frame_stats(self) -> dict:
+        """Estadísticas de los últimos fotogramas de actualización, en milisegundos."""
+        if not self.frame_times:
+            return {"frames": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "over_budget": 0}
+        times = sorted(self.frame_times)
+        return {
+            "frames": len(times),
+            "mean_ms": sum(times) / len(times),
+            "p95_ms": times[min(len(times) - 1, int(0.95 * len(times)))],
+            "max_ms": times[-1],
+            "over_budget": sum(t > self.FRAME_BUDGET_MS for t in times),
+        }
+
+    def snapshot_png(self, dpi: int = 150):
+        """Imagen PNG de la gráfica actual (para exportar), o None si no hay ninguna función dibujada."""
+        if self.fig is None or (self.current_numeric_func is None and self.heatmap is None):
+            return None
+        import io
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, format="png", dpi=dpi, facecolor=self.fig.get_facecolor())
+        return buffer.getvalue()
+
+    def _draw_tail_marks(self, a, b):
+        """Indica en los bordes de la vista que el área continúa hacia ±∞."""
+        style = dict(transform=self.ax.transAxes, color=AppTheme.TEXT_COLOR, fontsize=9, alpha=0.8, va="bottom")
+        if math.inf in (a, b):
+            self.ax.text(0.98, 0.02, "continúa hasta +∞ →", ha="right", **style)
+        if -math.inf in (a, b):
+            self.ax.text(0.02, 0.02, "← continúa hasta −∞", ha="left", **style)
+
+    def _pixel_width(self) -> float:
+        """Ancho en píxeles del área de los ejes: determina cuántas muestras hacen falta."""
+        return self.ax.get_window_extent().width * self.resolution
+
+    def _draw_initial_view(self, a, b, fill_area, window=None):
         """Dibuja los elementos que no cambian (línea inicial y área sombreada)."""
-        range_span = max((b - a), 4)  # Un poco más de rango inicial
-        x_min, x_max = a - range_span / 2, b + range_span / 2
+        infinite = math.isinf(a) or math.isinf(b)
+        if infinite:
+            # La vista se trunca a una ventana finita; el área sigue hacia el infinito
+            low, high = window or (a if math.isfinite(a) else -10.0, b if math.isfinite(b) else 10.0)
+            range_span = max(high - low, 4)
+            x_min = low - range_span / 10 if math.isfinite(min(a, b)) else low
+            x_max = high + range_span / 10 if math.isfinite(max(a, b)) else high
+        else:
+            range_span = max((b - a), 4)  # Un poco más de rango inicial
+            x_min, x_max = a - range_span / 2, b + range_span / 2
 
-        x_vals = np.linspace(x_min, x_max, 400)
-        with np.errstate(invalid='ignore'):
-            y_vals = np.array([self.current_numeric_func(v) for v in x_vals])
+        # Una sola evaluación vectorizada, refinada cerca de polos y zonas de mucha curvatura
+        x_vals, y_vals = self.tiles.sample(self.current_numeric_func, x_min, x_max, self._pixel_width())
 
-        finite_mask = np.isfinite(y_vals)
-        # Dibujar la línea de la función
-        self.ax.plot(x_vals[finite_mask], y_vals[finite_mask], label="f(x)", color="#33C1FF")
+        # Dibujar la línea de la función (los NaN cortan la línea en los polos)
+        self.line, = self.ax.plot(x_vals, y_vals, label="f(x)", color="#33C1FF")
+        # Las teselas se salen de la vista: los límites se calculan sólo con la parte visible
+        visible = (x_vals >= x_min) & (x_vals <= x_max)
+        self.ax.set_ylim(*self.sampler.robust_limits(x_vals[visible], y_vals[visible]))
+        self.ax.set_xlim(x_min, x_max)
 
         # Dibujar el área de integración si es aplicable
         if fill_area:
             fill_mask = ((x_vals >= a) & (x_vals <= b))
-            self.ax.fill_between(x_vals[fill_mask], y_vals[fill_mask], color=AppTheme.PRIMARY, alpha=0.4,
-                                 label="Área de integración")
+            self.fill = self.ax.fill_between(x_vals[fill_mask], y_vals[fill_mask], color=AppTheme.PRIMARY,
+                                             alpha=0.4, label="Área de integración")
+            if infinite:
+                self._draw_tail_marks(a, b)
 
         self.ax.legend(facecolor=AppTheme.FG_COLOR, labelcolor=AppTheme.TEXT_COLOR, framealpha=0.5)
         self.canvas.draw()
\ No newline at end of file
@@ -1,53 +1,85 @@
 # ui/components/math_label.py
+import re
+
 import customtkinter as ctk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from ui.style import AppTheme
 
 
 class MathLabel(ctk.CTkFrame):
     """
-    Un widget para renderizar y mostrar expresiones LaTeX usando Matplotlib.
+    Un widget para mostrar expresiones LaTeX. Las fórmulas se renderizan con Matplotlib
+    a una imagen (con caché compartida) y se muestran en un CTkLabel, sin figura propia.
     """
 
+    # Intervalo de sondeo de los renderizados en segundo plano
+    POLL_INTERVAL_MS = 30
+
     def __init__(self, master, font_size=12):
         super().__init__(master, fg_color="transparent")
+        self.font_size = font_size
+        self.renderer = None
+        self._pending = None
+        self._image = None  # referencia al CTkImage mostrado
+        self._request = 0   # identifica el último set_text para descartar renderizados obsoletos
 
-        self.figure = Figure(figsize=(4, 0.6), dpi=100, facecolor=AppTheme.FG_COLOR)
-        # Quitar los ejes y hacer que el layout sea compacto
-        self.ax = self.figure.add_subplot(111)
-        self.ax.axis('off')
-        self.figure.tight_layout(pad=0)
+        # Hasta que se carga Matplotlib se muestra el texto sin renderizar
+        self._label = ctk.CTkLabel(self, text="", text_color=AppTheme.TEXT_COLOR, height=60)
+        self._label.pack(fill="both", expand=True)
 
-        self.canvas = FigureCanvasTkAgg(self.figure, self)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        self.font_size = font_size
+    def build(self):
+        """Activa el renderizado con Matplotlib y dibuja el texto pendiente, si lo hay."""
+        if self.renderer is not None:
+            return
+        from utils.formula_renderer import formula_renderer
+        self.renderer = formula_renderer
+
+        if self._pending is not None:
+            self.set_text(*self._pending)
+            self._pending = None
 
     def set_text(self, latex_string: str, is_result=False):
         """
-        Limpia la figura y renderiza la nueva cadena LaTeX.
+        Muestra la nueva cadena LaTeX. Las fórmulas ya renderizadas salen de la caché;
+        las muy largas se renderizan fuera del hilo de la interfaz.
         """
-        self.ax.clear()
-        self.ax.axis('off')
+        self._request += 1
+        if self.renderer is None:
+            self._pending = (latex_string, is_result)
+            self._label.configure(image=None, text=re.sub(r"\\text\{([^}]*)\}", r"\1", latex_string))
+            return
 
         clean_latex_string = latex_string.replace(r'\limits', '')
+        font_size = self.font_size + (4 if is_result else 0)
 
-        # El resto del método usa la cadena ya limpia.
-        display_text = rf"${clean_latex_string}$"
+        image = self.renderer.get_cached(clean_latex_string, font_size, AppTheme.TEXT_COLOR)
+        if image is not None:
+            self._show(image)
+        elif self.renderer.is_large(clean_latex_string):
+            self._label.configure(text="Renderizando...")
+            future = self.renderer.render_async(clean_latex_string, font_size, AppTheme.TEXT_COLOR)
+            self._wait_for(future, self._request)
+        else:
+            self._show(self.renderer.render(clean_latex_string, font_size, AppTheme.TEXT_COLOR))
 
+    def _wait_for(self, future, request):
+        if request != self._request:
+            return  # Llegó otro set_text mientras se renderizaba
+        if not future.done():
+            self.after(self.POLL_INTERVAL_MS, self._wait_for, future, request)
+            return
         try:
-            self.ax.text(0.5, 0.5, display_text,
-                         fontsize=self.font_size + (4 if is_result else 0),
-                         color=AppTheme.TEXT_COLOR,
-                         va='center', ha='center')
+            self._show(future.result())
         except Exception as e:
             print(f"Error de renderizado de Mathtext: {e}")
-            self.ax.text(0.5, 0.5, "Error de formato", fontsize=self.font_size, color="red", va='center', ha='center')
+            self._label.configure(image=None, text="Error de formato", text_color="red")
 
-        self.canvas.draw()
+    def _show(self, image):
+        self._image = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+        self._label.configure(image=self._image, text="", text_color=AppTheme.TEXT_COLOR)
 
     def clear(self):
         """Limpia el contenido del label."""
-        self.ax.clear()
-        self.ax.axis('off')
-        self.canvas.draw()
\ No newline at end of file
+        self._request += 1
+        self._pending = None
+        self._image = None
+        self._label.configure(image=None, text="")
@@ -3,8 +3,31 @@ import customtkinter as ctk
 from tkinter import ttk
 from ui.style import AppTheme
 
+# Definir las columnas con sus nombres internos y de visualización
+COLUMNS = {
+    "function": "Función f(x)",
+    "lower_limit": "Límite a",
+    "upper_limit": "Límite b",
+    "constants": "Constantes",
+    "result": "Resultado"
+}
+
+
 class HistoryWindow(ctk.CTkToplevel):
-    def __init__(self, master, history_data):
+    """
+    Ventana del historial virtualizada: el Treeview sólo tiene tantas filas como caben
+    en pantalla y al desplazarse se reescriben sus valores. Las filas se piden por páginas
+    al historial ('fetch_page', con los argumentos de CalculatorEngine.get_history), que
+    también ordena y filtra; sólo se guarda en memoria el bloque que rodea a la vista.
+    """
+
+    ROW_HEIGHT = 22
+    # Espera tras la última tecla antes de filtrar
+    SEARCH_DELAY_MS = 120
+    # Filas que se piden de una vez alrededor de la zona visible
+    PAGE_SIZE = 200
+
+    def __init__(self, master, fetch_page, count):
         super().__init__(master)
 
         self.title("Historial de Cálculos")
@@ -13,10 +36,35 @@ class HistoryWindow(ctk.CTkToplevel):
         self.grab_set()
         self.configure(fg_color=AppTheme.BG_COLOR)
 
+        # Modelo: consulta actual (búsqueda y orden) y el bloque de filas ya leído
+        self.fetch_page = fetch_page
+        self.count = count
+        self.search = ""
+        self.order_by = "created_at"
+        self.descending = True
+        self.entries = count("")    # entradas del historial sin filtrar
+        self.total = self.entries   # entradas que cumplen la búsqueda
+        self._block_start = 0
+        self._block = []
+        self._search_after_id = None
+
+        self.offset = 0
+        self.visible_rows = 0
         self.sort_state = {}
-        self._create_widgets(history_data)
+        self._create_widgets()
+
+    def _create_widgets(self):
+        # Barra de búsqueda
+        search_bar = ctk.CTkFrame(self, fg_color="transparent")
+        search_bar.pack(fill="x", padx=10, pady=(10, 0))
+        self.search_var = ctk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
+        search_entry = ctk.CTkEntry(search_bar, textvariable=self.search_var,
+                                    placeholder_text="Buscar en el historial...")
+        search_entry.pack(side="left", fill="x", expand=True)
+        self.count_label = ctk.CTkLabel(search_bar, text="", text_color=AppTheme.TEXT_COLOR)
+        self.count_label.pack(side="right", padx=(10, 0))
 
-    def _create_widgets(self, history_data):
         container = ctk.CTkFrame(self, fg_color="transparent")
         container.pack(fill="both", expand=True, padx=10, pady=10)
         container.grid_columnconfigure(0, weight=1)
@@ -30,7 +78,8 @@ class HistoryWindow(ctk.CTkToplevel):
                        foreground=AppTheme.TEXT_COLOR,
                        fieldbackground=AppTheme.ENTRY_BG,
                        bordercolor=AppTheme.FG_COLOR,
-                       borderwidth=0)
+                       borderwidth=0,
+                       rowheight=self.ROW_HEIGHT)
         style.configure("Treeview.Heading",
                        background=AppTheme.PRIMARY,
                        foreground="white",
@@ -41,19 +90,10 @@ class HistoryWindow(ctk.CTkToplevel):
         style.map('Treeview.Heading',
                   background=[('active', AppTheme.BUTTON_HOVER)])
 
-        # Definir las columnas con sus nombres internos y de visualización
-        columns = {
-            "function": "Función f(x)",
-            "lower_limit": "Límite a",
-            "upper_limit": "Límite b",
-            "constants": "Constantes",
-            "result": "Resultado"
-        }
-
-        self.tree = ttk.Treeview(container, columns=list(columns.keys()), show="headings")
+        self.tree = ttk.Treeview(container, columns=list(COLUMNS.keys()), show="headings")
 
         # Configurar las cabeceras y el ancho de las columnas
-        for col_id, col_text in columns.items():
+        for col_id, col_text in COLUMNS.items():
             self.tree.heading(col_id, text=col_text,
                             command=lambda c=col_id: self.sort_column(c))
             if col_id == "function":
@@ -65,39 +105,131 @@ class HistoryWindow(ctk.CTkToplevel):
             else:
                 self.tree.column(col_id, width=80, anchor='center')
 
-        # Insertar los datos en la tabla
-        for item in history_data:
-            values = [
-                item["function"],
-                item["lower_limit"],
-                item["upper_limit"],
-                item.get("constants", ""),  # Usar get() para manejar casos donde no hay constantes
-                item["result"]
-            ]
-            self.tree.insert("", "end", values=values)
-
-        # Añadir scrollbar
-        scrollbar = ctk.CTkScrollbar(container, command=self.tree.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns")
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # La barra de desplazamiento controla el desplazamiento sobre el modelo, no el Treeview
+        self.scrollbar = ctk.CTkScrollbar(container, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
 
         # Colocar el Treeview
         self.tree.grid(row=0, column=0, sticky="nsew")
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_to(self.offset - 3) or "break")
+        self.tree.bind("<Button-5>", lambda e: self._scroll_to(self.offset + 3) or "break")
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_to(self.offset - self.visible_rows) or "break")
+        self.tree.bind("<Next>", lambda e: self._scroll_to(self.offset + self.visible_rows) or "break")
+        self._update_count()
+
+    # --- Virtualización ---
+
+    def _on_resize(self, event):
+        # Restar la cabecera; una fila de más evita huecos al redimensionar
+        rows = max(1, (event.height - self.ROW_HEIGHT) // self.ROW_HEIGHT + 1)
+        if rows == self.visible_rows:
+            return
+        self.visible_rows = rows
+        existing = self.tree.get_children("")
+        if len(existing) < rows:
+            for slot in range(len(existing), rows):
+                self.tree.insert("", "end", iid=str(slot), values=())
+        else:
+            self.tree.delete(*existing[rows:])
+        self._refresh()
+
+    def _rows(self, start: int, count: int) -> list:
+        """Filas [start, start + count) de la consulta actual; se pide otra página si no están en el bloque."""
+        block_end = self._block_start + len(self._block)
+        if not (self._block_start <= start and (start + count <= block_end or block_end >= self.total)):
+            # La página se centra en la vista para poder desplazarse en ambos sentidos sin volver a leer
+            self._block_start = max(0, start - (self.PAGE_SIZE - count) // 2)
+            items = self.fetch_page(search=self.search or None, order_by=self.order_by,
+                                    descending=self.descending, limit=max(self.PAGE_SIZE, count),
+                                    offset=self._block_start)
+            self._block = [tuple(str(item.get(col, "")) for col in COLUMNS) for item in items]
+        first = start - self._block_start
+        return self._block[first:first + count]
+
+    def _invalidate(self):
+        self._block_start, self._block = 0, []
+
+    def _refresh(self):
+        """Vuelca en las filas del Treeview la ventana [offset, offset + visible_rows) de la consulta."""
+        max_offset = max(0, self.total - self.visible_rows)
+        self.offset = min(max(0, self.offset), max_offset)
+        rows = self._rows(self.offset, self.visible_rows)
+        for slot in range(self.visible_rows):
+            values = rows[slot] if slot < len(rows) else ()
+            self.tree.item(str(slot), values=values)
+
+        total = self.total
+        if total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible_rows) / total)
+
+    def _scroll_to(self, offset):
+        self.offset = offset
+        self.tree.selection_remove(self.tree.selection())
+        self._refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self._scroll_to(self.offset + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        self._scroll_to(self.offset + (-3 if event.delta > 0 else 3))
+        return "break"
+
+    def _move_selection(self, step):
+        """Mueve la selección con el teclado, desplazando la ventana al llegar al borde."""
+        selection = self.tree.selection()
+        slot = int(selection[0]) + step if selection else 0
+        if slot < 0 or slot >= self.visible_rows:
+            self.offset += step
+            self._refresh()
+            slot = min(max(slot, 0), self.visible_rows - 1)
+        self.tree.selection_set(str(slot))
+        return "break"
+
+    # --- Orden y búsqueda (las resuelve la consulta paginada) ---
 
     def sort_column(self, col):
         """Ordena la tabla por la columna especificada."""
         reverse = self.sort_state.get(col, False)
-        data_list = []
-        
-        for child_id in self.tree.get_children(''):
-            try:
-                value = float(self.tree.set(child_id, col))
-            except ValueError:
-                value = self.tree.set(child_id, col).lower()
-            data_list.append((value, child_id))
-
-        data_list.sort(reverse=reverse)
-        for index, (_, child_id) in enumerate(data_list):
-            self.tree.move(child_id, '', index)
-
-        self.sort_state[col] = not reverse
\ No newline at end of file
+        self.order_by, self.descending = col, reverse
+        self.sort_state[col] = not reverse
+
+        for col_id, col_text in COLUMNS.items():
+            arrow = (" ▼" if reverse else " ▲") if col_id == col else ""
+            self.tree.heading(col_id, text=col_text + arrow)
+
+        self._invalidate()
+        self.offset = 0
+        self._refresh()
+
+    def _schedule_search(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_after_id = None
+        self._apply_search(self.search_var.get())
+
+    def _apply_search(self, text):
+        self.search = text.strip()
+        self.total = self.count(self.search or None)
+        self._invalidate()
+        self.offset = 0
+        self._update_count()
+        self._refresh()
+
+    def _update_count(self):
+        if self.total == self.entries:
+            self.count_label.configure(text=f"{self.entries} entradas")
+        else:
+            self.count_label.configure(text=f"{self.total} de {self.entries} entradas")
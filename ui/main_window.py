@@ -2,7 +2,7 @@
 
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from ui.style import AppTheme
 from ui.components.panels.control_panel import ControlPanel
 from ui.components.panels.plot_panel import PlotPanel
@@ -45,6 +45,7 @@ class MainWindow(ctk.CTk):
         # Menú Historial
         menubar = tk.Menu(self.menubar, tearoff=0, bg=AppTheme.FG_COLOR, fg=AppTheme.TEXT_COLOR)
         self.menubar.add_command(label="Historial", command=lambda: self.controller.on_show_history_click())
+        self.menubar.add_command(label="Exportar", command=lambda: self.controller.on_export_click())
 
 
     def _create_components(self):
@@ -56,8 +57,15 @@ class MainWindow(ctk.CTk):
         self.plot_panel.grid(row=0, column=1, sticky="nsew", padx=(0, 10), pady=10)
 
     def _create_statusbar(self):
-        self.statusbar = ctk.CTkLabel(self, text="Listo.", anchor="w", height=25)
+        self.statusbar = ctk.CTkLabel(self, text="Listo.", anchor="w", height=25, cursor="hand2")
         self.statusbar.grid(row=1, column=0, columnspan=2, sticky="ew")
+        # Un clic en la barra de estado muestra el desglose de tiempos del último cálculo
+        self.statusbar.bind("<Button-1>", lambda e: self.controller.on_statusbar_click())
+
+    def load_heavy_components(self):
+        """Carga la gráfica y las etiquetas LaTeX; se llama después del primer pintado."""
+        self.plot_panel.ensure_widgets()
+        self.control_panel.load_math_labels()
 
     # --- Métodos de Interfaz Pública (Fachada/Facade) ---
     # Estos métodos simplemente delegan la llamada al componente correcto.
@@ -69,8 +77,26 @@ class MainWindow(ctk.CTk):
     def update_results(self, defined_integral, indefinite_integral):
         self.control_panel.update_results(defined_integral, indefinite_integral)
 
-    def plot_function(self, numeric_func, a, b, title, fill_area=True):
-        self.plot_panel.plot_function(numeric_func, a, b, title, fill_area)
+    def update_multiple_results(self, integral, defined_integral, cost):
+        self.control_panel.update_multiple_results(integral, defined_integral, cost)
+
+    def preview_enabled(self):
+        return self.control_panel.preview_enabled()
+
+    def update_preview(self, preview):
+        self.control_panel.update_preview(preview)
+
+    def clear_preview(self):
+        self.control_panel.clear_preview()
+
+    def plot_preview(self, numeric_func, a, b, title, window=None):
+        self.plot_panel.plot_preview(numeric_func, a, b, title, window)
+
+    def plot_heatmap(self, numeric_func, region, title):
+        self.plot_panel.plot_heatmap(numeric_func, region, title)
+
+    def plot_function(self, numeric_func, a, b, title, fill_area=True, window=None):
+        self.plot_panel.plot_function(numeric_func, a, b, title, fill_area, window)
 
     def clear_plot(self, title="Gráfica de f(x)"):
         self.plot_panel.clear_plot(title=title) # Permitir un título personalizado al limpiar
@@ -80,12 +106,25 @@ class MainWindow(ctk.CTk):
         self.plot_panel.clear_plot()
         self.update_statusbar("Campos limpiados.")
 
+    def set_busy(self, busy: bool):
+        """Habilita el botón Cancelar mientras hay un cálculo o una exportación en curso."""
+        self.control_panel.set_busy(busy)
+
     def update_statusbar(self, message: str, is_error: bool = False):
         self.statusbar.configure(text=f"  {message}", fg_color=("#DC3545" if is_error else AppTheme.PRIMARY))
 
     def show_error(self, title, message):
         messagebox.showerror(title, message)
 
+    def ask_export_path(self):
+        """Pide la ruta del archivo de exportación; el formato se deduce de la extensión."""
+        return filedialog.asksaveasfilename(
+            parent=self, title="Exportar historial", defaultextension=".pdf",
+            filetypes=[("PDF", "*.pdf"), ("CSV", "*.csv"), ("JSON", "*.json")])
+
+    def get_plot_image(self):
+        return self.plot_panel.snapshot_png()
+
     def on_closing(self):
         # Lógica de guardado o confirmación si fuera necesario en el futuro
         self.destroy()
@@ -0,0 +1,206 @@
+# utils/export.py
+
+import csv
+import datetime
+import io
+import json
+import os
+
+from utils.formula_renderer import formula_renderer
+
+# Campos exportados de cada entrada del historial, en orden
+FIELDS = ("created_at", "function", "lower_limit", "upper_limit", "constants", "result", "numeric_value")
+
+# Columnas de la tabla del PDF: (campo, título, ancho en mm)
+_PDF_COLUMNS = (
+    ("function", "Función f(x)", 55),
+    ("lower_limit", "Límite a", 20),
+    ("upper_limit", "Límite b", 20),
+    ("constants", "Constantes", 25),
+    ("result", "Resultado", 70),
+)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class HistoryExporter:
+    """
+    Exporta el historial a PDF, CSV o JSON. Las entradas se leen del HistoryStore por
+    páginas; CSV y JSON se escriben según llegan, sin cargar todo el historial en memoria.
+    El PDF, en cambio, se compone entero en memoria (fpdf2 no escribe por partes) y
+    admite como mucho PDF_MAX_ROWS entradas; en él los resultados se dibujan con las
+    imágenes de la caché de fórmulas.
+    """
+
+    FORMATS = ("pdf", "csv", "json")
+    # Entradas como máximo en un PDF: el documento completo se mantiene en memoria hasta escribirlo
+    PDF_MAX_ROWS = 5000
+
+    # Las fórmulas se renderizan en negro para el fondo blanco del PDF
+    FORMULA_FONT_SIZE = 10
+    FORMULA_COLOR = "#000000"
+
+    def __init__(self, history_store, page_size: int = 500):
+        self.history = history_store
+        self.page_size = page_size
+
+    @classmethod
+    def format_for(cls, path: str) -> str:
+        extension = os.path.splitext(path)[1].lower().lstrip(".")
+        if extension not in cls.FORMATS:
+            raise ValueError(f"Formato de exportación no soportado: '.{extension}' (use .pdf, .csv o .json)")
+        return extension
+
+    def export(self, path: str, plot_png: bytes = None, progress=None, cancel_event=None) -> dict:
+        """
+        Escribe el archivo y devuelve un diccionario con el resultado.
+        'progress(hechas, total)' se llama tras cada página; si 'cancel_event' se activa,
+        la exportación se detiene y no se deja ningún archivo a medias.
+        """
+        temp_path = path + ".part"
+        try:
+            fmt = self.format_for(path)
+            total = self.history.count()
+            if fmt == "pdf" and total > self.PDF_MAX_ROWS:
+                raise ValueError(f"El PDF admite como mucho {self.PDF_MAX_ROWS} entradas y el historial tiene "
+                                 f"{total}; exporte a CSV o JSON, que se escriben por partes.")
+            writer = {"pdf": self._export_pdf, "csv": self._export_csv, "json": self._export_json}[fmt]
+
+            def pages():
+                done = 0
+                for page in self.history.iter_pages(self.page_size):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+                    yield page
+                    done += len(page)
+                    if progress is not None:
+                        progress(done, total)
+
+            rows = writer(temp_path, pages(), plot_png)
+            os.replace(temp_path, path)
+            return {"success": True, "path": path, "rows": rows}
+        except ExportCancelled:
+            return {"success": False, "error_message": "Exportación cancelada."}
+        except Exception as e:
+            return {"success": False, "error_message": str(e)}
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _timestamp(value) -> str:
+        return datetime.datetime.fromtimestamp(value).isoformat(sep=" ", timespec="seconds")
+
+    def _export_csv(self, path, pages, plot_png) -> int:
+        rows = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for page in pages:
+                for entry in page:
+                    entry["created_at"] = self._timestamp(entry["created_at"])
+                    writer.writerow([entry[field] if entry[field] is not None else "" for field in FIELDS])
+                rows += len(page)
+        return rows
+
+    def _export_json(self, path, pages, plot_png) -> int:
+        # Se escribe el array elemento a elemento en lugar de volcar una lista completa
+        rows = 0
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for page in pages:
+                for entry in page:
+                    entry["created_at"] = self._timestamp(entry["created_at"])
+                    f.write(",\n" if rows else "\n")
+                    f.write(json.dumps({field: entry[field] for field in FIELDS}, ensure_ascii=False))
+                    rows += 1
+            f.write("\n]\n")
+        return rows
+
+    # --- PDF ---
+
+    @staticmethod
+    def _latin1(text) -> str:
+        # Las fuentes estándar del PDF sólo cubren Latin-1
+        return str(text).encode("latin-1", "replace").decode("latin-1")
+
+    def _fit(self, pdf, text: str, width: float) -> str:
+        text = self._latin1(text)
+        if pdf.get_string_width(text) <= width - 2:
+            return text
+        while text and pdf.get_string_width(text + "...") > width - 2:
+            text = text[:-1]
+        return text + "..."
+
+    def _table_header(self, pdf):
+        pdf.set_font("Helvetica", "B", 9)
+        pdf.set_fill_color(220, 220, 220)
+        for _, title, width in _PDF_COLUMNS:
+            pdf.cell(width, 7, self._latin1(title), border=1, fill=True, new_x="RIGHT", new_y="TOP")
+        pdf.ln(7)
+        pdf.set_font("Helvetica", "", 8)
+
+    def _export_pdf(self, path, pages, plot_png) -> int:
+        """Compone el documento en memoria y lo escribe al final (ver PDF_MAX_ROWS)."""
+        try:
+            from fpdf import FPDF
+        except ImportError:
+            raise RuntimeError("Para exportar a PDF se necesita el paquete 'fpdf2' (pip install fpdf2).")
+
+        pdf = FPDF(orientation="P", unit="mm", format="A4")
+        pdf.set_auto_page_break(False)
+        pdf.set_margins(10, 10, 10)
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, self._latin1("Historial de cálculos"), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", "", 9)
+        pdf.cell(0, 6, self._latin1(f"Generado el {self._timestamp(datetime.datetime.now().timestamp())}"),
+                 new_x="LMARGIN", new_y="NEXT")
+
+        if plot_png:
+            from PIL import Image
+            plot = Image.open(io.BytesIO(plot_png))
+            width = pdf.epw
+            height = width * plot.height / plot.width
+            pdf.image(plot, x=pdf.l_margin, y=pdf.get_y() + 2, w=width, h=height)
+            pdf.set_y(pdf.get_y() + height + 6)
+
+        self._table_header(pdf)
+        bottom = pdf.h - pdf.b_margin
+        px_to_mm = 25.4 / formula_renderer.dpi
+        result_width = _PDF_COLUMNS[-1][2]
+
+        rows = 0
+        for page in pages:
+            for entry in page:
+                # La misma fórmula se renderiza una sola vez (caché) y fpdf2 incrusta una sola copia
+                image = formula_renderer.render(entry["result"].replace(r'\limits', ''),
+                                                self.FORMULA_FONT_SIZE, self.FORMULA_COLOR)
+                image_w, image_h = image.width * px_to_mm, image.height * px_to_mm
+                if image_w > result_width - 2:
+                    scale = (result_width - 2) / image_w
+                    image_w, image_h = image_w * scale, image_h * scale
+                row_height = max(7.0, image_h + 2)
+
+                if pdf.get_y() + row_height > bottom:
+                    pdf.add_page()
+                    self._table_header(pdf)
+
+                x, y = pdf.l_margin, pdf.get_y()
+                for field, _, width in _PDF_COLUMNS:
+                    pdf.rect(x, y, width, row_height)
+                    if field == "result":
+                        pdf.image(image, x=x + (width - image_w) / 2, y=y + (row_height - image_h) / 2,
+                                  w=image_w, h=image_h)
+                    else:
+                        pdf.set_xy(x, y)
+                        pdf.cell(width, row_height, self._fit(pdf, entry[field], width),
+                                 align="L" if field == "function" else "C")
+                    x += width
+                pdf.set_xy(pdf.l_margin, y + row_height)
+                rows += 1
+
+        pdf.output(path)
+        return rows
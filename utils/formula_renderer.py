@@ -0,0 +1,114 @@
+# utils/formula_renderer.py
+
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.startup import startup_report
+
+
+class FormulaRenderer:
+    """
+    Renderiza cadenas LaTeX (mathtext de Matplotlib) a imágenes PIL con el backend Agg,
+    sin figura ni lienzo de Tk, y guarda el resultado en una caché LRU indexada por
+    (LaTeX, tamaño de fuente, color). Las fórmulas largas se pueden renderizar en un
+    hilo aparte con render_async.
+    """
+
+    # A partir de esta longitud la fórmula se renderiza fuera del hilo de la interfaz
+    LARGE_FORMULA_CHARS = 300
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024, dpi: int = 100):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._entries = OrderedDict()  # clave -> imagen PIL
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Matplotlib no es reentrante: un único hilo de renderizado en segundo plano
+        self._executor = None
+        self._render_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(latex_string: str, font_size: int, color: str) -> tuple:
+        return latex_string, font_size, color
+
+    def get_cached(self, latex_string: str, font_size: int, color: str):
+        """Devuelve la imagen si ya está renderizada, o None, sin renderizar nada."""
+        key = self.make_key(latex_string, font_size, color)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return image
+
+    def render(self, latex_string: str, font_size: int, color: str):
+        """Devuelve la imagen de la fórmula, renderizándola sólo si no está en la caché."""
+        image = self.get_cached(latex_string, font_size, color)
+        if image is not None:
+            return image
+
+        with self._render_lock:
+            image = self._render(latex_string, font_size, color)
+
+        key = self.make_key(latex_string, font_size, color)
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = image
+                self._bytes += self._image_size(image)
+                while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                                  or self._bytes > self.max_bytes):
+                    _, old = self._entries.popitem(last=False)
+                    self._bytes -= self._image_size(old)
+        return image
+
+    def render_async(self, latex_string: str, font_size: int, color: str):
+        """Renderiza en el hilo de fondo y devuelve un Future con la imagen."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="formula-render")
+        return self._executor.submit(self.render, latex_string, font_size, color)
+
+    def is_large(self, latex_string: str) -> bool:
+        return len(latex_string) >= self.LARGE_FORMULA_CHARS
+
+    @staticmethod
+    def _image_size(image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def _render(self, latex_string: str, font_size: int, color: str):
+        with startup_report.timed("matplotlib (mathtext)"):
+            from matplotlib import mathtext
+            from matplotlib.font_manager import FontProperties
+            from PIL import Image
+
+        buffer = io.BytesIO()
+        try:
+            mathtext.math_to_image(rf"${latex_string}$", buffer, prop=FontProperties(size=font_size),
+                                   dpi=self.dpi, format="png", color=color)
+        except Exception as e:
+            print(f"Error de renderizado de Mathtext: {e}")
+            buffer = io.BytesIO()
+            mathtext.math_to_image(r"$\text{Error de formato}$", buffer, prop=FontProperties(size=font_size),
+                                   dpi=self.dpi, format="png", color="red")
+        buffer.seek(0)
+        image = Image.open(buffer)
+        image.load()
+        return image
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+formula_renderer = FormulaRenderer()
@@ -0,0 +1,137 @@
+# utils/sampling.py
+
+import numpy as np
+
+
+class FunctionSampler:
+    """
+    Muestrea una función para graficarla. Evalúa sobre arrays de NumPy en una sola
+    llamada, refina donde la curvatura es alta o la función diverge, y corta la línea
+    en los polos para no dibujar saltos verticales.
+    """
+
+    def __init__(self, samples_per_pixel: float = 1.0, min_samples: int = 100, max_samples: int = 8000,
+                 max_refinements: int = 6, curvature_tolerance: float = 0.02):
+        self.samples_per_pixel = samples_per_pixel
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.max_refinements = max_refinements
+        self.curvature_tolerance = curvature_tolerance
+
+    @staticmethod
+    def evaluate(func, x: np.ndarray) -> np.ndarray:
+        """
+        Evalúa la función sobre todo el array. Si la función no acepta arrays
+        (p. ej. usa el módulo 'math'), se evalúa punto a punto como último recurso.
+        """
+        try:
+            with np.errstate(all='ignore'):
+                y = np.asarray(func(x))
+            if y.shape != x.shape:
+                # Funciones constantes devuelven un escalar
+                y = np.broadcast_to(y, x.shape)
+        except Exception:
+            y = np.empty(x.shape, dtype=complex)
+            with np.errstate(all='ignore'):
+                for i, value in enumerate(x):
+                    try:
+                        y[i] = complex(func(value))
+                    except Exception:
+                        y[i] = np.nan
+
+        if np.iscomplexobj(y):
+            y = np.where(np.abs(y.imag) <= 1e-12 * np.maximum(1.0, np.abs(y.real)), y.real, np.nan)
+        y = np.array(y, dtype=float)
+        y[~np.isfinite(y)] = np.nan
+        return y
+
+    @staticmethod
+    def _percentiles(x: np.ndarray, y: np.ndarray, quantiles):
+        """
+        Percentiles de y ponderados por el espacio en x que representa cada muestra,
+        para que los puntos añadidos cerca de un polo no dominen la estadística.
+        """
+        finite = np.isfinite(y)
+        if finite.sum() < 2:
+            return None
+        weights = np.gradient(x)[finite] if x.size > 1 else np.ones(finite.sum())
+        order = np.argsort(y[finite])
+        values = y[finite][order]
+        cumulative = np.cumsum(weights[order])
+        cumulative /= cumulative[-1]
+        return np.interp(np.asarray(quantiles) / 100, cumulative, values)
+
+    def value_scale(self, x: np.ndarray, y: np.ndarray) -> float:
+        """Rango robusto de los valores (percentiles 5-95), insensible a los picos de los polos."""
+        bounds = self._percentiles(x, y, [5, 95])
+        if bounds is None:
+            return 1.0
+        return float(bounds[1] - bounds[0]) or max(1.0, float(np.nanmax(np.abs(y))))
+
+    def robust_limits(self, x: np.ndarray, y: np.ndarray, margin: float = 0.1):
+        """Límites del eje Y que ignoran los valores extremos cercanos a un polo."""
+        bounds = self._percentiles(x, y, [2, 98])
+        if bounds is None:
+            return -1.0, 1.0
+        low, high = bounds
+        if high - low < 1e-12:
+            low, high = low - 1.0, high + 1.0
+        pad = (high - low) * margin
+        return float(low - pad), float(high + pad)
+
+    def sample_count(self, pixel_width: float) -> int:
+        return int(np.clip(pixel_width * self.samples_per_pixel, self.min_samples, self.max_samples))
+
+    def sample(self, func, x_min: float, x_max: float, pixel_width: float = 600):
+        """Devuelve (x, y) listos para ax.plot: refinados y con NaN en los cortes de los polos."""
+        x = np.linspace(x_min, x_max, self.sample_count(pixel_width))
+        y = self.evaluate(func, x)
+        x, y = self.refine(func, x, y)
+        return self.break_poles(x, y)
+
+    def refine(self, func, x: np.ndarray, y: np.ndarray):
+        """Inserta puntos medios en los intervalos con curvatura alta o cambios de finitud."""
+        budget = self.max_samples * 2
+        for _ in range(self.max_refinements):
+            if x.size >= budget:
+                break
+            scale = self.value_scale(x, y)
+            finite = np.isfinite(y)
+
+            # Intervalos donde la función pasa de finita a no finita (o viceversa)
+            flagged = finite[:-1] != finite[1:]
+
+            # Curvatura: segunda diferencia relativa a la escala de la gráfica
+            second = np.abs(y[:-2] - 2 * y[1:-1] + y[2:])
+            with np.errstate(invalid='ignore'):
+                bent = np.nan_to_num(second, nan=0.0) > self.curvature_tolerance * scale
+            flagged[:-1] |= bent
+            flagged[1:] |= bent
+
+            indices = np.flatnonzero(flagged)
+            if indices.size == 0:
+                break
+            indices = indices[:budget - x.size]
+            mid_x = (x[indices] + x[indices + 1]) / 2
+            mid_y = self.evaluate(func, mid_x)
+            # Cada punto medio va justo después del extremo izquierdo de su intervalo
+            x = np.insert(x, indices + 1, mid_x)
+            y = np.insert(y, indices + 1, mid_y)
+        return x, y
+
+    def break_poles(self, x: np.ndarray, y: np.ndarray):
+        """
+        Inserta NaN entre dos muestras consecutivas que saltan de forma desproporcionada
+        cambiando de signo, que es la firma de un polo de orden impar.
+        """
+        if y.size < 2:
+            return x, y
+        scale = self.value_scale(x, y)
+        jump = np.abs(np.diff(y))
+        sign_change = np.sign(y[:-1]) != np.sign(y[1:])
+        with np.errstate(invalid='ignore'):
+            poles = np.flatnonzero((jump > 10 * scale) & sign_change)
+        if poles.size == 0:
+            return x, y
+        gap_x = (x[poles] + x[poles + 1]) / 2
+        return np.insert(x, poles + 1, gap_x), np.insert(y, poles + 1, np.nan)
@@ -0,0 +1,90 @@
+# utils/startup.py
+
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """
+    Registra el tiempo de importación de cada módulo pesado y las fases del arranque.
+    Se activa con la variable de entorno CALCULADORA_STARTUP_REPORT=1 o el argumento --startup-report.
+    """
+
+    # Presupuesto para que la ventana aparezca (desde que arranca el proceso)
+    FIRST_PAINT_BUDGET_MS = 1500
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.enabled = os.environ.get("CALCULADORA_STARTUP_REPORT") == "1" or "--startup-report" in sys.argv
+        self.imports = []  # (nombre, ms, hilo)
+        self.phases = []   # (nombre, ms desde el inicio)
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def timed(self, name: str):
+        """Mide lo que tarda el bloque (normalmente una o varias importaciones)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.imports.append((name, duration, threading.current_thread().name))
+
+    def import_module(self, name: str):
+        """Importa un módulo registrando su coste si todavía no estaba cargado."""
+        if name in sys.modules:
+            return sys.modules[name]
+        with self.timed(name):
+            return importlib.import_module(name)
+
+    def mark(self, phase: str):
+        with self._lock:
+            self.phases.append((phase, self.elapsed_ms()))
+
+    def format(self) -> str:
+        with self._lock:
+            lines = ["=== Informe de arranque ===", "Importaciones:"]
+            for name, duration, thread in sorted(self.imports, key=lambda item: -item[1]):
+                lines.append(f"  {duration:8.1f} ms  {name}  [{thread}]")
+            lines.append("Fases (ms desde el inicio):")
+            for phase, at in self.phases:
+                lines.append(f"  {at:8.1f} ms  {phase}")
+            first_paint = next((at for phase, at in self.phases if phase == "primer pintado"), None)
+        if first_paint is not None:
+            status = "OK" if first_paint <= self.FIRST_PAINT_BUDGET_MS else "EXCEDIDO"
+            lines.append(f"Primer pintado: {first_paint:.1f} ms "
+                         f"(presupuesto {self.FIRST_PAINT_BUDGET_MS} ms) -> {status}")
+        return "\n".join(lines)
+
+    def emit(self):
+        if self.enabled:
+            print(self.format(), file=sys.stderr)
+
+
+class LazyModule(types.ModuleType):
+    """Módulo sustituto que sólo importa el real la primera vez que se usa uno de sus atributos."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = startup_report.import_module(self.__name__)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+startup_report = StartupReport()
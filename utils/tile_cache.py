@@ -0,0 +1,102 @@
+# utils/tile_cache.py
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class TileCache:
+    """
+    Caché de muestras de la función organizada en teselas de x a varios niveles de
+    resolución. En el nivel L cada tesela mide 2**L y contiene TILE_SAMPLES intervalos,
+    de modo que al desplazar la vista o volver a un zoom anterior sólo se evalúan
+    las teselas que faltan. La memoria está acotada y se expulsa por LRU.
+    """
+
+    TILE_SAMPLES = 128
+
+    def __init__(self, sampler, max_bytes: int = 16 * 1024 * 1024):
+        self.sampler = sampler
+        self.max_bytes = max_bytes
+        self._tiles = OrderedDict()  # (nivel, índice) -> (x, y)
+        self._bytes = 0
+        self._func = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def level_for(self, x_min: float, x_max: float, pixel_width: float) -> int:
+        """Nivel cuya separación entre muestras es la más gruesa que no supera la pedida."""
+        spacing = (x_max - x_min) / self.sampler.sample_count(pixel_width)
+        return math.floor(math.log2(spacing * self.TILE_SAMPLES))
+
+    def sample(self, func, x_min: float, x_max: float, pixel_width: float = 600):
+        """
+        Igual que FunctionSampler.sample, pero reutilizando teselas ya calculadas.
+        El resultado cubre las teselas completas que tocan [x_min, x_max].
+        """
+        if not (np.isfinite(x_min) and np.isfinite(x_max)) or x_max <= x_min:
+            return self.sampler.sample(func, x_min, x_max, pixel_width)
+
+        with self._lock:
+            if func is not self._func:
+                # Otra función: las teselas anteriores ya no sirven
+                self._clear()
+                self._func = func
+
+        level = self.level_for(x_min, x_max, pixel_width)
+        width = 2.0 ** level
+        first, last = math.floor(x_min / width), math.floor(x_max / width)
+
+        xs, ys = [], []
+        for index in range(first, last + 1):
+            x, y = self._tile(func, level, index, width)
+            if xs:
+                # El primer punto de cada tesela es el último de la anterior
+                x, y = x[1:], y[1:]
+            xs.append(x)
+            ys.append(y)
+        return self.sampler.break_poles(np.concatenate(xs), np.concatenate(ys))
+
+    def _tile(self, func, level: int, index: int, width: float):
+        key = (level, index)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+            self.misses += 1
+
+        x = index * width + np.linspace(0.0, width, self.TILE_SAMPLES + 1)
+        y = self.sampler.evaluate(func, x)
+        tile = self.sampler.refine(func, x, y)
+
+        with self._lock:
+            if func is self._func and key not in self._tiles:
+                self._tiles[key] = tile
+                self._bytes += tile[0].nbytes + tile[1].nbytes
+                while self._bytes > self.max_bytes and len(self._tiles) > 1:
+                    _, (old_x, old_y) = self._tiles.popitem(last=False)
+                    self._bytes -= old_x.nbytes + old_y.nbytes
+                    self.evictions += 1
+        return tile
+
+    def _clear(self):
+        self._tiles.clear()
+        self._bytes = 0
+        self._func = None
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tiles": len(self._tiles), "bytes": self._bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions
+            }